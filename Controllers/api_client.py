@@ -0,0 +1,252 @@
+# api_client.py
+# Shared football-data.org client: one pooled HTTP session, a token bucket
+# that follows the provider's rate-limit headers, retries with backoff and
+# bounded concurrency for bulk refreshes.
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException, Timeout, ConnectionError
+
+from config import API_TOKEN, BASE_URL, API_RATE_LIMIT_PER_MINUTE, API_MAX_WORKERS, API_MAX_RETRIES, API_TIMEOUT
+
+JOBS_DIR = os.path.join("logs", "api_jobs")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ApiError(RequestException):
+    """Raised when a request still fails after all retries."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate_per_minute`.
+
+    The server is the source of truth: after every response the bucket is
+    clamped to `X-Requests-Available(-Minute)`, and when that hits zero all
+    callers wait for `X-RequestCounter-Reset` seconds.
+    """
+
+    def __init__(self, rate_per_minute=API_RATE_LIMIT_PER_MINUTE):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until one request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def update_from_headers(self, headers):
+        available = headers.get("X-Requests-Available-Minute", headers.get("X-Requests-Available"))
+        reset = headers.get("X-RequestCounter-Reset")
+        if available is None:
+            return
+        try:
+            available = int(available)
+        except ValueError:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(available))
+            if available <= 0 and reset is not None:
+                try:
+                    self._block(float(reset))
+                except ValueError:
+                    pass
+
+    def _block(self, seconds):
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+    def block_for(self, seconds):
+        """Hold every caller back for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._block(seconds)
+
+
+class ApiClient:
+    def __init__(self, base_url=BASE_URL, token=API_TOKEN, rate_per_minute=API_RATE_LIMIT_PER_MINUTE,
+                 max_workers=API_MAX_WORKERS, max_retries=API_MAX_RETRIES, timeout=API_TIMEOUT):
+        self.base_url = (base_url or "").rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_per_minute)
+
+        self.session = requests.Session()
+        self.session.headers.update({"X-Auth-Token": token or ""})
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _url(self, path):
+        return path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+
+    @staticmethod
+    def _backoff(attempt):
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+    def get(self, path, params=None, headers=None, timeout=None):
+        """
+        Rate-limited GET with retries on timeouts, connection errors, 429 and 5xx.
+
+        Returns:
+            requests.Response: The first non-retryable response (callers check the status).
+
+        Raises:
+            ApiError: If every attempt failed.
+        """
+        url = self._url(path)
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            self._count("requests")
+            try:
+                res = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+            except (Timeout, ConnectionError) as e:
+                last_error = e
+                delay = self._backoff(attempt)
+            else:
+                self.bucket.update_from_headers(res.headers)
+                if res.status_code not in RETRY_STATUSES:
+                    return res
+                last_error = f"HTTP {res.status_code}"
+                wait_hint = res.headers.get("Retry-After") or res.headers.get("X-RequestCounter-Reset")
+                try:
+                    delay = float(wait_hint) if wait_hint else self._backoff(attempt)
+                except ValueError:
+                    delay = self._backoff(attempt)
+                if res.status_code == 429:
+                    self.bucket.block_for(delay)
+
+            if attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(delay)
+
+        self._count("failures")
+        raise ApiError(f"GET {url} failed after {self.max_retries + 1} attempts: {last_error}")
+
+    def get_json(self, path, params=None):
+        res = self.get(path, params=params)
+        res.raise_for_status()
+        return res.json()
+
+    def download(self, url, timeout=None):
+        """Fetch a static asset (crests etc.) over the pooled session, outside the API quota."""
+        res = self.session.get(url, timeout=timeout or self.timeout)
+        res.raise_for_status()
+        return res.content
+
+    def map(self, fn, items, max_workers=None):
+        """
+        Run `fn(item)` for every item on a bounded thread pool.
+        Yields (item, result, error) in completion order, on the caller's thread,
+        so progress bars can be updated as results arrive.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers or self.max_workers)
+        try:
+            futures = {executor.submit(fn, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # If the caller stops early (e.g. a cancelled job), drop the queued work
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class JobCheckpoint:
+    """
+    Remembers which ids a long refresh has already processed, so an
+    interrupted run picks up where it stopped. Stored as JSON under logs/api_jobs.
+    """
+
+    def __init__(self, name, flush_every=25):
+        self.path = os.path.join(JOBS_DIR, f"{name}.json")
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.done = set()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.done = set(json.load(f).get("done", []))
+            except (OSError, ValueError):
+                self.done = set()
+
+    def remaining(self, ids):
+        return [i for i in ids if i not in self.done]
+
+    def mark_done(self, item_id):
+        with self._lock:
+            self.done.add(item_id)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "updated_at": time.time()}, f)
+        os.replace(tmp_path, self.path)
+        self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def clear(self):
+        """Forget progress once the job has finished."""
+        with self._lock:
+            self.done = set()
+            self._pending = 0
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide ApiClient (shares one session and one rate limit)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient()
+        return _client
@@ -1,18 +1,19 @@
 import os
 import json
-import requests
+import hashlib
 from Controllers.utils import fetch_all, fetch_one, execute_query
 from Controllers.db_controller import get_connection
-from config import API_TOKEN, BASE_URL
-from time import sleep
+from Controllers.api_client import get_client, JobCheckpoint, ApiError
+from Controllers.live_controller import refresh_match_statuses, status_params, STATUS_SQL
+from Controllers.thumbnails import generate_thumbnails
+from config import SYNC_LOOKBACK_DAYS, SYNC_LOOKAHEAD_DAYS
 import streamlit as st
 import base64
-import requests
 from datetime import datetime
 from requests.exceptions import RequestException, Timeout, ConnectionError
 from datetime import datetime, timedelta
+import threading
 
-HEADERS = {'X-Auth-Token': API_TOKEN}
 TEAMS_DIR = os.path.join("Assets", "Teams")
 PLAYERS_DIR = os.path.join("Assets", "Players")
 LOG_DIR = os.path.join("logs")
@@ -23,6 +24,7 @@ os.makedirs(TEAMS_DIR, exist_ok=True)
 os.makedirs(PLAYERS_DIR, exist_ok=True)
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(MATCHES_DIR, exist_ok=True)
+_log_lock = threading.Lock()
 # === Status Mapping ===
 STATUS_MAP = {
     "SCHEDULED": "upcoming",
@@ -43,8 +45,13 @@ def get_logo_base64(path):
         return base64.b64encode(f.read()).decode()
     
 def update_team_info(team_id, counters):
-    team_url = f"{BASE_URL}/teams/{team_id}"
-    response = requests.get(team_url, headers=HEADERS)
+    client = get_client()
+    try:
+        response = client.get(f"/teams/{team_id}")
+    except ApiError as e:
+        print(f"❌ Failed to fetch team info for team {team_id}: {e}")
+        counters['failed_teams'] += 1
+        return
     if response.status_code != 200:
         print(f"❌ Failed to fetch team info for team {team_id}. Status code: {response.status_code}")
         counters['failed_teams'] += 1
@@ -63,9 +70,10 @@ def update_team_info(team_id, counters):
     logo_name = f"{team_id}.png"
     if logo_url:
         try:
-            img_data = requests.get(logo_url).content
+            img_data = client.download(logo_url)
             with open(logo_path, 'wb') as handler:
                 handler.write(img_data)
+            generate_thumbnails(logo_path)
         except Exception as e:
             print(f"⚠️ Could not download logo for team {team_id}: {e}")
             logo_path = None
@@ -170,13 +178,18 @@ def update_team_info(team_id, counters):
 
     print(f"✅ Team {team_id} updated successfully.")
     
-def update_all_teams():
-    conn = get_connection()
-    teams = fetch_all("SELECT id FROM teams")
-    if not teams:
-        print("No teams found in the database.")
-        return
+def refresh_teams(team_ids, checkpoint, report=None):
+    """
+    Refresh the given teams concurrently, skipping ids the checkpoint already holds.
+
+    Args:
+        team_ids (list): Team ids to refresh.
+        checkpoint: JobCheckpoint (or a background job) recording finished ids.
+        report (callable): Optional report(done, total, message) after each team.
 
+    Returns:
+        dict: Summary counters.
+    """
     counters = {
         'updated_teams': 0,
         'failed_teams': 0,
@@ -185,10 +198,47 @@ def update_all_teams():
         'inserted_players': 0,
         'inserted_coaches': 0
     }
+    remaining = checkpoint.remaining(team_ids)
+    already_done = len(team_ids) - len(remaining)
+
+    def refresh(team_id):
+        # Per-team counters, merged on the main thread
+        local = dict.fromkeys(counters, 0)
+        update_team_info(team_id, local)
+        return local
+
+    for idx, (team_id, result, error) in enumerate(get_client().map(refresh, remaining), 1):
+        if error:
+            print(f"❌ Team {team_id} failed: {error}")
+            counters['failed_teams'] += 1
+        else:
+            for key, value in result.items():
+                counters[key] += value
+            if not result['failed_teams']:
+                checkpoint.mark_done(team_id)
+        if report:
+            report(already_done + idx, len(team_ids), f"Team {team_id}")
+
+    if counters['failed_teams']:
+        checkpoint.flush()
+    else:
+        checkpoint.clear()
+    return counters
+
+def update_all_teams(resume=True):
+    """
+    Refresh every team concurrently. The shared client keeps us inside the
+    API quota; a checkpoint lets an interrupted run resume (resume=False starts over).
+    """
+    teams = fetch_all("SELECT id FROM teams")
+    if not teams:
+        print("No teams found in the database.")
+        return
 
-    for (team_id,) in teams:
-        update_team_info(team_id, counters)
-        sleep(5)
+    checkpoint = JobCheckpoint("update_all_teams")
+    if not resume:
+        checkpoint.clear()
+    counters = refresh_teams([row[0] for row in teams], checkpoint)
 
     print("\n📊 Update Summary:")
     print(f"  ✔️ Teams updated: {counters['updated_teams']}")
@@ -197,9 +247,10 @@ def update_all_teams():
     print(f"  🔗 Team-Competition links inserted: {counters['inserted_team_comps']}")
     print(f"  👟 Players inserted/updated: {counters['inserted_players']}")
     print(f"  🎓 Coaches inserted/updated: {counters['inserted_coaches']}")
+    return counters
 
 def log_failed_player(player_id, player_name=None, reason=None):
-    with open(FAILED_LOG_PATH, "a", encoding="utf-8") as log_file:
+    with _log_lock, open(FAILED_LOG_PATH, "a", encoding="utf-8") as log_file:
         timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
         name_display = player_name or f"ID: {player_id}"
         message = f"{timestamp} ❌ Failed: {name_display}"
@@ -208,21 +259,19 @@ def log_failed_player(player_id, player_name=None, reason=None):
         log_file.write(message + "\n")
 
 def update_football_player_info(player_id, counters):
-    player_url = f"{BASE_URL}/persons/{player_id}"
-
     try:
-        res = requests.get(player_url, headers=HEADERS, timeout=10)
+        res = get_client().get(f"/persons/{player_id}", timeout=10)
         res.raise_for_status()
     except (Timeout, ConnectionError, RequestException) as e:
         log_failed_player(player_id, reason=str(e))
-        return
+        return False
 
     try:
         player_data = res.json()
         player_name = player_data.get("name", "Unknown")
     except Exception as e:
         log_failed_player(player_id, reason=f"Invalid JSON - {e}")
-        return
+        return False
 
     # Save JSON
     try:
@@ -231,7 +280,7 @@ def update_football_player_info(player_id, counters):
             json.dump(player_data, f, ensure_ascii=False, indent=4)
     except Exception as e:
         log_failed_player(player_id, player_name, reason=f"JSON save failed - {e}")
-        return
+        return False
 
     current_team = player_data.get("currentTeam", {})
     current_area = current_team.get("area", {}) if current_team else {}
@@ -271,31 +320,73 @@ def update_football_player_info(player_id, counters):
             contract_until
         ))
         counters['inserted_players'] += 1
+        return True
     except Exception as e:
         log_failed_player(player_id, player_name, reason=f"DB insert failed - {e}")
+        return False
+
+def refresh_players(player_ids, checkpoint, report=None):
+    """
+    Refresh the given football players concurrently, skipping checkpointed ids.
 
-def update_all_players():
+    Returns:
+        tuple: (updated, failed)
+    """
+    remaining = checkpoint.remaining(player_ids)
+    already_done = len(player_ids) - len(remaining)
+    updated = failed = 0
+
+    def refresh(player_id):
+        return update_football_player_info(player_id, {'inserted_players': 0})
+
+    for idx, (player_id, ok, error) in enumerate(get_client().map(refresh, remaining), 1):
+        if ok:
+            updated += 1
+            checkpoint.mark_done(player_id)
+        else:
+            failed += 1
+            if error:
+                log_failed_player(player_id, reason=str(error))
+        if report:
+            report(already_done + idx, len(player_ids), f"Player {player_id}")
+
+    if failed:
+        checkpoint.flush()
+    else:
+        checkpoint.clear()
+    return updated, failed
+
+def update_all_players(resume=True):
+    """
+    Refresh every football player concurrently within the API quota.
+    Progress is checkpointed, so a stopped run resumes where it left off.
+    """
     all_players = fetch_all("SELECT DISTINCT id FROM football_player")
-    total = len(all_players)
-    counters = {'inserted_players': 0}
 
-    if total == 0:
+    if not all_players:
         st.warning("⚠️ No players found in the database.")
         return
 
+    checkpoint = JobCheckpoint("update_all_players")
+    if not resume:
+        checkpoint.clear()
+    player_ids = [row[0] for row in all_players]
+    already_done = len(player_ids) - len(checkpoint.remaining(player_ids))
+
     st.markdown("### 👟 Updating Football Players")
+    if already_done:
+        st.info(f"⏩ Resuming: {already_done} players already refreshed.")
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    for idx, (player_id,) in enumerate(all_players, 1):
-        sleep(6)
-        update_football_player_info(player_id, counters)
+    def report(done, total, message):
+        progress_bar.progress(int((done / total) * 100))
+        status_text.text(f"Updating player {done}/{total} ({message})...")
 
-        percent = int((idx / total) * 100)
-        progress_bar.progress(percent)
-        status_text.text(f"Updating player {idx}/{total} (ID: {player_id})...")
+    updated, failed = refresh_players(player_ids, checkpoint, report=report)
 
-    st.success(f"✅ Finished updating all players. Total players updated: {counters['inserted_players']}")
+    st.success(f"✅ Finished updating all players. Total players updated: {updated}"
+               + (f" ❌ {failed} failed (run again to retry them)." if failed else ""))
 
 # Matches Part
 STATUS_MAP = {
@@ -305,7 +396,7 @@ STATUS_MAP = {
 }
 
 # === Round Helper ===
-def fix_all_prediction_deadlines():
+def fix_all_prediction_deadlines(notify=True):
     conn = get_connection()
     cur = conn.cursor()
 
@@ -340,7 +431,9 @@ def fix_all_prediction_deadlines():
     conn.commit()
     conn.close()
 
-    st.success(f"✅ Prediction deadlines updated for {updated} rounds.")
+    if notify:
+        st.success(f"✅ Prediction deadlines updated for {updated} rounds.")
+    return updated
 
 
 def get_or_create_round_by_week(conn, match_datetime):
@@ -366,7 +459,6 @@ def get_or_create_round_by_week(conn, match_datetime):
         INSERT INTO rounds (name, round_number, start_date, end_date, prediction_deadline)
         VALUES (?, ?, ?, ?, ?)
     """, (name, round_number, start_date.date(), end_date.date(), deadline.isoformat()))
-    conn.commit()
     return cur.lastrowid
 
 def get_league_id_by_code(conn, code):
@@ -449,68 +541,140 @@ def log_message(msg):
         f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}\n")
     print(msg)
 
+# === Incremental Sync Helpers ===
+def match_content_hash(match_obj):
+    """Stable fingerprint of the API fields we store for a match."""
+    return hashlib.sha1(json.dumps(match_obj, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_sync_state(key):
+    return fetch_one("SELECT etag, last_modified FROM sync_state WHERE key = ?", (key,))
+
+def save_sync_state(key, etag, last_modified):
+    execute_query("""
+        INSERT INTO sync_state (key, etag, last_modified, synced_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(key) DO UPDATE SET etag=excluded.etag, last_modified=excluded.last_modified, synced_at=CURRENT_TIMESTAMP
+    """, (key, etag, last_modified))
+
+def get_sync_window(now=None):
+    """dateFrom/dateTo around today: recent results that may still change plus the upcoming week."""
+    today = (now or datetime.now(timezone.utc)).date()
+    return {
+        "dateFrom": (today - timedelta(days=SYNC_LOOKBACK_DAYS)).isoformat(),
+        "dateTo": (today + timedelta(days=SYNC_LOOKAHEAD_DAYS)).isoformat(),
+    }
+
 # === Fetch One League ===
-def fetch_league_matches(league_code, counters, total):
-    url = f"{BASE_URL}/competitions/{league_code}/matches?season=2025"
+def fetch_league_matches(league_code, counters, total, incremental=False):
+    """
+    Download a league's matches and upsert the ones that changed.
+
+    incremental=False fetches the whole season (and refreshes the JSON snapshots);
+    incremental=True only asks for the live/upcoming window. Either way the
+    request is conditional (ETag / Last-Modified) and matches whose content
+    hash is unchanged never touch the database.
+    """
+    params = {"season": 2025}
+    if incremental:
+        params.update(get_sync_window())
+    sync_key = f"/competitions/{league_code}/matches?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
     try:
-        res = requests.get(url, headers=HEADERS, timeout=20)
+        conditional = {}
+        state = get_sync_state(sync_key)
+        if state:
+            if state["etag"]:
+                conditional["If-None-Match"] = state["etag"]
+            if state["last_modified"]:
+                conditional["If-Modified-Since"] = state["last_modified"]
+
+        res = get_client().get(f"/competitions/{league_code}/matches", params=params, headers=conditional, timeout=20)
+        if res.status_code == 304:
+            counters['success'] += 1
+            counters['not_modified'] += 1
+            log_message(f"⏭️ {league_code}: not modified since last sync.")
+            return
         res.raise_for_status()
         data = res.json()
 
-        # Save raw JSON
-        raw_path = os.path.join(MATCHES_DIR, f"{league_code}_raw.json")
-        with open(raw_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        if not incremental:
+            # Save raw JSON
+            raw_path = os.path.join(MATCHES_DIR, f"{league_code}_raw.json")
+            with open(raw_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
 
         # Process matches
         conn = get_connection()
         league_id = fetch_one("SELECT id FROM leagues WHERE code = ?", (league_code,))['id']
+        known_hashes = {
+            row["api_match_id"]: row["content_hash"]
+            for row in fetch_all("SELECT api_match_id, content_hash FROM matches WHERE league_id = ?", (league_id,))
+        }
         inserted_matches = []
+        skipped = 0
 
-        for m in data.get("matches", []):
-            match_obj = {
-                "id": m.get("id"),
-                "matchday": m.get("matchday"),
-                "utcDate": m.get("utcDate"),
-                "status": m.get("status"),
-                "stage": m.get("stage"),
-                "homeTeam": m["homeTeam"],
-                "awayTeam": m["awayTeam"],
-                "score": m.get("score")
-            }
-            inserted = insert_or_update_match_with_score(conn, match_obj, league_id)
-            if inserted:
-                inserted_matches.append(match_obj)
-
-        conn.close()
-
-        # Save simplified JSON
-        simplified_path = os.path.join(MATCHES_DIR, f"{league_code}_matches.json")
-        with open(simplified_path, "w", encoding="utf-8") as f:
-            json.dump(inserted_matches, f, indent=4)
+        # One transaction per league: the upserts and one status refresh commit together
+        try:
+            for m in data.get("matches", []):
+                match_obj = {
+                    "id": m.get("id"),
+                    "matchday": m.get("matchday"),
+                    "utcDate": m.get("utcDate"),
+                    "status": m.get("status"),
+                    "stage": m.get("stage"),
+                    "homeTeam": m["homeTeam"],
+                    "awayTeam": m["awayTeam"],
+                    "score": m.get("score")
+                }
+                content_hash = match_content_hash(match_obj)
+                if known_hashes.get(match_obj["id"]) == content_hash:
+                    skipped += 1
+                    continue
+                inserted = insert_or_update_match_with_score(conn, match_obj, league_id, content_hash=content_hash)
+                if inserted:
+                    inserted_matches.append(match_obj)
+
+            refresh_match_statuses(conn, api_match_ids=[m["id"] for m in inserted_matches])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        save_sync_state(sync_key, res.headers.get("ETag"), res.headers.get("Last-Modified"))
+
+        if not incremental:
+            # Save simplified JSON
+            simplified_path = os.path.join(MATCHES_DIR, f"{league_code}_matches.json")
+            with open(simplified_path, "w", encoding="utf-8") as f:
+                json.dump(inserted_matches, f, indent=4)
 
         counters['success'] += 1
-        log_message(f"✅ {league_code}: {len(inserted_matches)} matches inserted.")
+        counters['changed'] += len(inserted_matches)
+        counters['unchanged'] += skipped
+        log_message(f"✅ {league_code}: {len(inserted_matches)} matches written, {skipped} unchanged.")
 
     except RequestException as e:
         counters['failed'] += 1
         log_message(f"❌ Failed {league_code} - {e}")
 
 # === Fetch All Selected Leagues ===
-def fetch_all_target_leagues(target_league_codes):
+def fetch_all_target_leagues(target_league_codes, incremental=False):
     total = len(target_league_codes)
-    counters = {"success": 0, "failed": 0}
+    counters = {"success": 0, "failed": 0, "changed": 0, "unchanged": 0, "not_modified": 0}
     progress_text = st.empty()
     progress_bar = st.progress(0)
 
     for idx, code in enumerate(target_league_codes):
-        fetch_league_matches(code, counters, total)
+        fetch_league_matches(code, counters, total, incremental=incremental)
         progress = (idx + 1) / total
         progress_bar.progress(progress)
         progress_text.markdown(f"⚽ `{code}`: {idx + 1}/{total} completed")
-        sleep(1.5)
 
-    st.success(f"✅ Done! {counters['success']} leagues inserted. ❌ {counters['failed']} failed.")
+    st.success(f"✅ Done! {counters['success']} leagues synced ({counters['changed']} matches written, "
+               f"{counters['unchanged']} unchanged, {counters['not_modified']} leagues not modified). "
+               f"❌ {counters['failed']} failed.")
     st.balloons()
     fix_all_prediction_deadlines()
     log_message("🎯 All leagues fetched and saved.")
@@ -521,45 +685,19 @@ from datetime import datetime, timedelta, timezone
 def update_all_match_statuses(conn):
     """
     Recalculate and update the status of all matches in the database
-    based on match_datetime, scores, and time elapsed.
+    based on match_ts, scores, and time elapsed (same rules as the ticker).
     """
     cur = conn.cursor()
-    now = datetime.now(timezone.utc)
-
-    cur.execute("SELECT id, match_datetime, home_score, away_score, status FROM matches")
-    rows = cur.fetchall()
-
-    for match_id, match_dt, home_score, away_score, old_status in rows:
-        # Ensure datetime is timezone-aware
-        if isinstance(match_dt, str):
-            match_dt = datetime.fromisoformat(match_dt)
-        if match_dt.tzinfo is None:
-            match_dt = match_dt.replace(tzinfo=timezone.utc)
-
-        # --- Determine new status ---
-        if old_status == "cancelled":
-            new_status = "cancelled"
-        elif home_score is not None or away_score is not None:
-            new_status = "finished"
-        elif now < match_dt:
-            new_status = "upcoming"
-        elif match_dt <= now <= match_dt + timedelta(hours=2):
-            new_status = "live"
-        else:
-            new_status = "finished"
-
-        # --- Update if status changed ---
-        if new_status != old_status:
-            cur.execute("""
-                UPDATE matches
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (new_status, match_id))
-
+    cur.execute(f"""
+        UPDATE matches
+        SET status = {STATUS_SQL}, updated_at = CURRENT_TIMESTAMP
+        WHERE status IS NOT {STATUS_SQL}
+    """, status_params())
+    cur.close()
     conn.commit()
     
 
-def insert_or_update_match_with_score(conn, match, league_id):
+def insert_or_update_match_with_score(conn, match, league_id, content_hash=None):
     cur = conn.cursor()
     dt = datetime.fromisoformat(match['utcDate'].replace("Z", ""))
 
@@ -575,7 +713,6 @@ def insert_or_update_match_with_score(conn, match, league_id):
     else:
         cur.execute("INSERT INTO stages (name, league_id) VALUES (?, ?)", (stage_name, league_id))
         stage_id = cur.lastrowid
-        conn.commit()
 
     # --- Ensure teams exist ---
     home_team_id = match.get("homeTeam", {}).get("id")
@@ -619,11 +756,11 @@ def insert_or_update_match_with_score(conn, match, league_id):
         cur.execute("""
             UPDATE matches
             SET match_datetime = ?, status = ?, home_score = ?, away_score = ?,
-                stage_id = ?, Venue_name = ?, updated_at = CURRENT_TIMESTAMP
+                stage_id = ?, Venue_name = ?, content_hash = ?, updated_at = CURRENT_TIMESTAMP
             WHERE api_match_id = ?
         """, (
             dt.isoformat(), status, home_score, away_score,
-            stage_id, venue_name, api_match_id
+            stage_id, venue_name, content_hash, api_match_id
         ))
         action = "updated"
     else:
@@ -633,19 +770,17 @@ def insert_or_update_match_with_score(conn, match, league_id):
                 round_id, league_id, home_team_id, away_team_id,
                 match_datetime, status, matchday, api_match_id,
                 stage_id, is_predictable, Venue_name,
-                home_score, away_score
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                home_score, away_score, content_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             round_id, league_id,
             home_team_id, away_team_id,
             dt.isoformat(), status, match.get("matchday", 0), api_match_id,
             stage_id, is_predictable, venue_name,
-            home_score, away_score
+            home_score, away_score, content_hash
         ))
         action = "inserted"
 
-    conn.commit()
-    # --- Sync statuses for all matches ---
-    update_all_match_statuses(conn)
+    # Caller commits and refreshes statuses once per batch (refresh_match_statuses)
     return action
 
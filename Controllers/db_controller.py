@@ -1,16 +1,255 @@
 # db.py
-import os
 import sqlite3
-from dotenv import load_dotenv
+import threading
+import time
+import weakref
 
-from config import DB_FILE
+from Controllers.db_migrations import apply_migrations
+from config import (
+    DB_FILE, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_MMAP_SIZE, DB_CACHE_SIZE_KB, DB_HEALTH_CHECK_INTERVAL,
+    DB_STATEMENT_CACHE_SIZE,
+)
 
 # load_dotenv()
 
 # DB_FILE = os.getenv("DB_FILE", "game_database.db")
 # DB_PASSWORD = os.getenv("DB_PASSWORD", None)  # we won't use it in sqlite for now
 
+# ------------------- Connection Pool ------------------- #
+
+# Applied once, when a physical connection is opened.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA mmap_size = {DB_MMAP_SIZE}",
+    f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}",
+    "PRAGMA busy_timeout = 5000",
+)
+
+
+class _Lease:
+    """
+    Binds one pooled connection to the thread that holds it.
+    When the thread finishes (and its thread-local storage is dropped)
+    the connection goes back to the pool automatically.
+    """
+
+    def __init__(self, manager, conn):
+        self.conn = conn
+        self.depth = 0
+        self.last_checked = time.monotonic()
+        self._finalizer = weakref.finalize(self, manager._release, conn)
+
+
+class PooledConnection:
+    """
+    Thin proxy over the thread's persistent sqlite3 connection.
+    Everything is delegated to the real connection except close(): closing
+    hands the connection back instead of tearing it down, and rolls back any
+    transaction the outermost caller left open (same as a real close would).
+    """
+
+    __slots__ = ("_conn", "_finalizer", "__weakref__")
+
+    def __init__(self, lease):
+        object.__setattr__(self, "_conn", lease.conn)
+        lease.depth += 1
+        object.__setattr__(self, "_finalizer", weakref.finalize(self, PooledConnection._detach, lease))
+
+    @staticmethod
+    def _detach(lease):
+        lease.depth -= 1
+        if lease.depth <= 0:
+            lease.depth = 0
+            if lease.conn.in_transaction:
+                lease.conn.rollback()
+
+    def close(self):
+        self._finalizer()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+
+class ConnectionManager:
+    """
+    Bounded pool of persistent SQLite connections, one leased per thread.
+
+    - Connections are opened lazily (up to `max_size`) with the pragmas above.
+    - A thread keeps the same connection for its whole lifetime, so repeated
+      fetch_one / fetch_all calls in one script run never reconnect.
+      Long-lived background loops (status ticker, reminder scheduler, prediction
+      writer, outbox sender, job heartbeat) call release_thread() between ticks
+      so they don't hold a connection while idle.
+    - Idle connections are health-checked before being handed out again.
+    - The first connection opened brings the schema up to date (db_migrations).
+    """
+
+    def __init__(self, db_file, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_interval=DB_HEALTH_CHECK_INTERVAL):
+        self.db_file = db_file
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = []
+        self._opened = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._migrated = False
+        self._migrate_lock = threading.Lock()
+        self.stats = {"opened": 0, "reused": 0, "discarded": 0, "waits": 0}
+
+    # ----- physical connections ----- #
+
+    def _open(self):
+        # Prepared statements are cached per connection by SQL text; sized for every
+        # distinct parameterized query the app issues, so none is re-compiled
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, cached_statements=DB_STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if not self._migrated:
+            with self._migrate_lock:
+                if not self._migrated:
+                    apply_migrations(conn)
+                    self._migrated = True
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._cond:
+            self._opened -= 1
+            self.stats["discarded"] += 1
+            self._cond.notify()
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._opened < self.max_size:
+                    self._opened += 1
+                    idle_since = None
+                    break
+                self.stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise sqlite3.OperationalError(
+                        f"Connection pool exhausted ({self.max_size} connections in use)"
+                    )
+
+        if idle_since is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._opened -= 1
+                    self._cond.notify()
+                raise
+            self.stats["opened"] += 1
+            return conn
+
+        if time.monotonic() - idle_since > self.health_check_interval and not self._is_healthy(conn):
+            self._discard(conn)
+            return self._checkout()
+
+        self.stats["reused"] += 1
+        return conn
+
+    # ----- public API ----- #
+
+    def lease(self):
+        """Return the current thread's lease, checking a connection out if needed."""
+        lease = getattr(self._local, "lease", None)
+        if lease is not None:
+            now = time.monotonic()
+            if now - lease.last_checked > self.health_check_interval:
+                lease.last_checked = now
+                if not self._is_healthy(lease.conn):
+                    lease._finalizer.detach()
+                    self._discard(lease.conn)
+                    lease = None
+        if lease is None:
+            lease = _Lease(self, self._checkout())
+            self._local.lease = lease
+        return lease
+
+    def connection(self):
+        """Raw sqlite3 connection bound to the current thread (do not close it)."""
+        return self.lease().conn
+
+    def release_thread(self):
+        """Hand the current thread's connection back to the pool right away."""
+        lease = getattr(self._local, "lease", None)
+        if lease is not None:
+            del self._local.lease
+            lease._finalizer()
+
+    def checkpoint(self):
+        """
+        Fold the WAL back into the main database file.
+
+        Returns:
+            tuple: (busy, wal_frames, checkpointed_frames) as reported by SQLite.
+
+        Raises:
+            sqlite3.OperationalError: if readers or writers kept the checkpoint from
+            completing (busy), i.e. the main file is still missing recent writes.
+        """
+        busy, wal_frames, checkpointed = self.connection().execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            raise sqlite3.OperationalError(
+                f"WAL checkpoint incomplete ({checkpointed}/{wal_frames} frames copied); database busy"
+            )
+        return busy, wal_frames, checkpointed
+
+    def close_all(self):
+        """Close every idle connection (leased ones are closed when returned)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self):
+        with self._cond:
+            return {**self.stats, "open": self._opened, "idle": len(self._idle), "max_size": self.max_size}
+
+
+pool = ConnectionManager(DB_FILE)
+
+
 def get_connection():
-    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return PooledConnection(pool.lease())
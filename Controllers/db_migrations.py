@@ -0,0 +1,467 @@
+# db_migrations.py
+# Versioned schema changes applied on top of the base schema from
+# Others/create_database.ipynb. The applied version is tracked with
+# PRAGMA user_version; each entry runs once, in order, in one transaction.
+import sqlite3
+
+# League-table bookkeeping for one side of a finished match (used by migration #10).
+# {row} is OLD or NEW, {team} the side's team column, {gf}/{ga} its goals for/against.
+_LEAGUE_SIDE_REMOVE = """
+        UPDATE league_table
+        SET played = played - 1,
+            wins = wins - COALESCE({row}.{gf} > {row}.{ga}, 0),
+            draws = draws - COALESCE({row}.{gf} = {row}.{ga}, 0),
+            losses = losses - COALESCE({row}.{gf} < {row}.{ga}, 0),
+            goals_for = goals_for - COALESCE({row}.{gf}, 0),
+            goals_against = goals_against - COALESCE({row}.{ga}, 0),
+            points = points - 3 * COALESCE({row}.{gf} > {row}.{ga}, 0) - COALESCE({row}.{gf} = {row}.{ga}, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE {row}.status = 'finished' AND league_id = {row}.league_id AND team_id = {row}.{team};
+"""
+_LEAGUE_SIDE_ADD = """
+        INSERT INTO league_table (league_id, team_id, played, wins, draws, losses, goals_for, goals_against, points)
+        SELECT {row}.league_id, {row}.{team}, 1,
+               COALESCE({row}.{gf} > {row}.{ga}, 0),
+               COALESCE({row}.{gf} = {row}.{ga}, 0),
+               COALESCE({row}.{gf} < {row}.{ga}, 0),
+               COALESCE({row}.{gf}, 0),
+               COALESCE({row}.{ga}, 0),
+               3 * COALESCE({row}.{gf} > {row}.{ga}, 0) + COALESCE({row}.{gf} = {row}.{ga}, 0)
+        WHERE {row}.status = 'finished' AND {row}.league_id IS NOT NULL AND {row}.{team} IS NOT NULL
+        ON CONFLICT (league_id, team_id) DO UPDATE
+        SET played = played + excluded.played,
+            wins = wins + excluded.wins,
+            draws = draws + excluded.draws,
+            losses = losses + excluded.losses,
+            goals_for = goals_for + excluded.goals_for,
+            goals_against = goals_against + excluded.goals_against,
+            points = points + excluded.points,
+            updated_at = CURRENT_TIMESTAMP;
+"""
+_LEAGUE_VERSION_BUMP = """
+        INSERT INTO change_versions (name, version) SELECT 'league_table:' || {row}.league_id, 1
+        WHERE {row}.league_id IS NOT NULL
+        ON CONFLICT (name) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP;
+"""
+
+
+def _league_table_changes(row, apply):
+    """Both sides of a match, plus the league's version bump."""
+    template = _LEAGUE_SIDE_ADD if apply else _LEAGUE_SIDE_REMOVE
+    return (
+        template.format(row=row, team="home_team_id", gf="home_score", ga="away_score")
+        + template.format(row=row, team="away_team_id", gf="away_score", ga="home_score")
+        + _LEAGUE_VERSION_BUMP.format(row=row)
+    )
+
+
+# Version bump for one reference table (used by migration #11); `columns` narrows
+# the UPDATE trigger to the columns the reference cache actually reads.
+_VERSION_TRIGGERS = """
+    INSERT OR IGNORE INTO change_versions (name, version) VALUES ('{table}', 0);
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_ins AFTER INSERT ON {table} BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = '{table}';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_upd AFTER UPDATE{of} ON {table} BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = '{table}';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_del AFTER DELETE ON {table} BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = '{table}';
+    END;
+"""
+
+
+def _version_triggers(table, columns=None):
+    return _VERSION_TRIGGERS.format(table=table, of=f" OF {', '.join(columns)}" if columns else "")
+
+
+# Keeps one table's rows mirrored in search_index (migration #13). Each source
+# row owns rowid = id * 4 + {code}, so updates and deletes touch the FTS table by
+# rowid instead of scanning it. {name}/{aliases}/{detail} are SQL over {row}.
+_SEARCH_ROW_INSERT = """
+        INSERT INTO search_index (rowid, name, aliases, kind, ref_id, detail)
+        VALUES ({row}.id * 4 + {code}, {name}, {aliases}, '{kind}', {row}.id, {detail});
+"""
+_SEARCH_TRIGGERS = """
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_search_ins AFTER INSERT ON {table} BEGIN{insert_new}    END;
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_search_upd AFTER UPDATE OF {columns} ON {table} BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + {code};{insert_new}    END;
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_search_del AFTER DELETE ON {table} BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 4 + {code};
+    END;
+    INSERT INTO search_index (rowid, name, aliases, kind, ref_id, detail)
+    SELECT {table}.id * 4 + {code}, {name}, {aliases}, '{kind}', {table}.id, {detail} FROM {table};
+"""
+
+
+def _search_triggers(table, code, kind, columns, name, aliases, detail):
+    def over(row):
+        return {"code": code, "kind": kind, "row": row, "name": name.format(row=row),
+                "aliases": aliases.format(row=row), "detail": detail.format(row=row)}
+
+    return _SEARCH_TRIGGERS.format(
+        table=table, columns=", ".join(columns), insert_new=_SEARCH_ROW_INSERT.format(**over("NEW")),
+        **{k: v for k, v in over(table).items() if k != "row"}
+    )
+
+
+MIGRATIONS = [
+    # 1 — change-version counters so clients can poll for fresh data cheaply
+    """
+    CREATE TABLE IF NOT EXISTS change_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT OR IGNORE INTO change_versions (name, version) VALUES ('matches', 0), ('rounds', 0);
+
+    CREATE TRIGGER IF NOT EXISTS trg_matches_version_ins AFTER INSERT ON matches BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'matches';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_matches_version_upd AFTER UPDATE ON matches BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'matches';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_matches_version_del AFTER DELETE ON matches BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'matches';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_rounds_version_ins AFTER INSERT ON rounds BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'rounds';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_rounds_version_upd AFTER UPDATE ON rounds BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'rounds';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_rounds_version_del AFTER DELETE ON rounds BEGIN
+        UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'rounds';
+    END;
+    """,
+
+    # 2 — materialized leaderboard kept in sync by triggers on predictions / players
+    """
+    CREATE TABLE IF NOT EXISTS standings (
+        player_id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        prediction_points INTEGER NOT NULL DEFAULT 0,
+        bonus INTEGER NOT NULL DEFAULT 0,
+        total_points INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (player_id) REFERENCES players(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_standings_rank ON standings (total_points DESC, username ASC);
+
+    INSERT OR REPLACE INTO standings (player_id, username, prediction_points, bonus, total_points)
+    SELECT p.id, p.username,
+           COALESCE(SUM(pr.score), 0),
+           COALESCE(p.bonous, 0),
+           COALESCE(SUM(pr.score), 0) + COALESCE(p.bonous, 0)
+    FROM players p
+    LEFT JOIN predictions pr ON pr.player_id = p.id
+    GROUP BY p.id;
+
+    CREATE TRIGGER IF NOT EXISTS trg_standings_player_ins AFTER INSERT ON players BEGIN
+        INSERT OR REPLACE INTO standings (player_id, username, prediction_points, bonus, total_points)
+        VALUES (NEW.id, NEW.username, 0, COALESCE(NEW.bonous, 0), COALESCE(NEW.bonous, 0));
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_standings_player_del AFTER DELETE ON players BEGIN
+        DELETE FROM standings WHERE player_id = OLD.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_standings_player_upd AFTER UPDATE OF username, bonous ON players BEGIN
+        UPDATE standings
+        SET username = NEW.username,
+            bonus = COALESCE(NEW.bonous, 0),
+            total_points = prediction_points + COALESCE(NEW.bonous, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE player_id = NEW.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_standings_pred_ins AFTER INSERT ON predictions BEGIN
+        UPDATE standings
+        SET prediction_points = prediction_points + COALESCE(NEW.score, 0),
+            total_points = total_points + COALESCE(NEW.score, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE player_id = NEW.player_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_standings_pred_del AFTER DELETE ON predictions BEGIN
+        UPDATE standings
+        SET prediction_points = prediction_points - COALESCE(OLD.score, 0),
+            total_points = total_points - COALESCE(OLD.score, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE player_id = OLD.player_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_standings_pred_upd AFTER UPDATE OF score, player_id ON predictions
+    WHEN OLD.score IS NOT NEW.score OR OLD.player_id IS NOT NEW.player_id BEGIN
+        UPDATE standings
+        SET prediction_points = prediction_points - COALESCE(OLD.score, 0),
+            total_points = total_points - COALESCE(OLD.score, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE player_id = OLD.player_id;
+        UPDATE standings
+        SET prediction_points = prediction_points + COALESCE(NEW.score, 0),
+            total_points = total_points + COALESCE(NEW.score, 0),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE player_id = NEW.player_id;
+    END;
+    """,
+
+    # 3 — incremental match sync: HTTP validators per request, content hash per match
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        key TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        synced_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    ALTER TABLE matches ADD COLUMN content_hash TEXT;
+    CREATE INDEX IF NOT EXISTS idx_matches_api_match_id ON matches (api_match_id);
+    """,
+
+    # 4 — lets the status ticker find kicked-off matches without a table scan
+    """
+    CREATE INDEX IF NOT EXISTS idx_matches_status_datetime ON matches (status, match_datetime);
+    """,
+
+    # 5 — index pack for the hot access paths (round / league / team pages, scoring);
+    # check with `python check_query_plans.py`
+    """
+    CREATE INDEX IF NOT EXISTS idx_matches_round ON matches (round_id, is_predictable, match_datetime);
+    CREATE INDEX IF NOT EXISTS idx_matches_league ON matches (league_id, match_datetime);
+    CREATE INDEX IF NOT EXISTS idx_matches_home_team ON matches (home_team_id, match_datetime);
+    CREATE INDEX IF NOT EXISTS idx_matches_away_team ON matches (away_team_id, match_datetime);
+    CREATE INDEX IF NOT EXISTS idx_matches_predictable ON matches (is_predictable, match_datetime);
+    CREATE INDEX IF NOT EXISTS idx_matches_datetime ON matches (match_datetime);
+    CREATE INDEX IF NOT EXISTS idx_predictions_match ON predictions (match_id, player_id, score);
+    CREATE INDEX IF NOT EXISTS idx_football_player_team ON football_player (team_id, position);
+    CREATE INDEX IF NOT EXISTS idx_coaches_team ON coaches (team_id);
+    CREATE INDEX IF NOT EXISTS idx_team_competitions_league ON team_competitions (league_id);
+    ANALYZE;
+    """,
+
+    # 6 — persistent queue for background admin jobs (Controllers/job_runner.py)
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL DEFAULT 'queued'
+            CHECK (status IN ('queued', 'running', 'done', 'failed', 'cancelled')),
+        progress_done INTEGER NOT NULL DEFAULT 0,
+        progress_total INTEGER NOT NULL DEFAULT 0,
+        message TEXT,
+        checkpoint TEXT NOT NULL DEFAULT '{}',
+        result TEXT,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        run_started_ts REAL,
+        run_start_done INTEGER NOT NULL DEFAULT 0,
+        heartbeat_ts REAL,
+        finished_ts REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+    """,
+
+    # 7 — result hash per scored match, so season rescoring skips unchanged matches;
+    # any change to a match's predictions forgets the hash
+    """
+    CREATE TABLE IF NOT EXISTS match_scoring (
+        match_id INTEGER PRIMARY KEY,
+        result_hash TEXT NOT NULL,
+        scored_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (match_id) REFERENCES matches(id) ON DELETE CASCADE
+    );
+    CREATE TRIGGER IF NOT EXISTS trg_match_scoring_pred_ins AFTER INSERT ON predictions BEGIN
+        DELETE FROM match_scoring WHERE match_id = NEW.match_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_match_scoring_pred_upd
+    AFTER UPDATE OF predicted_home_score, predicted_away_score, predicted_penalty_winner_id, match_id ON predictions
+    BEGIN
+        DELETE FROM match_scoring WHERE match_id IN (OLD.match_id, NEW.match_id);
+    END;
+    """,
+
+    # 8 — durable outbox for outgoing e-mail (Controllers/mailer.py)
+    """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        dedupe_key TEXT UNIQUE,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        body TEXT NOT NULL,
+        subtype TEXT NOT NULL DEFAULT 'plain' CHECK(subtype IN ('plain', 'html')),
+        status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending', 'sending', 'sent', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        next_attempt_ts REAL NOT NULL DEFAULT 0,
+        claimed_ts REAL,
+        sent_ts REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_email_outbox_status ON email_outbox (status, next_attempt_ts);
+    """,
+
+    # 9 — one row per (round, reminder level) fired by Controllers/reminder_scheduler.py
+    """
+    CREATE TABLE IF NOT EXISTS reminder_log (
+        round_id INTEGER NOT NULL,
+        level TEXT NOT NULL,
+        deadline TEXT NOT NULL,
+        status TEXT NOT NULL CHECK(status IN ('claimed', 'sent', 'skipped')),
+        claimed_ts REAL NOT NULL,
+        finished_ts REAL,
+        report TEXT,
+        PRIMARY KEY (round_id, level),
+        FOREIGN KEY (round_id) REFERENCES rounds(id) ON DELETE CASCADE
+    );
+    """,
+
+    # 10 — materialized league tables, one row per (league, team) with finished-match
+    # totals; triggers on matches touch only the two teams of a changed result
+    """
+    CREATE TABLE IF NOT EXISTS league_table (
+        league_id INTEGER NOT NULL,
+        team_id INTEGER NOT NULL,
+        played INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        draws INTEGER NOT NULL DEFAULT 0,
+        losses INTEGER NOT NULL DEFAULT 0,
+        goals_for INTEGER NOT NULL DEFAULT 0,
+        goals_against INTEGER NOT NULL DEFAULT 0,
+        points INTEGER NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (league_id, team_id)
+    );
+
+    INSERT OR REPLACE INTO league_table (league_id, team_id, played, wins, draws, losses, goals_for, goals_against, points)
+    SELECT league_id, team_id, COUNT(*),
+           SUM(COALESCE(gf > ga, 0)), SUM(COALESCE(gf = ga, 0)), SUM(COALESCE(gf < ga, 0)),
+           SUM(COALESCE(gf, 0)), SUM(COALESCE(ga, 0)),
+           SUM(3 * COALESCE(gf > ga, 0) + COALESCE(gf = ga, 0))
+    FROM (
+        SELECT league_id, home_team_id AS team_id, home_score AS gf, away_score AS ga
+        FROM matches WHERE status = 'finished'
+        UNION ALL
+        SELECT league_id, away_team_id, away_score, home_score
+        FROM matches WHERE status = 'finished'
+    )
+    WHERE league_id IS NOT NULL AND team_id IS NOT NULL
+    GROUP BY league_id, team_id;
+
+    CREATE TRIGGER IF NOT EXISTS trg_league_table_match_ins AFTER INSERT ON matches
+    WHEN NEW.status = 'finished' BEGIN
+""" + _league_table_changes("NEW", apply=True) + """
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_league_table_match_del AFTER DELETE ON matches
+    WHEN OLD.status = 'finished' BEGIN
+""" + _league_table_changes("OLD", apply=False) + """
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_league_table_match_upd AFTER UPDATE ON matches
+    WHEN (OLD.status = 'finished' OR NEW.status = 'finished')
+     AND (OLD.status IS NOT NEW.status
+          OR OLD.home_score IS NOT NEW.home_score OR OLD.away_score IS NOT NEW.away_score
+          OR OLD.league_id IS NOT NEW.league_id
+          OR OLD.home_team_id IS NOT NEW.home_team_id OR OLD.away_team_id IS NOT NEW.away_team_id)
+    BEGIN
+""" + _league_table_changes("OLD", apply=False) + _league_table_changes("NEW", apply=True) + """
+    END;
+    """,
+
+    # 11 — version counters for the reference data held by Controllers/reference_cache.py
+    _version_triggers("leagues")
+    + _version_triggers("teams")
+    + _version_triggers("stages")
+    + _version_triggers("players", columns=("username", "timezone")),
+
+    # 12 — Teams tab: nationality filter + name-ordered keyset pages
+    """
+    CREATE INDEX IF NOT EXISTS idx_teams_nationality_name ON teams (nationality, name);
+    """,
+
+    # 13 — search box: FTS5 index over teams, football players and leagues
+    #      (read by Controllers/utils_search.py), plus a case-insensitive team-name lookup
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        name, aliases, kind UNINDEXED, ref_id UNINDEXED, detail UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '3'
+    );
+    CREATE INDEX IF NOT EXISTS idx_teams_name_nocase ON teams (name COLLATE NOCASE);
+    """
+    + _search_triggers(
+        "teams", 1, "team", ("name", "official_name", "tla", "nationality"),
+        name="{row}.name",
+        aliases="COALESCE({row}.official_name, '') || ' ' || COALESCE({row}.tla, '')",
+        detail="{row}.nationality",
+    )
+    + _search_triggers(
+        "football_player", 2, "player", ("name", "team_name", "position"),
+        name="{row}.name",
+        aliases="''",
+        detail="TRIM(COALESCE({row}.position, '') || ' · ' || COALESCE({row}.team_name, ''), ' ·')",
+    )
+    + _search_triggers(
+        "leagues", 3, "league", ("name", "code", "Trade_Name", "country"),
+        name="{row}.name",
+        aliases="COALESCE({row}.code, '') || ' ' || COALESCE({row}.Trade_Name, '')",
+        detail="{row}.country",
+    ),
+
+    # 14 — integer UTC epochs next to the stored text (Controllers/time_service.py);
+    #      generated columns, so every writer keeps them in step without changes
+    """
+    ALTER TABLE matches ADD COLUMN match_ts INTEGER
+        GENERATED ALWAYS AS (CAST(strftime('%s', match_datetime) AS INTEGER)) VIRTUAL;
+    ALTER TABLE rounds ADD COLUMN deadline_ts INTEGER
+        GENERATED ALWAYS AS (CAST(strftime('%s', prediction_deadline) AS INTEGER)) VIRTUAL;
+    DROP INDEX IF EXISTS idx_matches_status_datetime;
+    CREATE INDEX IF NOT EXISTS idx_matches_status_ts ON matches (status, match_ts);
+    CREATE INDEX IF NOT EXISTS idx_rounds_deadline_ts ON rounds (deadline_ts);
+    """,
+]
+
+
+def _split_statements(script):
+    """Split a migration script into complete statements (trigger bodies included)."""
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """
+    Bring the database up to the latest schema version.
+
+    Returns:
+        int: Number of migrations applied.
+    """
+    current = get_schema_version(conn)
+    applied = 0
+    for version, script in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for statement in _split_statements(script):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            applied += 1
+        except Exception:
+            conn.rollback()
+            raise
+    return applied
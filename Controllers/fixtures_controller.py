@@ -1,10 +1,14 @@
 import os
-from Controllers.utils import fetch_one, fetch_all, execute_query 
+from Controllers.utils import fetch_one, fetch_all, execute_query, fetch_models
+from Controllers.models import Match
+from Controllers.reference_cache import cached_reference
+from config import FIXTURES_PAGE_SIZE
 import datetime
 from datetime import datetime
 from Controllers.db_controller import get_connection
 import logging
 
+@cached_reference("leagues")
 def get_logo_path_from_league(league_name: str) -> str:
     """
     Given a league name, return the relative logo path if it exists.
@@ -30,20 +34,58 @@ def get_logo_path_from_league(league_name: str) -> str:
     finally:
         conn.close()
         
-def get_upcoming_fixtures_grouped():
+def get_fixture_dates():
+    """
+    Every date (YYYY-MM-DD) that has at least one match, ascending.
+
+    Walks idx_matches_datetime one date at a time (each step is an index seek
+    for the first kick-off after the previous day), so the cost grows with the
+    number of match days rather than the number of matches.
+    """
+    rows = fetch_all("""
+        WITH RECURSIVE days(day) AS (
+            SELECT DATE(MIN(match_datetime)) FROM matches
+            UNION ALL
+            SELECT (
+                SELECT DATE(MIN(match_datetime)) FROM matches
+                WHERE match_datetime >= DATE(day, '+1 day')
+            )
+            FROM days
+            WHERE day IS NOT NULL
+        )
+        SELECT day FROM days WHERE day IS NOT NULL
+    """)
+    return [row[0] for row in rows]
+
+
+def get_fixtures_for_date(match_date, after=None, limit=FIXTURES_PAGE_SIZE):
+    """
+    One page of a day's fixtures, ordered by league then kick-off.
+
+    Args:
+        match_date (str): Day to load, 'YYYY-MM-DD'.
+        after (tuple): Keyset cursor returned by the previous page, or None for the first page.
+        limit (int): Page size.
+
+    Returns:
+        tuple: ({league_name: [Match, ...]}, next_cursor or None when this is the last page)
+    """
+    after = after or ("", "", 0)
     query = """
         SELECT 
+            m.id,
             DATE(m.match_datetime) AS match_date,
             l.name AS league_name,
             l.country AS nationality,
             s.name AS stage_name,
             m.matchday,
             m.match_datetime,
+            m.match_ts,
             m.status,
             m.api_match_id AS match_id,
             m.home_score,
             m.away_score,
-            m.Venue_name,
+            m.Venue_Name,
             ht.name AS home_team,
             at.name AS away_team,
             ht.color AS home_color,
@@ -55,25 +97,25 @@ def get_upcoming_fixtures_grouped():
         JOIN teams ht ON m.home_team_id = ht.id
         JOIN teams at ON m.away_team_id = at.id
         LEFT JOIN stages s ON m.stage_id = s.id
-        ORDER BY match_date ASC, l.name ASC, m.match_datetime ASC
+        WHERE m.match_datetime >= ? AND m.match_datetime < DATE(?, '+1 day')
+          AND (l.name, m.match_datetime, m.id) > (?, ?, ?)
+        ORDER BY l.name ASC, m.match_datetime ASC, m.id ASC
+        LIMIT ?
     """
-    rows = fetch_all(query)
+    # One extra row tells us whether another page exists
+    matches = fetch_models(Match, query, (match_date, match_date, *after, limit + 1))
+    has_more = len(matches) > limit
+    matches = matches[:limit]
 
     grouped = {}
-    for row in rows:
-        match_date = row["match_date"]
-        league = row["league_name"]
-
-        if match_date not in grouped:
-            grouped[match_date] = {}
-
-        if league not in grouped[match_date]:
-            grouped[match_date][league] = []
-
-        grouped[match_date][league].append(dict(row))
+    for match in matches:
+        grouped.setdefault(match.league_name, []).append(match)
 
-    return grouped
+    last = matches[-1] if matches else None
+    next_cursor = (last.league_name, last.match_datetime, last.id) if has_more else None
+    return grouped, next_cursor
 
+@cached_reference("leagues")
 def get_league_dates(league_name):
     query = """
         SELECT start_date, end_date
@@ -0,0 +1,384 @@
+# job_runner.py
+# Background jobs for long admin operations (team/player refresh, match
+# fetching, rescoring). Jobs live in the `jobs` table, so they survive browser
+# disconnects and restarts; a separate runner process with a small pool of
+# worker processes executes them.
+#
+#   python -m Controllers.job_runner      # run the workers in the foreground
+#
+# The admin page calls ensure_runner(), which starts it detached if needed.
+import os
+import sys
+import json
+import time
+import signal
+import sqlite3
+import threading
+import subprocess
+import multiprocessing
+
+from Controllers.db_controller import pool
+from Controllers.utils import fetch_one, fetch_all, execute_query
+from config import JOB_WORKERS, JOB_POLL_SECONDS, JOB_STALE_SECONDS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNNER_PID_FILE = os.path.join(PROJECT_ROOT, "logs", "job_runner.pid")
+RUNNER_LOG_FILE = os.path.join(PROJECT_ROOT, "logs", "job_runner.log")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when an admin asked to cancel it."""
+
+
+# ------------------- Queue ------------------- #
+
+def enqueue(kind, params=None):
+    """Queue a job and make sure a runner is up. Returns the job id."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    _, cur = execute_query(
+        "INSERT INTO jobs (kind, params) VALUES (?, ?)",
+        (kind, json.dumps(params or {}))
+    )
+    job_id = cur.lastrowid
+    cur.close()
+    ensure_runner()
+    return job_id
+
+
+def _with_eta(row):
+    job = dict(row)
+    job["params"] = json.loads(job["params"] or "{}")
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["eta_seconds"] = None
+    done, total = job["progress_done"], job["progress_total"]
+    if job["status"] == "running" and job["run_started_ts"] and total:
+        progressed = done - job["run_start_done"]
+        elapsed = time.time() - job["run_started_ts"]
+        if progressed > 0:
+            job["eta_seconds"] = elapsed / progressed * (total - done)
+    return job
+
+
+def get_job(job_id):
+    row = fetch_one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+    return _with_eta(row) if row else None
+
+
+def list_jobs(limit=10):
+    """Most recent jobs first, each with params/result decoded and an ETA for running ones."""
+    return [_with_eta(row) for row in fetch_all("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,))]
+
+
+def has_active_job(kind):
+    placeholders = ", ".join("?" for _ in ACTIVE_STATUSES)
+    row = fetch_one(
+        f"SELECT 1 FROM jobs WHERE kind = ? AND status IN ({placeholders}) LIMIT 1",
+        (kind, *ACTIVE_STATUSES)
+    )
+    return row is not None
+
+
+def request_cancel(job_id):
+    """Cancel a queued job right away; ask a running one to stop at its next progress step."""
+    execute_query("""
+        UPDATE jobs
+        SET status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+            cancel_requested = CASE WHEN status = 'running' THEN 1 ELSE cancel_requested END,
+            finished_ts = CASE WHEN status = 'queued' THEN ? ELSE finished_ts END
+        WHERE id = ? AND status IN ('queued', 'running')
+    """, (time.time(), job_id))
+
+
+def resume_job(job_id):
+    """Re-queue a failed or cancelled job; it continues from its checkpoint."""
+    execute_query("""
+        UPDATE jobs
+        SET status = 'queued', cancel_requested = 0, error = NULL, finished_ts = NULL
+        WHERE id = ? AND status IN ('failed', 'cancelled')
+    """, (job_id,))
+    ensure_runner()
+
+
+def requeue_stale_jobs(stale_after=JOB_STALE_SECONDS):
+    """Jobs whose worker stopped heart-beating go back to the queue (and resume)."""
+    _, cur = execute_query("""
+        UPDATE jobs SET status = 'queued', worker = NULL
+        WHERE status = 'running' AND heartbeat_ts < ?
+    """, (time.time() - stale_after,))
+    count = cur.rowcount
+    cur.close()
+    return count
+
+
+def claim_next_job(worker):
+    """Atomically move the oldest queued job to running. Returns the job dict or None."""
+    conn = pool.connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        now = time.time()
+        conn.execute("""
+            UPDATE jobs
+            SET status = 'running', worker = ?, run_started_ts = ?, run_start_done = progress_done,
+                heartbeat_ts = ?
+            WHERE id = ?
+        """, (worker, now, now, row["id"]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return get_job(row["id"])
+
+
+# ------------------- Job context ------------------- #
+
+class JobContext:
+    """
+    Handed to every job handler. Doubles as a checkpoint (remaining / mark_done /
+    flush / clear, like api_client.JobCheckpoint) stored in the job row, and
+    report() publishes progress and raises JobCancelled when asked to stop.
+    """
+
+    def __init__(self, job, report_interval=1.0, flush_every=25):
+        self.job_id = job["id"]
+        self.params = job["params"]
+        checkpoint = json.loads(job["checkpoint"] or "{}")
+        self.done = set(checkpoint.get("done", []))
+        self.state = checkpoint.get("state", {})
+        self.report_interval = report_interval
+        self.flush_every = flush_every
+        self._pending = 0
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    # --- checkpoint protocol ---
+    def remaining(self, ids):
+        return [i for i in ids if i not in self.done]
+
+    def mark_done(self, item_id):
+        with self._lock:
+            self.done.add(item_id)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        execute_query(
+            "UPDATE jobs SET checkpoint = ?, heartbeat_ts = ? WHERE id = ?",
+            (json.dumps({"done": sorted(self.done), "state": self.state}), time.time(), self.job_id)
+        )
+        self._pending = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def clear(self):
+        # Keep the record until the job finishes; run_job() wipes it on success.
+        self.flush()
+
+    # --- progress ---
+    def report(self, done, total, message=None, force=False):
+        now = time.time()
+        if not force and now - self._last_report < self.report_interval and done < total:
+            return
+        self._last_report = now
+        execute_query("""
+            UPDATE jobs SET progress_done = ?, progress_total = ?, message = ?, heartbeat_ts = ?
+            WHERE id = ?
+        """, (done, total, message, now, self.job_id))
+        if self.cancel_requested():
+            raise JobCancelled()
+
+    def cancel_requested(self):
+        row = fetch_one("SELECT cancel_requested FROM jobs WHERE id = ?", (self.job_id,))
+        return bool(row and row[0])
+
+
+# ------------------- Handlers ------------------- #
+
+def _job_update_teams(ctx):
+    from Controllers.api_controller import refresh_teams
+    team_ids = [row[0] for row in fetch_all("SELECT id FROM teams")]
+    counters = refresh_teams(team_ids, ctx, report=ctx.report)
+    return counters
+
+
+def _job_update_players(ctx):
+    from Controllers.api_controller import refresh_players
+    player_ids = [row[0] for row in fetch_all("SELECT DISTINCT id FROM football_player")]
+    updated, failed = refresh_players(player_ids, ctx, report=ctx.report)
+    return {"updated": updated, "failed": failed}
+
+
+def _job_fetch_matches(ctx):
+    from Controllers.api_controller import fetch_league_matches, fix_all_prediction_deadlines
+    from Controllers.utils_prediction import update_scores_for_season
+    codes = ctx.params.get("leagues", [])
+    incremental = ctx.params.get("incremental", False)
+    counters = ctx.state.setdefault(
+        "counters", {"success": 0, "failed": 0, "changed": 0, "unchanged": 0, "not_modified": 0}
+    )
+    for code in ctx.remaining(codes):
+        fetch_league_matches(code, counters, len(codes), incremental=incremental)
+        ctx.mark_done(code)
+        ctx.flush()
+        ctx.report(len(ctx.done), len(codes), f"League {code}", force=True)
+    deadlines = fix_all_prediction_deadlines(notify=False)
+    deltas = update_scores_for_season()
+    return {**counters, "rounds_updated": deadlines, "players_rescored": len(deltas)}
+
+
+def _job_calculate_points(ctx):
+    from Controllers.utils_prediction import recalculate_all_points
+    ctx.report(0, 1, "Rescoring season", force=True)
+    stats = recalculate_all_points(force=ctx.params.get("force", False))
+    deltas = stats.pop("deltas")
+    ctx.report(1, 1, f"{stats['predictions_scanned']} predictions in {stats['seconds']}s", force=True)
+    return {**stats, "players_rescored": len(deltas)}
+
+
+# kind → (label, handler)
+JOB_HANDLERS = {
+    "update_teams": ("🧠 Update Team Info", _job_update_teams),
+    "update_players": ("👟 Update Player Info", _job_update_players),
+    "fetch_matches": ("📅 Fetch Matches & Scores", _job_fetch_matches),
+    "calculate_points": ("📊 Calculate Match Points", _job_calculate_points),
+}
+
+
+# ------------------- Workers ------------------- #
+
+def _heartbeat(job_id, stop):
+    while not stop.wait(10):
+        try:
+            execute_query("UPDATE jobs SET heartbeat_ts = ? WHERE id = ?", (time.time(), job_id))
+        except sqlite3.Error as e:
+            # The job itself may hold the write lock (e.g. rescoring); a missed
+            # beat is fine, a dead heartbeat would get the job requeued while running
+            print(f"⚠️ Job {job_id}: heartbeat skipped: {e}")
+        finally:
+            pool.release_thread()   # don't hold a pooled connection between beats
+
+
+def run_job(job):
+    ctx = JobContext(job)
+    _, handler = JOB_HANDLERS[job["kind"]]
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job["id"], stop), daemon=True).start()
+    try:
+        result = handler(ctx)
+    except JobCancelled:
+        ctx.flush()
+        status, result, error = "cancelled", None, None
+    except Exception as e:
+        ctx.flush()
+        status, result, error = "failed", None, f"{type(e).__name__}: {e}"
+    else:
+        status, error = "done", None
+    finally:
+        stop.set()
+
+    execute_query("""
+        UPDATE jobs
+        SET status = ?, result = ?, error = ?, finished_ts = ?, heartbeat_ts = ?,
+            progress_done = CASE WHEN ? = 'done' THEN MAX(progress_done, progress_total) ELSE progress_done END,
+            checkpoint = CASE WHEN ? = 'done' THEN '{}' ELSE checkpoint END
+        WHERE id = ?
+    """, (status, json.dumps(result) if result is not None else None, error,
+          time.time(), time.time(), status, status, job["id"]))
+    print(f"{'✅' if status == 'done' else '⚠️'} Job {job['id']} ({job['kind']}) {status}" + (f": {error}" if error else ""))
+    return status
+
+
+def worker_loop(name, poll_seconds=JOB_POLL_SECONDS):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl+C
+    print(f"👷 {name} started (pid {os.getpid()})")
+    while True:
+        try:
+            requeue_stale_jobs()
+            job = claim_next_job(name)
+        except Exception as e:
+            print(f"❌ {name}: could not claim a job: {e}")
+            job = None
+        if job is None:
+            time.sleep(poll_seconds)
+            continue
+        run_job(job)
+
+
+def _stop_runner(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_runner(workers=JOB_WORKERS):
+    """Start `workers` worker processes and restart any that die."""
+    os.makedirs(os.path.dirname(RUNNER_PID_FILE), exist_ok=True)
+    with open(RUNNER_PID_FILE, "w") as f:
+        f.write(str(os.getpid()))
+    signal.signal(signal.SIGTERM, _stop_runner)
+
+    # spawn, not fork: every worker opens its own SQLite connections
+    ctx = multiprocessing.get_context("spawn")
+    procs = {}
+    try:
+        while True:
+            for i in range(workers):
+                proc = procs.get(i)
+                if proc is None or not proc.is_alive():
+                    proc = ctx.Process(target=worker_loop, args=(f"worker-{i}",), daemon=True)
+                    proc.start()
+                    procs[i] = proc
+            os.utime(RUNNER_PID_FILE)  # liveness signal for ensure_runner()
+            time.sleep(JOB_POLL_SECONDS)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs.values():
+            proc.terminate()
+        if os.path.exists(RUNNER_PID_FILE):
+            os.remove(RUNNER_PID_FILE)
+
+
+def _runner_alive():
+    """The runner touches its pid file every poll; a fresh file means it is up."""
+    try:
+        return time.time() - os.path.getmtime(RUNNER_PID_FILE) < max(JOB_STALE_SECONDS, JOB_POLL_SECONDS * 5)
+    except OSError:
+        return False
+
+
+_spawn_lock = threading.Lock()
+
+
+def ensure_runner():
+    """Start the runner as a detached process unless one is already alive."""
+    with _spawn_lock:
+        if _runner_alive():
+            return False
+        os.makedirs(os.path.dirname(RUNNER_LOG_FILE), exist_ok=True)
+        log = open(RUNNER_LOG_FILE, "a", encoding="utf-8")
+        detach = (
+            {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt"
+            else {"start_new_session": True}
+        )
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "Controllers.job_runner"],
+            cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            **detach,
+        )
+        # Claim the pid file right away so concurrent reruns don't start a second runner
+        with open(RUNNER_PID_FILE, "w") as f:
+            f.write(str(proc.pid))
+        return True
+
+
+if __name__ == "__main__":
+    # Import through the package so spawned workers can pickle worker_loop
+    from Controllers.job_runner import run_runner as _run_runner
+    _run_runner()
@@ -2,40 +2,118 @@ from Controllers.db_controller import get_connection
 from Controllers.utils import fetch_all, fetch_one
 import os
 
-def get_player_info(player_id):
+# 🏆 The `standings` table (db_migrations #2) holds one row per player with
+# prediction points + bonus already summed. Triggers on `predictions` and
+# `players` keep it current, so reads here never aggregate predictions.
+
+
+def get_leaderboard(limit=None, offset=0):
+    """
+    Players ordered by total points (ties broken by username).
+
+    Returns:
+        list: Rows of (id, username, avatar_name, total_points, total_leagues_won, total_cups_won).
+    """
+    query = """
+        SELECT s.player_id AS id, s.username, p.avatar_name, s.total_points,
+               p.total_leagues_won, p.total_cups_won
+        FROM standings s
+        JOIN players p ON p.id = s.player_id
+        ORDER BY s.total_points DESC, s.username ASC
+    """
+    params = ()
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params = (limit, offset)
+    return fetch_all(query, params)
+
+
+def get_player_rank(player_id):
+    """
+    1-based leaderboard position of a player, or None if unknown.
+    Both counts are range scans on idx_standings_rank.
+    """
+    row = fetch_one("SELECT total_points, username FROM standings WHERE player_id = ?", (player_id,))
+    if not row:
+        return None
+    total_points, username = row
+    ahead = fetch_one("""
+        SELECT
+            (SELECT COUNT(*) FROM standings WHERE total_points > ?) +
+            (SELECT COUNT(*) FROM standings WHERE total_points = ? AND username < ?)
+    """, (total_points, total_points, username))
+    return ahead[0] + 1
+
+
+def rebuild_standings():
+    """
+    Recompute every standings row from predictions + bonus and fix any drift.
+
+    Returns:
+        dict: {"players": rows checked, "fixed": rows that were wrong or missing, "removed": stale rows}
+    """
     conn = get_connection()
     cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("""
+            CREATE TEMP TABLE expected_standings AS
+            SELECT p.id AS player_id, p.username,
+                   COALESCE(SUM(pr.score), 0) AS prediction_points,
+                   COALESCE(p.bonous, 0) AS bonus
+            FROM players p
+            LEFT JOIN predictions pr ON pr.player_id = p.id
+            GROUP BY p.id
+        """)
+        cur.execute("""
+            SELECT COUNT(*) FROM expected_standings e
+            LEFT JOIN standings s ON s.player_id = e.player_id
+            WHERE s.player_id IS NULL
+               OR s.username IS NOT e.username
+               OR s.prediction_points != e.prediction_points
+               OR s.bonus != e.bonus
+               OR s.total_points != e.prediction_points + e.bonus
+        """)
+        fixed = cur.fetchone()[0]
+        cur.execute("DELETE FROM standings WHERE player_id NOT IN (SELECT player_id FROM expected_standings)")
+        removed = cur.rowcount
+        cur.execute("""
+            INSERT OR REPLACE INTO standings (player_id, username, prediction_points, bonus, total_points, updated_at)
+            SELECT player_id, username, prediction_points, bonus, prediction_points + bonus, CURRENT_TIMESTAMP
+            FROM expected_standings
+        """)
+        players = cur.rowcount
+        cur.execute("DROP TABLE expected_standings")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    return {"players": players, "fixed": fixed, "removed": removed}
 
-    # Fetch player info directly from the players table
-    cur.execute("""
-        SELECT 
-            id, 
-            username, 
-            email, 
-            avatar_name, 
-            created_at,
-            COALESCE(score + bonous, 0) AS total_points,
-            total_leagues_won,
-            total_cups_won
-        FROM players
-        WHERE id = ?
+
+def get_player_info(player_id):
+    row = fetch_one("""
+        SELECT
+            p.id,
+            p.username,
+            p.email,
+            p.avatar_name,
+            p.created_at,
+            COALESCE(s.total_points, 0) AS total_points,
+            p.total_leagues_won,
+            p.total_cups_won
+        FROM players p
+        LEFT JOIN standings s ON s.player_id = p.id
+        WHERE p.id = ?
     """, (player_id,))
-    
-    row = cur.fetchone()
-    conn.close()
 
     if not row:
         return None
 
-    # Fetch leaderboard to calculate rank
-    leaderboard = fetch_all("""
-        SELECT id, COALESCE(score + bonous, 0) AS total_points
-        FROM players
-        ORDER BY total_points DESC
-    """)
-
-    rank = next((index + 1 for index, entry in enumerate(leaderboard) if entry[0] == player_id), None)
-
     return {
         "id": row[0],
         "username": row[1],
@@ -45,5 +123,12 @@ def get_player_info(player_id):
         "total_points": row[5],
         "total_leagues_won": row[6],
         "total_cups_won": row[7],
-        "rank": rank
+        "rank": get_player_rank(player_id)
     }
+
+
+if __name__ == "__main__":
+    # 🔧 python -m Controllers.leaderboard_controller  → rebuild & report drift
+    report = rebuild_standings()
+    print(f"✅ Standings rebuilt for {report['players']} players "
+          f"({report['fixed']} fixed, {report['removed']} stale rows removed)")
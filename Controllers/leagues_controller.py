@@ -1,7 +1,10 @@
 from Controllers.db_controller import get_connection
-from Controllers.utils import fetch_all, fetch_one
+from Controllers.utils import fetch_all, fetch_one, fetch_models
+from Controllers.models import Match
+from Controllers.reference_cache import cached_reference
 
 # 1. Get all active leagues with type 'LEAGUE'
+@cached_reference("leagues")
 def get_active_leagues():
     query = """
         SELECT id, name, logo_path
@@ -13,6 +16,7 @@ def get_active_leagues():
 
 
 # 2. Get league by ID
+@cached_reference("leagues")
 def get_league_by_id(league_id):
     query = """
         SELECT * FROM leagues WHERE id = ?
@@ -24,15 +28,20 @@ def get_league_by_id(league_id):
 def get_fixtures_by_league(league_id):
     query = """
         SELECT 
+            m.id,
             m.id AS match_id, 
+            DATE(m.match_datetime) AS match_date,
             t1.name AS home_team, 
             t2.name AS away_team,
             m.match_datetime, 
+            m.match_ts,
             m.status, 
             m.home_score, 
             m.away_score, 
-            m.Venue_name, 
+            m.Venue_Name, 
             m.matchday,
+            t1.color AS home_color,
+            t2.color AS away_color,
             t1.logo_path AS home_logo, 
             t2.logo_path AS away_logo,
             l.country AS nationality, 
@@ -46,83 +55,114 @@ def get_fixtures_by_league(league_id):
         WHERE m.league_id = ?
         ORDER BY m.match_datetime ASC
     """
-    rows = fetch_all(query, (league_id,))
-    return [dict(row) for row in rows]  # convert each row to dict for easy access
+    return fetch_models(Match, query, (league_id,))
 
 
 
-# 4. Get league table from matches
-# Uses finished matches only and computes team points
-# 3 pts for win, 1 pt for draw, 0 pt for loss
+# 4. Get league table
+# Reads the `league_table` store (db_migrations #10): finished matches only,
+# 3 pts for win, 1 pt for draw, 0 pt for loss. Triggers on `matches` keep it
+# current, so this is a primary-key lookup per team, however many seasons are stored.
 
 def get_league_table(league_id, country):
     query = """
         SELECT
             t.id,
             t.name AS team_name,
-            -- Points
-            SUM(
-                CASE
-                    WHEN (m.home_team_id = t.id AND m.home_score > m.away_score) OR
-                        (m.away_team_id = t.id AND m.away_score > m.home_score) THEN 3
-                    WHEN m.home_score = m.away_score THEN 1
-                    ELSE 0
-                END
-            ) AS points,
-
-            -- Played games (count matches where team played)
-            COUNT(m.id) AS played,
-
-            -- Wins
-            SUM(
-                CASE
-                    WHEN (m.home_team_id = t.id AND m.home_score > m.away_score) OR
-                        (m.away_team_id = t.id AND m.away_score > m.home_score) THEN 1
-                    ELSE 0
-                END
-            ) AS wins,
-
-            -- Draws
-            SUM(
-                CASE
-                    WHEN m.home_score = m.away_score THEN 1
-                    ELSE 0
-                END
-            ) AS draws,
-
-            -- Losses
-            SUM(
-                CASE
-                    WHEN (m.home_team_id = t.id AND m.home_score < m.away_score) OR
-                        (m.away_team_id = t.id AND m.away_score < m.home_score) THEN 1
-                    ELSE 0
-                END
-            ) AS losses,
-
-            -- Goals for
-            SUM(
-                CASE WHEN m.home_team_id = t.id THEN m.home_score
-                    WHEN m.away_team_id = t.id THEN m.away_score
-                    ELSE 0
-                END
-            ) AS goals_for,
-
-            -- Goals against
-            SUM(
-                CASE WHEN m.home_team_id = t.id THEN m.away_score
-                    WHEN m.away_team_id = t.id THEN m.home_score
-                    ELSE 0
-                END
-            ) AS goals_against
-
+            COALESCE(lt.points, 0) AS points,
+            COALESCE(lt.played, 0) AS played,
+            COALESCE(lt.wins, 0) AS wins,
+            COALESCE(lt.draws, 0) AS draws,
+            COALESCE(lt.losses, 0) AS losses,
+            COALESCE(lt.goals_for, 0) AS goals_for,
+            COALESCE(lt.goals_against, 0) AS goals_against
         FROM teams t
-        LEFT JOIN matches m
-            ON (m.home_team_id = t.id OR m.away_team_id = t.id)
-            AND m.league_id = ?
-            AND m.status = 'finished'
+        LEFT JOIN league_table lt ON lt.league_id = ? AND lt.team_id = t.id
         WHERE t.nationality = ?
-        GROUP BY t.id, t.name
         ORDER BY points DESC, (goals_for - goals_against) DESC;
     """
     rows = fetch_all(query, (league_id, country))
     return [dict(row) for row in rows]
+
+
+# 5. Version of a league's table; bumped by the triggers on every result change
+def get_league_table_version(league_id):
+    row = fetch_one("SELECT version FROM change_versions WHERE name = ?", (f"league_table:{league_id}",))
+    return row["version"] if row else 0
+
+
+# 6. Recompute every league table from matches and fix any drift
+def rebuild_league_tables():
+    """
+    Returns:
+        dict: {"rows": rows written, "fixed": rows that were wrong or missing, "removed": stale rows}
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("""
+            CREATE TEMP TABLE expected_league_table AS
+            SELECT league_id, team_id, COUNT(*) AS played,
+                   SUM(COALESCE(gf > ga, 0)) AS wins,
+                   SUM(COALESCE(gf = ga, 0)) AS draws,
+                   SUM(COALESCE(gf < ga, 0)) AS losses,
+                   SUM(COALESCE(gf, 0)) AS goals_for,
+                   SUM(COALESCE(ga, 0)) AS goals_against,
+                   SUM(3 * COALESCE(gf > ga, 0) + COALESCE(gf = ga, 0)) AS points
+            FROM (
+                SELECT league_id, home_team_id AS team_id, home_score AS gf, away_score AS ga
+                FROM matches WHERE status = 'finished'
+                UNION ALL
+                SELECT league_id, away_team_id, away_score, home_score
+                FROM matches WHERE status = 'finished'
+            )
+            WHERE league_id IS NOT NULL AND team_id IS NOT NULL
+            GROUP BY league_id, team_id
+        """)
+        cur.execute("""
+            SELECT COUNT(*) FROM expected_league_table e
+            LEFT JOIN league_table lt ON lt.league_id = e.league_id AND lt.team_id = e.team_id
+            WHERE lt.team_id IS NULL
+               OR lt.played != e.played OR lt.wins != e.wins OR lt.draws != e.draws
+               OR lt.losses != e.losses OR lt.goals_for != e.goals_for
+               OR lt.goals_against != e.goals_against OR lt.points != e.points
+        """)
+        fixed = cur.fetchone()[0]
+        cur.execute("""
+            DELETE FROM league_table
+            WHERE NOT EXISTS (
+                SELECT 1 FROM expected_league_table e
+                WHERE e.league_id = league_table.league_id AND e.team_id = league_table.team_id
+            )
+        """)
+        removed = cur.rowcount
+        cur.execute("""
+            INSERT OR REPLACE INTO league_table
+                (league_id, team_id, played, wins, draws, losses, goals_for, goals_against, points, updated_at)
+            SELECT league_id, team_id, played, wins, draws, losses, goals_for, goals_against, points, CURRENT_TIMESTAMP
+            FROM expected_league_table
+        """)
+        rows = cur.rowcount
+        # Invalidate every cached table render
+        cur.execute("""
+            UPDATE change_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE name LIKE 'league_table:%'
+        """)
+        cur.execute("DROP TABLE expected_league_table")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    return {"rows": rows, "fixed": fixed, "removed": removed}
+
+
+if __name__ == "__main__":
+    # 🔧 python -m Controllers.leagues_controller  → rebuild league tables & report drift
+    report = rebuild_league_tables()
+    print(f"✅ League tables rebuilt: {report['rows']} rows "
+          f"({report['fixed']} fixed, {report['removed']} stale rows removed)")
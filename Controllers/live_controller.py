@@ -0,0 +1,82 @@
+import json
+from datetime import timedelta
+from Controllers.utils import fetch_all
+from Controllers.time_service import now_ts, to_epoch
+
+LIVE_TABLES = ("matches", "rounds")
+LIVE_WINDOW = timedelta(hours=2)
+
+# ⏱️ Status rules (same as the old full-table pass): cancelled stays cancelled,
+# a score means finished, otherwise upcoming → live for 2h after kick-off → finished.
+STATUS_SQL = """
+    CASE
+        WHEN status = 'cancelled' THEN 'cancelled'
+        WHEN home_score IS NOT NULL OR away_score IS NOT NULL THEN 'finished'
+        WHEN match_ts > :now THEN 'upcoming'
+        WHEN match_ts >= :live_from THEN 'live'
+        ELSE 'finished'
+    END
+"""
+
+
+def get_data_version(names=LIVE_TABLES):
+    """
+    Returns a cheap fingerprint of the live data (scores, statuses, deadlines).
+
+    Triggers on the listed tables bump `change_versions`, so comparing two
+    fingerprints tells a page whether it needs to re-render at all.
+
+    Returns:
+        tuple: ((name, version), ...) in table-name order.
+    """
+    placeholders = ", ".join("?" for _ in names)
+    rows = fetch_all(f"""
+        SELECT name, version
+        FROM change_versions
+        WHERE name IN ({placeholders})
+        ORDER BY name
+    """, tuple(names))
+    return tuple((row["name"], row["version"]) for row in rows)
+
+
+def status_params(now=None, api_match_ids=()):
+    """Named parameters for STATUS_SQL (epoch integers) at `now` (UTC; default: now)."""
+    now = now_ts() if now is None else to_epoch(now)
+    return {
+        "now": now,
+        "live_from": now - int(LIVE_WINDOW.total_seconds()),
+        "ids": json.dumps(list(api_match_ids)),
+    }
+
+
+def refresh_match_statuses(conn, api_match_ids=(), now=None):
+    """
+    Bring match statuses up to date without scanning the whole table.
+
+    Only two groups can be stale: matches still marked upcoming/live whose
+    kick-off has passed (an index range on status + match_ts), and the
+    matches a sync batch just wrote (`api_match_ids`). Runs on the caller's
+    connection and does not commit, so it joins the caller's transaction.
+
+    Returns:
+        int: Number of matches whose status changed.
+    """
+    params = status_params(now, api_match_ids)
+    cur = conn.cursor()
+    cur.execute(f"""
+        UPDATE matches
+        SET status = {STATUS_SQL}, updated_at = CURRENT_TIMESTAMP
+        WHERE status IN ('upcoming', 'live') AND match_ts <= :now
+          AND status != {STATUS_SQL}
+    """, params)
+    changed = cur.rowcount
+    if api_match_ids:
+        cur.execute(f"""
+            UPDATE matches
+            SET status = {STATUS_SQL}, updated_at = CURRENT_TIMESTAMP
+            WHERE api_match_id IN (SELECT value FROM json_each(:ids))
+              AND status != {STATUS_SQL}
+        """, params)
+        changed += cur.rowcount
+    cur.close()
+    return changed
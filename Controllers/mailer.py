@@ -0,0 +1,308 @@
+# mailer.py
+# Outgoing e-mail goes through the `email_outbox` table (db_migrations #8):
+# callers queue rendered messages, deliver_outbox() sends them over a small
+# pool of reusable SMTP connections under a rate limit, and failed sends are
+# retried with backoff on the next delivery run.
+#
+# Pages never deliver on the script thread (at EMAIL_RATE_PER_MINUTE a large
+# mailing takes minutes): they queue and call request_delivery(), which wakes
+# a background sender. The reminder scheduler also drains the outbox on every tick.
+#
+# Any local SMTP stand-in works for testing, e.g.
+#   python -m aiosmtpd -n -l localhost:1025   with SMTP_SERVER=localhost SMTP_PORT=1025 SMTP_USE_TLS=false
+import sys
+import time
+import queue
+import smtplib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+from Controllers.db_controller import pool
+from Controllers.utils import fetch_all
+from Controllers.api_client import TokenBucket
+from config import (
+    SMTP_SERVER, SMTP_PORT, SENDER_EMAIL, SENDER_PASSWORD, SMTP_USE_TLS,
+    EMAIL_POOL_SIZE, EMAIL_RATE_PER_MINUTE, EMAIL_MAX_PER_CONNECTION, EMAIL_MAX_ATTEMPTS,
+)
+
+SMTP_TIMEOUT = 30
+SENDING_TIMEOUT = 15 * 60   # a 'sending' row older than this belongs to a crashed run
+RESULT_FLUSH_EVERY = 25
+
+_deliver_lock = threading.Lock()   # one delivery run at a time per process, so the rate limit holds
+_wakeup = threading.Event()
+_sender = None
+_sender_lock = threading.Lock()
+
+
+# ------------------- SMTP connection pool ------------------- #
+
+class _SmtpConnection:
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+
+
+class SmtpPool:
+    """
+    At most `size` logged-in SMTP sessions, reused across messages.
+    A session is dropped after an error or after `max_per_connection` messages
+    (many providers cap messages per session).
+    """
+
+    def __init__(self, size=EMAIL_POOL_SIZE, max_per_connection=EMAIL_MAX_PER_CONNECTION):
+        self.max_per_connection = max_per_connection
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._opened_lock = threading.Lock()
+        self.opened = 0
+
+    def _open(self):
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_USE_TLS:
+            server.starttls()
+        if SENDER_PASSWORD:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        with self._opened_lock:
+            self.opened += 1
+        return _SmtpConnection(server)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.server.quit()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            try:
+                conn.server.noop()
+                return conn
+            except smtplib.SMTPException:
+                self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn.server
+            conn.sent += 1
+            if conn.sent >= self.max_per_connection:
+                self._discard(conn)
+                conn = None
+        except Exception:
+            if conn is not None:
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put(conn)
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+# ------------------- Outbox ------------------- #
+
+def build_message(recipient, subject, body, subtype="plain"):
+    message = MIMEMultipart("alternative" if subtype == "html" else "mixed")
+    message["From"] = SENDER_EMAIL
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.attach(MIMEText(body, subtype))
+    return message
+
+
+def queue_emails(messages):
+    """
+    Add rendered messages to the outbox in one transaction.
+
+    Args:
+        messages (iterable): Dicts with kind, recipient, subject, body and optional
+            subtype ('plain' / 'html') and dedupe_key. A message whose dedupe_key is
+            already in the outbox is ignored, so re-queueing is safe.
+
+    Returns:
+        int: Number of messages actually queued.
+    """
+    rows = [
+        (m["kind"], m.get("dedupe_key"), m["recipient"], m["subject"], m["body"], m.get("subtype", "plain"))
+        for m in messages
+    ]
+    if not rows:
+        return 0
+    conn = pool.connection()
+    cur = conn.cursor()
+    try:
+        cur.executemany("""
+            INSERT OR IGNORE INTO email_outbox (kind, dedupe_key, recipient, subject, body, subtype)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        queued = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return queued
+
+
+def _claim(limit):
+    """Move due pending rows (and rows left 'sending' by a crashed run) to 'sending'."""
+    now = time.time()
+    conn = pool.connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("""
+            UPDATE email_outbox SET status = 'pending'
+            WHERE status = 'sending' AND claimed_ts < ?
+        """, (now - SENDING_TIMEOUT,))
+        rows = conn.execute("""
+            UPDATE email_outbox SET status = 'sending', claimed_ts = ?
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE status = 'pending' AND next_attempt_ts <= ?
+                ORDER BY next_attempt_ts, id
+                LIMIT ?
+            )
+            RETURNING id, recipient, subject, body, subtype, attempts
+        """, (now, now, limit)).fetchall()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rows
+
+
+def _save_results(sent, failed):
+    """
+    sent: [(sent_ts, id)]; failed: [(attempts, error, id)].
+    Failed rows go back to pending with exponential backoff until EMAIL_MAX_ATTEMPTS.
+    """
+    now = time.time()
+    conn = pool.connection()
+    try:
+        conn.executemany("""
+            UPDATE email_outbox SET status = 'sent', sent_ts = ?, attempts = attempts + 1, last_error = NULL
+            WHERE id = ?
+        """, sent)
+        conn.executemany("""
+            UPDATE email_outbox
+            SET status = CASE WHEN ? >= ? THEN 'failed' ELSE 'pending' END,
+                attempts = ?, last_error = ?, next_attempt_ts = ?
+            WHERE id = ?
+        """, [
+            (attempts, EMAIL_MAX_ATTEMPTS, attempts, error, now + 60 * 2 ** attempts, outbox_id)
+            for attempts, error, outbox_id in failed
+        ])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def deliver_outbox(limit=1000, max_workers=EMAIL_POOL_SIZE):
+    """
+    Send due outbox messages concurrently over pooled SMTP sessions.
+
+    Returns:
+        dict: {"sent", "retrying", "failed", "connections"}
+    """
+    with _deliver_lock:
+        return _deliver(limit, max_workers)
+
+
+def _deliver(limit, max_workers):
+    rows = _claim(limit)
+    counters = {"sent": 0, "retrying": 0, "failed": 0, "connections": 0}
+    if not rows:
+        return counters
+
+    smtp = SmtpPool(size=max_workers)
+    bucket = TokenBucket(EMAIL_RATE_PER_MINUTE)
+
+    def send(row):
+        bucket.acquire()
+        message = build_message(row["recipient"], row["subject"], row["body"], row["subtype"])
+        with smtp.connection() as server:
+            server.sendmail(SENDER_EMAIL, row["recipient"], message.as_string())
+
+    sent, failed = [], []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(send, row): row for row in rows}
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    future.result()
+                    sent.append((time.time(), row["id"]))
+                    counters["sent"] += 1
+                except Exception as e:
+                    attempts = row["attempts"] + 1
+                    failed.append((attempts, str(e)[:500], row["id"]))
+                    counters["failed" if attempts >= EMAIL_MAX_ATTEMPTS else "retrying"] += 1
+                    print(f"❌ Failed to send email to {row['recipient']}: {e}")
+                # Record progress as we go so a crash doesn't resend what already went out
+                if len(sent) + len(failed) >= RESULT_FLUSH_EVERY:
+                    _save_results(sent, failed)
+                    sent, failed = [], []
+    finally:
+        _save_results(sent, failed)
+        smtp.close()
+
+    counters["connections"] = smtp.opened
+    return counters
+
+
+def _deliver_forever():
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        try:
+            report = deliver_outbox()
+            if report["sent"] or report["retrying"] or report["failed"]:
+                print(f"📮 Outbox: {report['sent']} sent, {report['retrying']} to retry, {report['failed']} failed")
+        except Exception as e:
+            print(f"❌ Outbox delivery failed: {e}")
+        finally:
+            pool.release_thread()
+
+
+def request_delivery():
+    """Have the background sender drain the outbox now; returns immediately."""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = threading.Thread(target=_deliver_forever, name="outbox-sender", daemon=True)
+            _sender.start()
+    _wakeup.set()
+
+
+def outbox_stats():
+    """Message counts per status, e.g. {"pending": 3, "sent": 120}."""
+    return {row[0]: row[1] for row in fetch_all("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")}
+
+
+if __name__ == "__main__":
+    # 📮 python -m Controllers.mailer  → send whatever is due in the outbox
+    report = deliver_outbox()
+    print(f"✅ {report['sent']} sent, {report['retrying']} to retry, {report['failed']} failed "
+          f"over {report['connections']} SMTP connections")
+    sys.exit(1 if report["failed"] else 0)
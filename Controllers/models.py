@@ -0,0 +1,215 @@
+# models.py
+# Lightweight read models built straight from cursor rows. Each model is a
+# NamedTuple subclass with no per-instance dict (one tuple per row); columns are
+# matched to fields by name (case-insensitive) once per statement, not per row.
+# Models also answer model["field"], model.get("field") and "field" in model,
+# so render helpers written against dict rows keep working unchanged.
+from functools import lru_cache
+from operator import itemgetter
+from typing import NamedTuple, Optional
+
+_MISSING = (None,)
+
+
+class RowModel:
+    """Mapping-style access for the NamedTuple models below."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key in self._fields:
+                return getattr(self, key)
+            raise KeyError(key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def keys(self):
+        return self._fields
+
+    def to_dict(self):
+        return dict(zip(self._fields, self))
+
+
+def _builder(model, description):
+    """
+    Row → model converter for one statement's column layout. Columns the query
+    didn't select become None; extra columns are ignored.
+    """
+    positions = {column[0].lower(): i for i, column in enumerate(description)}
+    missing = len(description)  # index of the padding None
+    indices = [positions.get(field.lower(), missing) for field in model._fields]
+    padded = missing in indices
+    getter = itemgetter(*indices)
+    new = tuple.__new__
+    if len(indices) == 1:
+        return lambda row: new(model, (getter(row + _MISSING if padded else row),))
+    if padded:
+        return lambda row: new(model, getter(row + _MISSING))
+    return lambda row: new(model, getter(row))
+
+
+@lru_cache(maxsize=None)
+def row_factory(model):
+    """
+    sqlite3 row factory producing `model` instances:
+        cur.row_factory = row_factory(Match)
+    The column mapping is rebuilt only when the cursor runs a new statement.
+    """
+    state = (None, None)
+
+    def factory(cursor, row):
+        nonlocal state
+        description, build = state
+        if description is not cursor.description:
+            build = _builder(model, cursor.description)
+            state = (cursor.description, build)
+        return build(row)
+
+    return factory
+
+
+# ------------------- Models ------------------- #
+
+class _Match(NamedTuple):
+    id: int
+    match_id: int
+    match_date: Optional[str]
+    match_datetime: str
+    match_ts: Optional[int]
+    status: Optional[str]
+    matchday: Optional[int]
+    home_score: Optional[int]
+    away_score: Optional[int]
+    Venue_Name: Optional[str]
+    home_team: str
+    away_team: str
+    home_color: Optional[str]
+    away_color: Optional[str]
+    home_logo: Optional[str]
+    away_logo: Optional[str]
+    league_name: Optional[str]
+    nationality: Optional[str]
+    stage_name: Optional[str]
+
+
+class Match(RowModel, _Match):
+    """A fixture as shown on match cards (fixtures and league pages)."""
+    __slots__ = ()
+
+
+class _MatchDetails(NamedTuple):
+    id: int
+    home_team_id: int
+    away_team_id: int
+    home_team: Optional[str]
+    away_team: Optional[str]
+    match_datetime: str
+    allows_draw: Optional[int]
+    has_penalties: Optional[int]
+    is_two_legged: Optional[int]
+    round_id: Optional[int]
+    round_name: Optional[str]
+    stage_id: Optional[int]
+    stage_name: Optional[str]
+    league_id: Optional[int]
+    league_name: Optional[str]
+
+
+class MatchDetails(RowModel, _MatchDetails):
+    """A match with its round, stage rules and league (prediction form)."""
+    __slots__ = ()
+
+
+class _Round(NamedTuple):
+    round_id: int
+    round_name: str
+    deadline: object
+    first_match_time: object
+    match_count: int
+
+
+class Round(RowModel, _Round):
+    """An upcoming round with its predictable-match summary."""
+    __slots__ = ()
+
+
+class _Team(NamedTuple):
+    id: int
+    name: str
+    tla: Optional[str]
+    official_name: Optional[str]
+    logo_path: Optional[str]
+    nationality: Optional[str]
+    Venue_name: Optional[str]
+    color: Optional[str]
+    venue_capacity: Optional[int]
+    venue_location: Optional[str]
+    league_number: Optional[int]
+    club_colors: Optional[str]
+    founded: Optional[int]
+    website: Optional[str]
+    address: Optional[str]
+    created_at: Optional[str]
+
+
+class Team(RowModel, _Team):
+    __slots__ = ()
+
+
+class _Prediction(NamedTuple):
+    prediction_id: int
+    player_id: int
+    match_id: int
+    predicted_home_score: int
+    predicted_away_score: int
+    predicted_penalty_winner_id: Optional[int]
+    score: Optional[int]
+    prediction_created_at: Optional[str]
+    round_id: Optional[int]
+    league_id: Optional[int]
+    match_home_team_id: int
+    match_away_team_id: int
+    match_datetime: str
+    status: Optional[str]
+    home_score: Optional[int]
+    away_score: Optional[int]
+    stage_id: Optional[int]
+    penalty_winner: Optional[int]
+    is_predictable: Optional[int]
+    match_created_at: Optional[str]
+    match_updated_at: Optional[str]
+    matchday: Optional[int]
+    Venue_Name: Optional[str]
+    api_match_id: Optional[int]
+    home_team: str
+    away_team: str
+    home_color: Optional[str]
+    away_color: Optional[str]
+
+
+class Prediction(RowModel, _Prediction):
+    """A player's prediction joined with its match."""
+    __slots__ = ()
+
+
+class _Player(NamedTuple):
+    id: int
+    username: str
+    email: str
+    avatar_name: Optional[str]
+    created_at: Optional[str]
+    total_leagues_won: int
+    total_cups_won: int
+    total_points: int
+    rank: Optional[int]
+
+
+class Player(RowModel, _Player):
+    """A player's profile with points and leaderboard rank."""
+    __slots__ = ()
@@ -1,51 +1,31 @@
 import os
 import bcrypt
 from PIL import Image
-from Controllers.utils import fetch_one, fetch_all, execute_query 
+from Controllers.utils import fetch_one, execute_query, fetch_model
+from Controllers.models import Player
+from Controllers.leaderboard_controller import get_player_rank
+from Controllers.thumbnails import generate_thumbnails
 import datetime
 from datetime import datetime
 
 # ------------------- Player Retrieval ------------------- #
 
 def get_player_info(player_id):
-    # Get the current player's basic info and total points
-    row = fetch_one("""
+    # Basic info plus points and rank from `standings` (predictions + bonus, kept by triggers)
+    player = fetch_model(Player, """
         SELECT 
-            id, username, email, avatar_name, created_at,
-            total_leagues_won, total_cups_won, 
-            (SELECT COALESCE(SUM(score), 0) FROM predictions WHERE player_id = players.id) AS total_points
-        FROM players 
-        WHERE id = ?
+            p.id, p.username, p.email, p.avatar_name, p.created_at,
+            p.total_leagues_won, p.total_cups_won,
+            COALESCE(s.total_points, 0) AS total_points
+        FROM players p
+        LEFT JOIN standings s ON s.player_id = p.id
+        WHERE p.id = ?
     """, (player_id,))
     
-    if not row:
+    if not player:
         return None
 
-    player_points = row[7]
-
-    # Get leaderboard (all players with total points, sorted descending)
-    leaderboard = fetch_all("""
-        SELECT id, 
-               (SELECT COALESCE(SUM(score), 0) FROM predictions WHERE player_id = players.id) AS total_points
-        FROM players
-        ORDER BY total_points DESC
-    """)
-
-    # Find the rank of the player (1-based index)
-    rank = next((index + 1 for index, entry in enumerate(leaderboard) if entry[0] == player_id), None)
-
-    # Return complete player info with rank
-    return {
-        "id": row[0],
-        "username": row[1],
-        "email": row[2],
-        "avatar_name": row[3],
-        "created_at": row[4],
-        "total_leagues_won": row[5],
-        "total_cups_won": row[6],
-        "total_points": player_points,
-        "rank": rank
-    }
+    return player._replace(rank=get_player_rank(player_id))
 
 # ------------------- Player Update ------------------- #
 
@@ -129,6 +109,7 @@ def save_avatar_image(player_id, image):
             f.write(image)
     else:
         raise ValueError("Unsupported image type")
+    generate_thumbnails(save_path)
 
     normalized_path = save_path.replace("\\", "/")
 
@@ -0,0 +1,210 @@
+# prediction_writer.py
+# Prediction saves from every Streamlit session go through one writer thread.
+# Near a deadline hundreds of sessions save at once; letting each of them open
+# its own write transaction ends in `database is locked`. Instead, callers
+# queue the save and get a Future back; the writer takes everything that queued
+# up while the previous commit was running and applies it as one transaction
+# (one executemany upsert, one commit per batch). Saves submitted together
+# (a whole round from the prediction grid) are queued as one group and never
+# split across transactions.
+#
+# The deadline is enforced here, inside the write transaction, against the
+# time the save was submitted — the page's own check only decides what to show.
+import json
+import time
+import queue
+import random
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import NamedTuple
+
+from Controllers.db_controller import pool
+from config import PREDICTION_BATCH_MAX, PREDICTION_WRITE_RETRY_SECONDS
+
+UPSERT_SQL = """
+    INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score, predicted_penalty_winner_id)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (player_id, match_id) DO UPDATE
+    SET predicted_home_score = excluded.predicted_home_score,
+        predicted_away_score = excluded.predicted_away_score,
+        predicted_penalty_winner_id = excluded.predicted_penalty_winner_id
+"""
+DEADLINES_SQL = """
+    SELECT m.id, m.is_predictable, r.deadline_ts
+    FROM matches m
+    JOIN rounds r ON r.id = m.round_id
+    WHERE m.id IN (SELECT value FROM json_each(?))
+"""
+
+
+class PredictionClosed(Exception):
+    """The match's prediction deadline had passed when the save was submitted."""
+
+
+class _Save(NamedTuple):
+    row: tuple          # UPSERT_SQL parameters
+    submitted_at: float
+    future: Future
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class PredictionWriter:
+    """
+    Single consumer of a queue of prediction saves, started on first use.
+
+    stats: batches, saved, rejected, failed, busy_retries and the largest batch.
+    """
+
+    def __init__(self, batch_max=PREDICTION_BATCH_MAX, retry_seconds=PREDICTION_WRITE_RETRY_SECONDS):
+        self.batch_max = batch_max
+        self.retry_seconds = retry_seconds
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.stats = {"batches": 0, "saved": 0, "rejected": 0, "failed": 0, "busy_retries": 0, "max_batch": 0}
+
+    # ----- callers ----- #
+
+    def submit(self, player_id, match_id, home_score, away_score, penalty_winner_id=None):
+        """
+        Queue one prediction save.
+
+        Returns:
+            Future: Resolves to True once committed, or raises PredictionClosed /
+            ValueError (match not open for predictions) / the database error.
+        """
+        return self.submit_many([(player_id, match_id, home_score, away_score, penalty_winner_id)])[0]
+
+    def submit_many(self, rows):
+        """
+        Queue several saves at once (e.g. a whole round); they are committed together.
+
+        Args:
+            rows (iterable): (player_id, match_id, home_score, away_score, penalty_winner_id) tuples.
+
+        Returns:
+            list[Future]: One per row, in order.
+        """
+        self._ensure_started()
+        submitted_at = time.time()
+        saves = [_Save(tuple(row), submitted_at, Future()) for row in rows]
+        if saves:
+            self._queue.put(saves)
+        return [save.future for save in saves]
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    # ----- writer thread ----- #
+
+    def _run(self):
+        while True:
+            groups = [self._queue.get()]
+            size = len(groups[0])
+            # Everything that arrived during the previous commit joins this one
+            while size < self.batch_max:
+                try:
+                    groups.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                size += len(groups[-1])
+            self._write_groups(groups)
+            if self._queue.empty():
+                # Keep the connection through a burst, give it back once idle
+                pool.release_thread()
+
+    def _write_groups(self, groups):
+        """Commit `groups` together; if that fails, commit each group on its own."""
+        batch = [save for group in groups for save in group]
+        try:
+            self._write(batch)
+        except sqlite3.OperationalError as e:
+            self._fail(batch, e)
+        except sqlite3.DatabaseError as e:
+            if len(groups) == 1:
+                self._fail(batch, e)
+                return
+            # One bad row (e.g. a foreign key) must not sink everyone else's save;
+            # a group (one player's round) still succeeds or fails as a whole
+            for group in groups:
+                self._write_groups([group])
+        except Exception as e:
+            self._fail(batch, e)
+
+    def _fail(self, saves, error):
+        for save in saves:
+            if not save.future.done():
+                save.future.set_exception(error)
+        self.stats["failed"] += len(saves)
+
+    def _write(self, batch):
+        give_up_at = time.monotonic() + self.retry_seconds
+        delay = 0.01
+        while True:
+            try:
+                accepted, rejected = self._commit(batch)
+                break
+            except sqlite3.OperationalError as e:
+                # Another process (API sync, job runner) held the write lock past busy_timeout
+                if not _is_busy(e) or time.monotonic() >= give_up_at:
+                    raise
+                self.stats["busy_retries"] += 1
+                time.sleep(delay * (1 + random.random()))
+                delay = min(delay * 2, 1.0)
+
+        self.stats["batches"] += 1
+        self.stats["saved"] += len(accepted)
+        self.stats["rejected"] += len(rejected)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        for save in accepted:
+            save.future.set_result(True)
+        for save, error in rejected:
+            save.future.set_exception(error)
+
+    def _commit(self, batch):
+        conn = pool.connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            match_ids = sorted({save.row[1] for save in batch})
+            open_until = {
+                row[0]: row[2] if row[1] else None
+                for row in conn.execute(DEADLINES_SQL, (json.dumps(match_ids),))
+            }
+            accepted, rejected = [], []
+            for save in batch:
+                match_id = save.row[1]
+                deadline_ts = open_until.get(match_id)
+                if deadline_ts is None:
+                    rejected.append((save, ValueError(f"Match {match_id} is not open for predictions")))
+                elif save.submitted_at >= deadline_ts:
+                    rejected.append((save, PredictionClosed(f"Predictions for match {match_id} are closed")))
+                else:
+                    accepted.append(save)
+            conn.executemany(UPSERT_SQL, [save.row for save in accepted])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return accepted, rejected
+
+
+prediction_writer = PredictionWriter()
+
+
+def submit_prediction(player_id, match_id, home_score, away_score, penalty_winner_id=None):
+    return prediction_writer.submit(player_id, match_id, home_score, away_score, penalty_winner_id)
+
+
+def submit_predictions(rows):
+    return prediction_writer.submit_many(rows)
@@ -1,13 +1,19 @@
 import os
 import bcrypt
 from PIL import Image
-from Controllers.utils import fetch_one, fetch_all, execute_query 
+from Controllers.utils import fetch_one, fetch_all, fetch_model
+from Controllers.models import Round, Prediction
+from Controllers.reference_cache import cached_reference
+from Controllers.time_service import now_ts, utc_datetime, localize_rows
+from Controllers.prediction_writer import submit_prediction, submit_predictions, PredictionClosed
+from config import PREDICTION_SAVE_TIMEOUT
 import datetime
 from datetime import datetime
 import pytz
 from tzlocal import get_localzone_name
 from Controllers.db_controller import get_connection
 
+@cached_reference("players")
 def get_localzone_for_player(player_id: int):
     """
     Returns the player's timezone as a pytz.timezone object
@@ -27,61 +33,120 @@ def get_localzone_for_player(player_id: int):
         raise RuntimeError(f"❌ Invalid timezone: {row['timezone']}")
     
 
-def get_upcoming_predictable_fixtures_grouped_by_round():
+def get_predictable_rounds():
+    """
+    Rounds that have predictable matches, for the round selector: names and
+    deadlines only (the selected round's matches come from load_round_view()).
+
+    Returns:
+        list[dict]: {"round_id", "round_name", "deadline_ts"}, earliest deadline first.
+    """
+    rows = fetch_all("""
+        SELECT r.id, r.name, r.deadline_ts
+        FROM rounds r
+        WHERE EXISTS (SELECT 1 FROM matches m WHERE m.round_id = r.id AND m.is_predictable = 1)
+        ORDER BY r.deadline_ts ASC
+    """)
+    return [{"round_id": row[0], "round_name": row[1], "deadline_ts": row[2]} for row in rows]
+
+
+def load_round_view(player_id, round_id, local_tz=None):
+    """
+    Load everything the Predictions tab needs for one round in a single query:
+    matches, teams, stage rules and the player's own prediction for each match.
+
+    Args:
+        player_id (int): The logged-in player.
+        round_id (int): The selected round.
+        local_tz: The player's timezone (looked up once if not given).
+
+    Returns:
+        dict: {
+            "local_tz": timezone,
+            "matches": [match view dicts, each with a "prediction" dict or None
+                        and pre-computed "local_dt", "time_str", "date_friendly"],
+            "predicted_count": int,
+            "unpredicted_count": int
+        }
+    """
+    if local_tz is None:
+        local_tz = get_localzone_for_player(player_id)
+
     query = """
-        SELECT 
-            r.id AS round_id,
+        SELECT
+            m.id,
+            m.round_id,
             r.name AS round_name,
-            r.round_number,
             r.prediction_deadline,
-            DATE(m.match_datetime) AS match_date,
+            r.deadline_ts,
+            m.league_id,
             l.name AS league_name,
             l.country AS nationality,
+            m.stage_id,
             s.name AS stage_name,
+            s.allows_draw,
+            s.has_penalties,
+            s.is_two_legged,
             m.matchday,
             m.match_datetime,
+            m.match_ts,
             m.status,
             m.home_score,
             m.away_score,
-            m.Venue_name,
-            m.id,
+            m.penalty_winner,
+            m.Venue_Name,
+            m.home_team_id,
+            m.away_team_id,
             ht.name AS home_team,
             at.name AS away_team,
             ht.color AS home_color,
             at.color AS away_color,
             ht.logo_path AS home_logo,
-            at.logo_path AS away_logo
+            at.logo_path AS away_logo,
+            p.id AS prediction_id,
+            p.predicted_home_score,
+            p.predicted_away_score,
+            p.predicted_penalty_winner_id,
+            p.score AS prediction_score
         FROM matches m
         JOIN rounds r ON m.round_id = r.id
         JOIN leagues l ON m.league_id = l.id
         JOIN teams ht ON m.home_team_id = ht.id
         JOIN teams at ON m.away_team_id = at.id
         LEFT JOIN stages s ON m.stage_id = s.id
-        WHERE m.is_predictable = 1
-        ORDER BY r.round_number ASC, m.match_datetime ASC
+        LEFT JOIN predictions p ON p.match_id = m.id AND p.player_id = ?
+        WHERE m.round_id = ? AND m.is_predictable = 1
+        ORDER BY m.match_datetime ASC
     """
-    rows = fetch_all(query)
+    rows = fetch_all(query, (player_id, round_id))
 
-    grouped = {}
+    matches = []
+    predicted_count = 0
     for row in rows:
-        round_id = row["round_id"]
-
-        if round_id not in grouped:
-            grouped[round_id] = {
-                "round_id": round_id,
-                "round_name": row["round_name"],
-                "round_number": row["round_number"],
-                "deadline": row["prediction_deadline"],
-                "matches": [],
-                "match_count": 0 
+        match = dict(row)
+        if match.pop("prediction_id") is not None:
+            match["prediction"] = {
+                "predicted_home_score": match["predicted_home_score"],
+                "predicted_away_score": match["predicted_away_score"],
+                "predicted_penalty_winner_id": match["predicted_penalty_winner_id"],
+                "score": match["prediction_score"],
             }
+            predicted_count += 1
+        else:
+            match["prediction"] = None
+        for key in ("predicted_home_score", "predicted_away_score", "predicted_penalty_winner_id", "prediction_score"):
+            del match[key]
 
-        grouped[round_id]["matches"].append(dict(row))
-        grouped[round_id]["match_count"] += 1
-
-    return grouped
+        matches.append(match)
 
+    localize_rows(matches, local_tz)
 
+    return {
+        "local_tz": local_tz,
+        "matches": matches,
+        "predicted_count": predicted_count,
+        "unpredicted_count": len(matches) - predicted_count,
+    }
 
 
 def get_round_deadline(round_id):
@@ -120,6 +185,7 @@ def get_local_deadline(utc_deadline_str):
 
     return local_dt
 
+@cached_reference("leagues")
 def get_logo_path_from_league(league_name: str) -> str:
     """
     Given a league name, return the relative logo path if it exists.
@@ -145,6 +211,7 @@ def get_logo_path_from_league(league_name: str) -> str:
     finally:
         conn.close()
         
+@cached_reference("leagues")
 def get_league_dates(league_name):
     query = """
         SELECT start_date, end_date
@@ -178,42 +245,84 @@ def calculate_league_progress(start_date_str, end_date_str):
 def save_prediction(player_id, match_id, home_score, away_score, penalty_winner_id=None):
     """
     Inserts or updates a prediction for a specific player and match.
-    Ensures uniqueness via (player_id, match_id).
-    """
-    # First check if a prediction already exists
-    check_query = """
-        SELECT id FROM predictions WHERE player_id = ? AND match_id = ?
-    """
-    existing = fetch_one(check_query, (player_id, match_id))
-
-    if existing:
-        # Update existing prediction
-        update_query = """
-            UPDATE predictions
-            SET predicted_home_score = ?, predicted_away_score = ?, predicted_penalty_winner_id = ?
-            WHERE player_id = ? AND match_id = ?
-        """
-        execute_query(update_query, (
-            home_score,
-            away_score,
-            penalty_winner_id,
-            player_id,
-            match_id
-        ))
-    else:
-        # Insert new prediction
-        insert_query = """
-            INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score, predicted_penalty_winner_id)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        execute_query(insert_query, (
-            player_id,
-            match_id,
-            home_score,
-            away_score,
-            penalty_winner_id
-        ))
-        
+    Ensures uniqueness via (player_id, match_id): one upsert, group-committed
+    by the prediction writer together with other sessions' saves.
+
+    Raises:
+        PredictionClosed: if the round's deadline had passed.
+        ValueError: if the match is not open for predictions.
+    """
+    future = submit_prediction(player_id, match_id, home_score, away_score, penalty_winner_id)
+    return future.result(timeout=PREDICTION_SAVE_TIMEOUT)
+
+
+MAX_PREDICTED_GOALS = 20
+
+
+def prediction_rules(match):
+    """
+    Stage rules that shape a prediction for `match` (a load_round_view() match).
+
+    Returns:
+        tuple: (allows_draw, has_penalties) as booleans.
+    """
+    allows_draw = bool(match.get("allows_draw", 1))
+    has_penalties = bool(match.get("has_penalties", 0))
+    # Stage-level override: a single-leg final is settled on penalties
+    if match.get("stage_name") == "Final - Single Leg":
+        allows_draw, has_penalties = True, True
+    return allows_draw, has_penalties
+
+
+def validate_prediction(match, home_score, away_score, penalty_winner_id=None):
+    """
+    Check one prediction against the match's stage rules before anything is saved.
+
+    Returns:
+        str | None: Why the prediction can't be saved, or None when it is valid.
+    """
+    for score in (home_score, away_score):
+        if not isinstance(score, int) or not 0 <= score <= MAX_PREDICTED_GOALS:
+            return f"Scores must be whole numbers between 0 and {MAX_PREDICTED_GOALS}."
+    allows_draw, has_penalties = prediction_rules(match)
+    if home_score != away_score:
+        if penalty_winner_id is not None:
+            return "A penalty winner only applies to a drawn score."
+        return None
+    if has_penalties:
+        if penalty_winner_id is None:
+            return "Pick the penalty shootout winner for a drawn score."
+        if penalty_winner_id not in (match.get("home_team_id"), match.get("away_team_id")):
+            return "The penalty winner must be one of the two teams."
+    elif not allows_draw:
+        return "This stage doesn't allow a draw."
+    return None
+
+
+def save_round_predictions(player_id, entries):
+    """
+    Save several predictions at once (the round grid). They are committed
+    together, in one transaction and one executemany upsert.
+
+    Args:
+        player_id (int): The player making the predictions.
+        entries (list[tuple]): (match_id, home_score, away_score, penalty_winner_id),
+            already checked with validate_prediction().
+
+    Returns:
+        dict: {match_id: exception} for saves that were refused (PredictionClosed,
+        ValueError); every other entry was saved.
+    """
+    futures = submit_predictions([(player_id, *entry) for entry in entries])
+    refused = {}
+    for entry, future in zip(entries, futures):
+        try:
+            future.result(timeout=PREDICTION_SAVE_TIMEOUT)
+        except (PredictionClosed, ValueError) as e:
+            refused[entry[0]] = e
+    return refused
+
+
 def get_existing_prediction(player_id, match_id):
     query = """
         SELECT 
@@ -253,7 +362,7 @@ def get_existing_prediction(player_id, match_id):
         JOIN teams at ON m.away_team_id = at.id
         WHERE p.player_id = ? AND p.match_id = ?
     """
-    return fetch_one(query, (player_id, match_id))
+    return fetch_model(Prediction, query, (player_id, match_id))
 
 
 
@@ -294,63 +403,39 @@ def get_prediction_type(match_id):
 
 
 # Email Reminder
-def get_next_round_info():
-    now_str = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")  # UTC now as string
-
-    # Get next round info where prediction deadline > now
-    round_query = """
-        SELECT id, name, prediction_deadline
-        FROM rounds
-        WHERE prediction_deadline > ?
-        ORDER BY prediction_deadline ASC
-        LIMIT 1
+def get_upcoming_rounds(limit=None):
     """
-    next_round = fetch_one(round_query, (now_str,))
-    if not next_round:
-        return None
-
-    round_id = next_round['id']
-    round_name = next_round['name']
-    deadline = next_round['prediction_deadline']
+    Rounds whose prediction deadline (UTC) is still ahead, soonest first, each
+    with its predictable-match summary computed in the same grouped query.
 
-    # Convert deadline to datetime object if needed
-    if isinstance(deadline, str):
-        try:
-            deadline = datetime.fromisoformat(deadline)
-        except Exception:
-            deadline = datetime.strptime(deadline, "%Y-%m-%d %H:%M:%S")
-
-    # Get first match datetime of only predictable matches in that round
-    match_time_query = """
-        SELECT MIN(match_datetime) AS first_match_time
-        FROM matches
-        WHERE round_id = ? AND is_predictable = 1
+    Returns:
+        list: Round models (round_id, round_name, deadline, first_match_time, match_count).
     """
-    match_time_row = fetch_one(match_time_query, (round_id,))
-    first_match_time = match_time_row['first_match_time'] if match_time_row else None
-
-    if isinstance(first_match_time, str):
-        try:
-            first_match_time = datetime.fromisoformat(first_match_time)
-        except Exception:
-            first_match_time = datetime.strptime(first_match_time, "%Y-%m-%d %H:%M:%S")
-
-    # Count only predictable matches in this round
-    count_query = """
-        SELECT COUNT(*) AS match_count
-        FROM matches
-        WHERE round_id = ? AND is_predictable = 1
+    query = """
+        SELECT r.id, r.name, r.deadline_ts,
+               MIN(m.match_ts) AS first_match_ts,
+               COUNT(m.id) AS match_count
+        FROM rounds r
+        LEFT JOIN matches m ON m.round_id = r.id AND m.is_predictable = 1
+        WHERE r.deadline_ts > ?
+        GROUP BY r.id
+        ORDER BY r.deadline_ts ASC
     """
-    count_row = fetch_one(count_query, (round_id,))
-    match_count = count_row['match_count'] if count_row else 0
+    params = (now_ts(),)
+    if limit is not None:
+        query += " LIMIT ?"
+        params += (limit,)
 
-    return {
-        "round_id": round_id,
-        "round_name": round_name,
-        "deadline": deadline,
-        "first_match_time": first_match_time,
-        "match_count": match_count
-    }
+    return [
+        Round(row["id"], row["name"], utc_datetime(row["deadline_ts"]),
+              utc_datetime(row["first_match_ts"]), row["match_count"])
+        for row in fetch_all(query, params)
+    ]
+
+
+def get_next_round_info():
+    rounds = get_upcoming_rounds(limit=1)
+    return rounds[0] if rounds else None
 
 
 def get_matches_for_round(round_id):
@@ -0,0 +1,155 @@
+# reference_cache.py
+# Process-wide cache for data that almost never changes: leagues, teams, stages
+# and player timezones. Every entry is stamped with the versions of the tables
+# it was read from:
+#   - triggers bump change_versions for those tables (db_migrations #11), and the
+#     cache re-reads the counters at most every REFERENCE_CACHE_CHECK_SECONDS, so
+#     writes from other processes (job runner, scripts) are picked up quickly;
+#   - the Manage_Controllers write paths call invalidate(), so an admin edit is
+#     visible on the very next read in this process;
+#   - entries older than REFERENCE_CACHE_TTL_SECONDS are reloaded regardless
+#     (covers state outside the database, such as logo files on disk).
+import time
+import threading
+from functools import wraps
+from collections import OrderedDict
+
+from Controllers.utils import fetch_all
+from config import REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_CHECK_SECONDS, REFERENCE_CACHE_MAX_ENTRIES
+
+REFERENCE_TABLES = ("leagues", "teams", "stages", "players")
+
+
+class ReferenceCache:
+    """
+    Version-stamped LRU of loader results, keyed by (namespace, key).
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, ttl=REFERENCE_CACHE_TTL_SECONDS, check_interval=REFERENCE_CACHE_CHECK_SECONDS,
+                 max_entries=REFERENCE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (namespace, key) -> (tables, stamp, loaded_at, value)
+        self._db_versions = {}         # table -> change_versions.version
+        self._local_versions = {}      # table -> invalidate() count in this process
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.invalidations = 0
+        self.version_checks = 0
+
+    def _refresh_versions(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        placeholders = ", ".join("?" for _ in REFERENCE_TABLES)
+        rows = fetch_all(f"SELECT name, version FROM change_versions WHERE name IN ({placeholders})",
+                         REFERENCE_TABLES)
+        with self._lock:
+            self._db_versions = {row[0]: row[1] for row in rows}
+            self._checked_at = now
+            self.version_checks += 1
+
+    def _stamp(self, tables):
+        return tuple((self._db_versions.get(t, 0), self._local_versions.get(t, 0)) for t in tables)
+
+    def get(self, namespace, key, tables, loader):
+        """
+        Return the cached value for (namespace, key), calling `loader()` when it
+        is missing, older than the TTL, or any of `tables` changed since it was loaded.
+        Exceptions from the loader propagate and nothing is cached.
+        """
+        self._refresh_versions()
+        cache_key = (namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            stamp = self._stamp(tables)
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                if entry[1] != stamp:
+                    self.stale += 1
+                elif now - entry[2] >= self.ttl:
+                    self.expired += 1
+                else:
+                    self._entries.move_to_end(cache_key)
+                    self.hits += 1
+                    return entry[3]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            # A write that landed while we were loading leaves the stamp behind; keep
+            # the old one so the next read reloads instead of trusting this value.
+            self._entries[cache_key] = (tables, stamp, now, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *tables):
+        """Drop everything read from `tables` (all reference data when none are given)."""
+        tables = set(tables or REFERENCE_TABLES)
+        with self._lock:
+            for table in tables:
+                self._local_versions[table] = self._local_versions.get(table, 0) + 1
+            for cache_key in [k for k, entry in self._entries.items() if tables.intersection(entry[0])]:
+                del self._entries[cache_key]
+            # Re-read the counters on the next get(), so the trigger bump from
+            # this write doesn't cause a second reload later
+            self._checked_at = None
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = None
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "version_checks": self.version_checks,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+reference_cache = ReferenceCache()
+
+
+def cached_reference(*tables):
+    """
+    Cache a reader of reference data by its arguments:
+
+        @cached_reference("leagues")
+        def get_league_dates(league_name): ...
+
+    `fn.uncached` still reaches the database directly.
+    """
+    def decorator(fn):
+        namespace = f"{fn.__module__}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            return reference_cache.get(namespace, key, tables, lambda: fn(*args, **kwargs))
+
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
+
+
+def invalidate(*tables):
+    """Called by write paths after changing leagues / teams / stages / players."""
+    reference_cache.invalidate(*tables)
@@ -0,0 +1,214 @@
+# reminder_scheduler.py
+# Sends the '2days' / '1day' / '2hours' reminder e-mails on time, without an
+# admin at the keyboard. Upcoming rounds.prediction_deadline values feed a heap
+# of (fire_at, round_id, level); reminder_log (db_migrations #9) makes every
+# level fire once per round, across restarts and across processes.
+# Run standalone (cron / systemd / a second process):
+#   python -m Controllers.reminder_scheduler [--once]
+# or let app.py start it as a daemon thread with start_in_background().
+import sys
+import json
+import time
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+from Controllers.db_controller import pool
+from Controllers.utils import fetch_all
+from Controllers.predictions_controller import get_upcoming_rounds
+from Controllers.send_email import send_reminder_email_to_all
+from Controllers.mailer import deliver_outbox
+from config import REMINDERS_ENABLED, REMINDER_REFRESH_SECONDS
+
+# level → how long before the prediction deadline it goes out (earliest first)
+REMINDER_LEVELS = (
+    ("2days", timedelta(days=2)),
+    ("1day", timedelta(days=1)),
+    ("2hours", timedelta(hours=2)),
+)
+CLAIM_TIMEOUT = 30 * 60   # a claim this old belongs to a crashed sender and is taken over
+MAX_SLEEP_SECONDS = 60
+
+_started = False
+_start_lock = threading.Lock()
+
+
+# ------------------- reminder_log ------------------- #
+
+def _claim(round_id, level, deadline):
+    """True if this process now owns sending (round, level)."""
+    now = time.time()
+    conn = pool.connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute("""
+            INSERT OR IGNORE INTO reminder_log (round_id, level, deadline, status, claimed_ts)
+            VALUES (?, ?, ?, 'claimed', ?)
+        """, (round_id, level, deadline.isoformat(), now))
+        owned = cur.rowcount == 1
+        if not owned:
+            cur = conn.execute("""
+                UPDATE reminder_log SET claimed_ts = ?
+                WHERE round_id = ? AND level = ? AND status = 'claimed' AND claimed_ts < ?
+            """, (now, round_id, level, now - CLAIM_TIMEOUT))
+            owned = cur.rowcount == 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return owned
+
+
+def _finish(round_id, level, deadline, status, report=None):
+    conn = pool.connection()
+    try:
+        conn.execute("""
+            INSERT INTO reminder_log (round_id, level, deadline, status, claimed_ts, finished_ts, report)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (round_id, level) DO UPDATE
+            SET status = excluded.status, finished_ts = excluded.finished_ts, report = excluded.report
+        """, (round_id, level, deadline.isoformat(), status, time.time(), time.time(),
+              json.dumps(report) if report is not None else None))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+# ------------------- Scheduler ------------------- #
+
+class ReminderScheduler:
+    """
+    Min-heap of pending reminders, rebuilt from the database every
+    `refresh_seconds` (deadlines move when fixtures are rescheduled).
+    Round summaries are loaded once per refresh, not once per e-mail.
+    """
+
+    def __init__(self, refresh_seconds=REMINDER_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._heap = []
+        self._rounds = {}
+        self._refreshed_at = None
+
+    def refresh(self):
+        # Rounds without predictable matches have nothing to remind about
+        self._rounds = {r["round_id"]: r for r in get_upcoming_rounds() if r["match_count"]}
+        finished = {
+            (row[0], row[1]) for row in fetch_all("""
+                SELECT round_id, level FROM reminder_log
+                WHERE status != 'claimed' AND round_id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(list(self._rounds)),))
+        }
+        self._heap = [
+            (summary["deadline"] - offset, round_id, level)
+            for round_id, summary in self._rounds.items()
+            for level, offset in REMINDER_LEVELS
+            if (round_id, level) not in finished
+        ]
+        heapq.heapify(self._heap)
+        self._refreshed_at = time.monotonic()
+
+    def run_due(self, now=None):
+        """
+        Fire every reminder whose time has come. When several levels of one round
+        are due at once (the scheduler was down), only the latest is sent and the
+        older ones are marked skipped.
+
+        Returns:
+            list: (round_id, level) pairs sent by this call.
+        """
+        now = now or datetime.utcnow()
+        due = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, round_id, level = heapq.heappop(self._heap)
+            due.setdefault(round_id, []).append(level)
+
+        sent = []
+        for round_id, levels in due.items():
+            summary = self._rounds[round_id]
+            deadline = summary["deadline"]
+            if now >= deadline:
+                for level in levels:
+                    _finish(round_id, level, deadline, "skipped")
+                continue
+            *missed, level = levels
+            for old_level in missed:
+                _finish(round_id, old_level, deadline, "skipped")
+            if not _claim(round_id, level, deadline):
+                continue
+            # Outbox dedupe keys make a retried claim resend only to players who didn't get it
+            report = send_reminder_email_to_all(
+                round_id=round_id,
+                round_name=summary["round_name"],
+                deadline=deadline,
+                match_time=summary["first_match_time"],
+                match_count=summary["match_count"],
+                level=level,
+            )
+            if report is not None:
+                _finish(round_id, level, deadline, "sent", report)
+                sent.append((round_id, level))
+        return sent
+
+    def tick(self):
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.refresh()
+        sent = self.run_due()
+        # Retry anything the outbox still holds from earlier runs
+        deliver_outbox()
+        return sent
+
+    def seconds_until_next(self):
+        wait = self.refresh_seconds - (time.monotonic() - self._refreshed_at)
+        if self._heap:
+            wait = min(wait, (self._heap[0][0] - datetime.utcnow()).total_seconds())
+        return max(1.0, min(wait, MAX_SLEEP_SECONDS))
+
+    def upcoming(self):
+        """Pending reminders, soonest first: [(fire_at, round_name, level)]."""
+        return [(fire_at, self._rounds[round_id]["round_name"], level) for fire_at, round_id, level in sorted(self._heap)]
+
+
+def get_scheduled_reminders():
+    """Snapshot of pending reminders straight from the database (for the admin page)."""
+    scheduler = ReminderScheduler()
+    scheduler.refresh()
+    return scheduler.upcoming()
+
+
+def run_once():
+    """One scheduling pass. Returns the (round_id, level) pairs sent."""
+    return ReminderScheduler().tick()
+
+
+def run_forever(refresh_seconds=REMINDER_REFRESH_SECONDS):
+    scheduler = ReminderScheduler(refresh_seconds)
+    while True:
+        try:
+            for round_id, level in scheduler.tick():
+                print(f"⏰ Reminder scheduler: sent {level} reminder for round {round_id}")
+        except Exception as e:
+            print(f"❌ Reminder scheduler failed: {e}")
+        finally:
+            pool.release_thread()   # don't hold a pooled connection while asleep
+        time.sleep(scheduler.seconds_until_next() if scheduler._refreshed_at else MAX_SLEEP_SECONDS)
+
+
+def start_in_background(refresh_seconds=REMINDER_REFRESH_SECONDS):
+    """Start the scheduler once per process (safe to call on every Streamlit rerun)."""
+    global _started
+    if not REMINDERS_ENABLED:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=run_forever, args=(refresh_seconds,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    if "--once" in sys.argv:
+        sent = run_once()
+        print(f"✅ {len(sent)} reminders sent")
+    else:
+        run_forever()
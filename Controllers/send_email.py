@@ -1,22 +1,9 @@
-import os
-import smtplib
-import sqlite3
-from datetime import datetime, timedelta
-from dotenv import load_dotenv, find_dotenv
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from datetime import datetime
 from Controllers.utils import fetch_all
-from Controllers.predictions_controller import get_predicted_matches_for_player, get_next_round_info, get_matches_for_round, get_player_id_by_username
+from Controllers.mailer import queue_emails, request_delivery
+from Controllers.predictions_controller import get_matches_for_round
 from datetime import datetime, timezone
 
-# Load environment variables
-load_dotenv(find_dotenv(), override=True)  # override=True forces reloading and overwriting existing env vars
-
-
-SMTP_SERVER = os.getenv('SMTP_SERVER')
-SMTP_PORT = int(os.getenv('SMTP_PORT'))
-SENDER_EMAIL = os.getenv('SENDER_EMAIL')
-SENDER_PASSWORD = os.getenv('SENDER_PASSWORD')
 
 def get_all_player_emails():
     """Returns a list of all player emails and usernames."""
@@ -25,194 +12,201 @@ def get_all_player_emails():
     return [(row["username"], row["email"]) for row in rows]
 
 
-
-
-
-def send_reminder_email_to_all(round_id, round_name, deadline, match_time, match_count, level='test'):
-    """
-    Send personalized reminder emails, showing prediction status per player.
-    Converts deadline and match_time to datetime if they are strings.
+def get_round_prediction_status(round_id):
     """
+    Every player with the ids of the round's predictable matches they already
+    predicted, in one grouped query.
 
-    # Helper to parse datetime string or pass-through if datetime
-    def parse_datetime(value, name):
-        if isinstance(value, datetime):
-            return value
-        try:
-            return datetime.fromisoformat(value)
-        except Exception:
-            raise ValueError(f"Invalid datetime format for {name}: {value}")
-
-    try:
-        deadline = parse_datetime(deadline, "deadline")
-        match_time = parse_datetime(match_time, "match_time")
-        # Ensure these are timezone-aware in UTC (important for timedelta)
-        if deadline.tzinfo is None:
-            deadline = deadline.replace(tzinfo=timezone.utc)
-        if match_time.tzinfo is None:
-            match_time = match_time.replace(tzinfo=timezone.utc)
-    except ValueError as e:
-        print(f"❌ Date parsing error: {e}")
-        return
-
-    now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-    time_left = deadline - now_utc
-    days = time_left.days
-    hours = time_left.seconds // 3600
-    minutes = (time_left.seconds % 3600) // 60
-    time_left_str = f"{days} days, {hours} hours, {minutes} minutes"
-
-    # Get all players
-    recipients = get_all_player_emails()  # [(username, email)]
-
-    # Get all matches for the round once (list of dicts with id, home_team, away_team)
-    all_matches = get_matches_for_round(round_id)
-
-    try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-
-            for username, email in recipients:
-                player_id = get_player_id_by_username(username)  # You need to implement or replace this
-
-                # Get this player's predicted matches for this round
-                player_predictions = get_predicted_matches_for_player(player_id, round_id)
-                predicted_match_ids = {p['match_id'] for p in player_predictions}
-
-                # Prepare predicted matches text
-                predicted_matches_text = "\n".join(
-                    [f"- {p['home_team']} vs {p['away_team']}" for p in player_predictions]
-                ) or "None yet!"
-
-                # Prepare unpredicted matches text
-                unpredicted_matches = [
-                    m for m in all_matches if m['id'] not in predicted_match_ids
-                ]
-                unpredicted_matches_text = "\n".join(
-                    [f"- {m['home_team']} vs {m['away_team']}" for m in unpredicted_matches]
-                ) or "All predicted! 🎉"
-
-                predicted_count = len(player_predictions)
-
-                # Define subject and body templates based on level
-                if level == "2days":
-                    subject = f"⏳ Just 2 Days Left – Get Ready for {round_name}!"
-                    body_template = f"""
+    Returns:
+        list: (player_id, username, email, set of predicted match ids)
+    """
+    rows = fetch_all("""
+        SELECT pl.id, pl.username, pl.email, GROUP_CONCAT(p.match_id) AS predicted
+        FROM players pl
+        LEFT JOIN predictions p
+               ON p.player_id = pl.id
+              AND p.match_id IN (SELECT id FROM matches WHERE round_id = ? AND is_predictable = 1)
+        GROUP BY pl.id
+    """, (round_id,))
+    return [
+        (row["id"], row["username"], row["email"],
+         {int(match_id) for match_id in row["predicted"].split(",")} if row["predicted"] else set())
+        for row in rows
+    ]
+
+
+# level → (subject, body); filled per player with str.format
+REMINDER_TEMPLATES = {
+    "2days": ("⏳ Just 2 Days Left – Get Ready for {round_name}!", """
 Hi {username} ⚽,
 
 The excitement is building! The round **{round_name}** kicks off soon.
 
-🗓 Match Time: {match_time.strftime('%Y-%m-%d %H:%M')} (UTC)
-⏰ Deadline to Predict: {deadline.strftime('%Y-%m-%d %H:%M')} (UTC) — that's {time_left_str} left
+🗓 Match Time: {match_time} (UTC)
+⏰ Deadline to Predict: {deadline} (UTC) — that's {time_left} left
 📊 Number of Matches: {match_count}
 
 ✅ You've predicted {predicted_count} matches:
-{predicted_matches_text}
+{predicted_matches}
 
 ⚠️ You still need to predict these matches:
-{unpredicted_matches_text}
+{unpredicted_matches}
 
 You've still got **2 full days** to make your predictions. Don’t miss out – the leaderboard is waiting!
 
 🔥 Show us your football wisdom!
-"""
-                elif level == "1day":
-                    subject = f"⏰ Only 1 Day Left to Predict – {round_name} Awaits!"
-                    body_template = f"""
+"""),
+    "1day": ("⏰ Only 1 Day Left to Predict – {round_name} Awaits!", """
 Hey {username} ⚽,
 
 Only **1 day left** until the deadline for round **{round_name}**.
 
-🗓 Match Time: {match_time.strftime('%Y-%m-%d %H:%M')} (UTC)
-⏰ Prediction Deadline: {deadline.strftime('%Y-%m-%d %H:%M')} (UTC) — that's {time_left_str} left
+🗓 Match Time: {match_time} (UTC)
+⏰ Prediction Deadline: {deadline} (UTC) — that's {time_left} left
 📊 Matches in Round: {match_count}
 
 ✅ You've predicted {predicted_count} matches:
-{predicted_matches_text}
+{predicted_matches}
 
 ⚠️ You still need to predict these matches:
-{unpredicted_matches_text}
+{unpredicted_matches}
 
 Your next big move could change the game. Submit your predictions now and stay ahead of the pack!
 
 💪 Let’s make it count!
-"""
-                elif level == "2hours":
-                    subject = f"🚨 FINAL CALL, {round_name} Starts Soon!"
-                    body_template = f"""
+"""),
+    "2hours": ("🚨 FINAL CALL, {round_name} Starts Soon!", """
 Hi {username},
 
 ⏰ Time's almost up! This is your **FINAL REMINDER** to submit predictions for **{round_name}**.
 
-Deadline: {deadline.strftime('%Y-%m-%d %H:%M')} (UTC) — that's {time_left_str} left
+Deadline: {deadline} (UTC) — that's {time_left} left
 
 ✅ You've predicted {predicted_count} matches:
-{predicted_matches_text}
+{predicted_matches}
 
 ⚠️ You still need to predict these matches:
-{unpredicted_matches_text}
+{unpredicted_matches}
 
 ⚠️ If you've already predicted – you're awesome. If not, now's your last chance!
 
 🏁 Let's kick off in style!
-"""
-                elif level == "test":
-                    subject = f"🧪 Test Reminder for {round_name}"
-                    body_template = f"""
+"""),
+    "test": ("🧪 Test Reminder for {round_name}", """
 Hi {username},
 
 This is a **test email** for round **{round_name}** reminder system.
 
-🗓 Match Time: {match_time.strftime('%Y-%m-%d %H:%M')} (UTC)
-⏰ Prediction Deadline: {deadline.strftime('%Y-%m-%d %H:%M')} (UTC) — that's {time_left_str} left
+🗓 Match Time: {match_time} (UTC)
+⏰ Prediction Deadline: {deadline} (UTC) — that's {time_left} left
 📊 Number of Matches: {match_count}
 
 ✅ You have predicted {predicted_count} matches:
-{predicted_matches_text}
+{predicted_matches}
 
 ⚠️ Matches left to predict:
-{unpredicted_matches_text}
+{unpredicted_matches}
 
 Thanks for being part of the prediction game!
 
 Best,
 The Match Predictor Team
-"""
-                else:
-                    print("⚠️ Invalid reminder level provided.")
-                    return
+"""),
+}
 
-                message = MIMEMultipart()
-                message["From"] = SENDER_EMAIL
-                message["To"] = email
-                message["Subject"] = subject
-                message.attach(MIMEText(body_template, "plain"))
 
-                server.sendmail(SENDER_EMAIL, email, message.as_string())
+def build_reminder_emails(round_id, round_name, deadline, match_time, match_count, level):
+    """
+    Render one reminder per player. Round data is loaded once and each player's
+    status comes from get_round_prediction_status(), so this is two queries in total.
 
-        print(f"✅ {level.upper()} reminder sent to {len(recipients)} players.")
+    Returns:
+        list: Message dicts for mailer.queue_emails().
+    """
+    subject_template, body_template = REMINDER_TEMPLATES[level]
+    now_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
+    time_left = deadline - now_utc
+    shared = {
+        "round_name": round_name,
+        "match_count": match_count,
+        "match_time": match_time.strftime('%Y-%m-%d %H:%M'),
+        "deadline": deadline.strftime('%Y-%m-%d %H:%M'),
+        "time_left": f"{time_left.days} days, {time_left.seconds // 3600} hours, {(time_left.seconds % 3600) // 60} minutes",
+    }
+    subject = subject_template.format(**shared)
 
-    except Exception as e:
-        print(f"❌ Failed to send {level.upper()} reminder:", e)
+    # Get all matches for the round once (list of dicts with id, home_team, away_team)
+    match_lines = [(m["id"], f"- {m['home_team']} vs {m['away_team']}") for m in get_matches_for_round(round_id)]
+
+    messages = []
+    for player_id, username, email, predicted_ids in get_round_prediction_status(round_id):
+        predicted = [line for match_id, line in match_lines if match_id in predicted_ids]
+        unpredicted = [line for match_id, line in match_lines if match_id not in predicted_ids]
+        body = body_template.format(
+            username=username,
+            predicted_count=len(predicted),
+            predicted_matches="\n".join(predicted) or "None yet!",
+            unpredicted_matches="\n".join(unpredicted) or "All predicted! 🎉",
+            **shared,
+        )
+        messages.append({
+            "kind": f"reminder_{level}",
+            # Test sends may repeat; real reminders go out once per player, round and level
+            "dedupe_key": None if level == "test" else f"reminder:{round_id}:{level}:{player_id}",
+            "recipient": email,
+            "subject": subject,
+            "body": body,
+        })
+    return messages
 
 
+def send_reminder_email_to_all(round_id, round_name, deadline, match_time, match_count, level='test'):
+    """
+    Send personalized reminder emails, showing prediction status per player.
+    Converts deadline and match_time to datetime if they are strings.
 
+    Returns:
+        dict: {"queued": number of e-mails added to the outbox}, or None on bad input.
+        Delivery happens in the background (mailer.request_delivery()).
+    """
 
+    # Helper to parse datetime string or pass-through if datetime
+    def parse_datetime(value, name):
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except Exception:
+            raise ValueError(f"Invalid datetime format for {name}: {value}")
+
+    try:
+        deadline = parse_datetime(deadline, "deadline")
+        match_time = parse_datetime(match_time, "match_time")
+        # Ensure these are timezone-aware in UTC (important for timedelta)
+        if deadline.tzinfo is None:
+            deadline = deadline.replace(tzinfo=timezone.utc)
+        if match_time.tzinfo is None:
+            match_time = match_time.replace(tzinfo=timezone.utc)
+    except ValueError as e:
+        print(f"❌ Date parsing error: {e}")
+        return
 
+    if level not in REMINDER_TEMPLATES:
+        print("⚠️ Invalid reminder level provided.")
+        return
 
+    try:
+        messages = build_reminder_emails(round_id, round_name, deadline, match_time, match_count, level)
+        queued = queue_emails(messages)
+        request_delivery()
+        print(f"✅ {level.upper()} reminder queued for {queued} players.")
+        return {"queued": queued}
+    except Exception as e:
+        print(f"❌ Failed to send {level.upper()} reminder:", e)
 
 
 if __name__ == "__main__":
-    round_name, deadline, match_time, match_count = get_next_round_info()
-    now = datetime.now()
-
-    if now.date() == (deadline - timedelta(days=2)).date():
-        send_reminder_email_to_all(round_name, deadline, match_time, match_count, "2days")
-    elif now.date() == (deadline - timedelta(days=1)).date():
-        send_reminder_email_to_all(round_name, deadline, match_time, match_count, "1day")
-    elif now.strftime("%Y-%m-%d %H:%M") == deadline.strftime("%Y-%m-%d %H:%M"):
-        send_reminder_email_to_all(round_name, deadline, match_time, match_count, "2hours")
-    else:
-        print("Notjing happens")
-        send_reminder_email_to_all(round_name, deadline, match_time, match_count, "2days")
\ No newline at end of file
+    # Reminder levels are fired on schedule by Controllers/reminder_scheduler.py; this runs one pass of it
+    from Controllers.reminder_scheduler import run_once
+    sent = run_once()
+    print(f"✅ {len(sent)} reminders sent")
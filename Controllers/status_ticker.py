@@ -0,0 +1,58 @@
+# status_ticker.py
+# Moves matches upcoming → live → finished as kick-off times pass, so statuses
+# stay right between API syncs. Run standalone (cron / systemd / a second
+# process):  python -m Controllers.status_ticker [--once]
+# or let app.py start it as a daemon thread with start_in_background().
+import sys
+import time
+import threading
+
+from Controllers.db_controller import pool
+from Controllers.live_controller import refresh_match_statuses
+from config import STATUS_TICK_SECONDS
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def tick():
+    """One targeted status pass in its own transaction. Returns the number of matches changed."""
+    conn = pool.connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        changed = refresh_match_statuses(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return changed
+
+
+def run_forever(interval=STATUS_TICK_SECONDS):
+    while True:
+        try:
+            changed = tick()
+            if changed:
+                print(f"⏱️ Status ticker: {changed} matches updated")
+        except Exception as e:
+            print(f"❌ Status ticker failed: {e}")
+        finally:
+            pool.release_thread()   # don't hold a pooled connection while asleep
+        time.sleep(interval)
+
+
+def start_in_background(interval=STATUS_TICK_SECONDS):
+    """Start the ticker once per process (safe to call on every Streamlit rerun)."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=run_forever, args=(interval,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    if "--once" in sys.argv:
+        print(f"✅ {tick()} match statuses updated")
+    else:
+        run_forever()
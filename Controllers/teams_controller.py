@@ -1,35 +1,29 @@
-from Controllers.utils import fetch_all, fetch_one
+from Controllers.utils import fetch_all, fetch_one, fetch_model, fetch_models, fetch_results
+from Controllers.models import Team, MatchDetails
+from Controllers.reference_cache import cached_reference
+from config import TEAMS_PAGE_SIZE
 
-def get_all_teams():
-    query = """
-        SELECT *
-        FROM teams
-        ORDER BY name
-    """
-    return fetch_all(query)
-
-
-def get_team_full_info(team_id):
-    team = fetch_one(f"""
+# 📋 Team-page statements. Ids and names are always bound as parameters, so each
+# statement text is compiled once per connection and then reused from the
+# statement cache (DB_STATEMENT_CACHE_SIZE).
+TEAM_QUERIES = {
+    "team": """
         SELECT *
         FROM teams
-        WHERE id = {team_id}
-    """)
-
-    coach = fetch_one(f"""
+        WHERE id = :team_id
+    """,
+    "coach": """
         SELECT *
         FROM coaches
-        WHERE team_id = {team_id}
-    """)
-
-    players = fetch_all(f"""
+        WHERE team_id = :team_id
+    """,
+    "players": """
         SELECT *
         FROM football_player
-        WHERE team_id = {team_id}
+        WHERE team_id = :team_id
         ORDER BY shirt_number
-    """)
-
-    matches = fetch_all(f"""
+    """,
+    "matches": """
         SELECT 
             DATE(m.match_datetime) AS match_date,
             l.name AS league_name,
@@ -37,6 +31,7 @@ def get_team_full_info(team_id):
             s.name AS stage_name,
             m.matchday,
             m.match_datetime,
+            m.match_ts,
             m.status,
             m.api_match_id AS match_id,
             m.home_score,
@@ -55,53 +50,25 @@ def get_team_full_info(team_id):
         JOIN teams ht ON m.home_team_id = ht.id
         JOIN teams at ON m.away_team_id = at.id
         LEFT JOIN stages s ON m.stage_id = s.id
-        WHERE m.home_team_id = {team_id} OR m.away_team_id = {team_id}
+        WHERE m.home_team_id = :team_id OR m.away_team_id = :team_id
         ORDER BY m.match_datetime ASC
-    """)
-
-    competitions = fetch_all(f"""
-        SELECT tc.*, l.name AS league_name
+    """,
+    "competitions": """
+        SELECT tc.*, l.name AS league_name, l.logo_path, l.country
         FROM team_competitions tc
         JOIN leagues l ON tc.league_id = l.id
-        WHERE tc.team_id = {team_id}
+        WHERE tc.team_id = :team_id
         ORDER BY tc.season_start DESC
-    """)
-
-    return {
-        "team": team,
-        "coach": coach,
-        "players": players,
-        "matches": matches,
-        "competitions": competitions
-    }
-    
-def get_league_info_for_team(team_id):
-    # Step 1: Get the team's nationality
-    team = fetch_one(f"""
-        SELECT nationality, name
-        FROM teams
-        WHERE id = {team_id}
-    """)
-    if not team or not team['nationality']:
-        return None
-
-    nationality = team['nationality']
-
-    # Step 2: Find the league whose country matches the team's nationality
-    league = fetch_one(f"""
-        SELECT *
-        FROM leagues
-        WHERE country = '{nationality}'
+    """,
+    "league_for_team": """
+        SELECT l.*
+        FROM teams t
+        JOIN leagues l ON l.country = t.nationality
+        WHERE t.id = :team_id
+        ORDER BY l.id
         LIMIT 1
-    """)
-    if not league:
-        print(f"⚠️ No league found for team '{team['name']}' with nationality '{nationality}'")
-        return None
-
-    return league
-
-def get_team_squad(team_id):
-    query = f"""
+    """,
+    "squad": """
         SELECT 
             id,
             name,
@@ -118,7 +85,7 @@ def get_team_squad(team_id):
             contract_start,
             contract_until
         FROM football_player
-        WHERE team_id = {team_id}
+        WHERE team_id = :team_id
         ORDER BY 
             CASE 
                 WHEN position = 'Goalkeeper' THEN 1
@@ -128,25 +95,157 @@ def get_team_squad(team_id):
                 ELSE 5
             END,
             shirt_number ASC
+    """,
+    "participated_leagues": """
+        SELECT 
+            l.id AS league_id,
+            l.name AS league_name,
+            l.logo_path,
+            l.country,
+            tc.season_start,
+            tc.season_end
+        FROM team_competitions tc
+        JOIN leagues l ON tc.league_id = l.id
+        WHERE tc.team_id = :team_id
+        ORDER BY tc.season_start DESC
+    """,
+    "filter_nationalities": """
+        SELECT nationality, COUNT(*) AS team_count
+        FROM teams
+        WHERE nationality IS NOT NULL
+        GROUP BY nationality
+        ORDER BY nationality
+    """,
+    "filter_leagues": """
+        SELECT l.id, l.name, COUNT(*) AS team_count
+        FROM team_competitions tc
+        JOIN leagues l ON l.id = tc.league_id
+        GROUP BY l.id
+        ORDER BY l.name
+    """,
+    "team_id_by_name": """
+        SELECT id
+        FROM teams
+        WHERE name = :team_name COLLATE NOCASE
+        LIMIT 1
+    """,
+}
+
+@cached_reference("teams")
+def get_all_teams():
+    query = """
+        SELECT *
+        FROM teams
+        ORDER BY name
     """
-    return fetch_all(query)
+    return fetch_models(Team, query)
 
-def get_participated_league(team_id):
-    query = f"""
-        SELECT 
-        l.id AS league_id,
-        l.name AS league_name,
-        l.logo_path,
-        l.country,
-        tc.season_start,
-        tc.season_end
-    FROM team_competitions tc
-    JOIN leagues l ON tc.league_id = l.id
-    WHERE tc.team_id = {team_id}
-    ORDER BY tc.season_start DESC;
+
+# Optional Teams-tab filters; each one is an indexed lookup
+TEAM_PAGE_FILTERS = {
+    "nationality": "nationality = :nationality",
+    "league_id": "id IN (SELECT team_id FROM team_competitions WHERE league_id = :league_id)",
+}
+
+
+def _team_filters(nationality, league_id):
+    params = {"nationality": nationality, "league_id": league_id}
+    clauses = [sql for name, sql in TEAM_PAGE_FILTERS.items() if params[name] is not None]
+    return clauses, params
+
+
+def get_teams_page(nationality=None, league_id=None, after=None, limit=TEAMS_PAGE_SIZE):
+    """
+    One page of the team gallery, in name order.
+
+    Args:
+        nationality (str): Only teams from this country.
+        league_id (int): Only teams that played in this league.
+        after (str): Keyset cursor — the last team name of the previous page.
+        limit (int): Page size.
+
+    Returns:
+        tuple: ([Team], next_cursor) — next_cursor is None on the last page.
+    """
+    clauses, params = _team_filters(nationality, league_id)
+    if after is not None:
+        clauses.append("name > :after")
+    params.update(after=after, limit=limit + 1)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    teams = fetch_models(Team, f"""
+        SELECT *
+        FROM teams
+        {where}
+        ORDER BY name
+        LIMIT :limit
+    """, params)
+    has_more = len(teams) > limit
+    teams = teams[:limit]
+    return teams, (teams[-1].name if has_more else None)
+
+
+def count_teams(nationality=None, league_id=None):
+    clauses, params = _team_filters(nationality, league_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return fetch_one(f"SELECT COUNT(*) FROM teams {where}", params)[0]
+
+
+@cached_reference("teams", "leagues")
+def get_team_filters():
+    """
+    Choices for the gallery filters.
+
+    Returns:
+        dict: {"nationalities": [(nationality, team_count)], "leagues": [(id, name, team_count)]}
     """
-    return fetch_all(query)
+    return {
+        "nationalities": [tuple(row) for row in fetch_all(TEAM_QUERIES["filter_nationalities"])],
+        "leagues": [tuple(row) for row in fetch_all(TEAM_QUERIES["filter_leagues"])],
+    }
+
 
+def get_team_full_info(team_id, team=None):
+    """
+    Everything the team page shows about one team, read in a single snapshot.
+
+    Args:
+        team_id (int): The team.
+        team: The team's row when the caller already has it (e.g. from the gallery page).
+
+    Returns:
+        dict: team, coach, players, squad (position order), matches and competitions.
+    """
+    statements = {
+        "coach": (TEAM_QUERIES["coach"], "one"),
+        "players": (TEAM_QUERIES["players"], "all"),
+        "squad": (TEAM_QUERIES["squad"], "all"),
+        "matches": (TEAM_QUERIES["matches"], "all"),
+        "competitions": (TEAM_QUERIES["competitions"], "all"),
+    }
+    if team is None:
+        statements = {"team": (TEAM_QUERIES["team"], "one"), **statements}
+    info = fetch_results(statements, {"team_id": team_id})
+    if team is not None:
+        info = {"team": team, **info}
+    return info
+
+@cached_reference("teams", "leagues")
+def get_league_info_for_team(team_id):
+    # The league played in the team's country
+    league = fetch_one(TEAM_QUERIES["league_for_team"], {"team_id": team_id})
+    if not league:
+        print(f"⚠️ No league found for team {team_id}")
+        return None
+
+    return league
+
+def get_team_squad(team_id):
+    return fetch_all(TEAM_QUERIES["squad"], {"team_id": team_id})
+
+def get_participated_league(team_id):
+    return fetch_all(TEAM_QUERIES["participated_leagues"], {"team_id": team_id})
+
+@cached_reference("teams")
 def get_team_id_by_name(team_name):
     """
     Fetch the team ID by its name (case-insensitive).
@@ -160,13 +259,7 @@ def get_team_id_by_name(team_name):
     if not team_name:
         return None
 
-    query = f"""
-        SELECT id
-        FROM teams
-        WHERE LOWER(name) = LOWER('{team_name}')
-        LIMIT 1
-    """
-    result = fetch_one(query)
+    result = fetch_one(TEAM_QUERIES["team_id_by_name"], {"team_name": team_name})
     return result["id"] if result else None
 
 def get_match_full_info(match_id):
@@ -175,12 +268,12 @@ def get_match_full_info(match_id):
     - Teams (names + IDs)
     - Round, Stage, and League info
     - Match rules (allows_draw, has_penalties, is_two_legged)
-    Returns a clean dictionary ready for render_prediction_form().
+    Returns a MatchDetails with the match rules and team ids.
     """
 
     query = """
         SELECT 
-            m.id AS match_id,
+            m.id,
             m.home_team_id,
             m.away_team_id,
             th.name AS home_team,
@@ -204,31 +297,13 @@ def get_match_full_info(match_id):
         WHERE m.id = ?
     """
 
-    row = fetch_one(query, (match_id,))
-    if not row:
+    match_info = fetch_model(MatchDetails, query, (match_id,))
+    if not match_info:
         raise ValueError(f"❌ No match found with id {match_id}")
 
-    # Build the dict
-    match_info = {
-        "id": row["match_id"],
-        "home_team_id": row["home_team_id"],
-        "away_team_id": row["away_team_id"],
-        "home_team": row["home_team"],
-        "away_team": row["away_team"],
-        "match_datetime": row["match_datetime"],
-        "allows_draw": row["allows_draw"],
-        "has_penalties": row["has_penalties"],
-        "is_two_legged": row["is_two_legged"],
-        "round_id": row["round_id"],
-        "round_name": row["round_name"],
-        "stage_id": row["stage_id"],
-        "stage_name": row["stage_name"],
-        "league_id": row["league_id"],
-        "league_name": row["league_name"]
-    }
-
     return match_info
 
+@cached_reference("teams")
 def get_team_name_by_id(team_id):
     """
     Fetch the team name given its ID.
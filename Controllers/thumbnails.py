@@ -0,0 +1,207 @@
+# thumbnails.py
+# Small, pre-sized copies of crests, league logos and avatars. Pages used to
+# inline the original files (often several hundred KB) as base64 even where
+# they are drawn at 20–90 px; renderers now ask for the variant that matches
+# the display size (see Renders/asset_cache.image_data_uri).
+#
+# Variants live in THUMBNAIL_DIR, named after the source image's content hash,
+# so identical images stored under several names share one set. manifest.json maps every source path (with its mtime/size) to
+# its hash and the variants written for it.
+#
+#   python -m Controllers.thumbnails          # build variants for every asset folder
+import os
+import io
+import sys
+import json
+import hashlib
+import threading
+
+from PIL import Image, features
+
+from config import THUMBNAIL_DIR, THUMBNAIL_SIZES
+
+SOURCE_DIRS = (
+    os.path.join("Assets", "Teams"),
+    os.path.join("Assets", "Clubs"),
+    os.path.join("Assets", "Leagues"),
+    os.path.join("Assets", "Avatars"),
+)
+RASTER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+VARIANT_FORMAT = "WEBP" if features.check("webp") else "PNG"
+VARIANT_EXTENSION = ".webp" if VARIANT_FORMAT == "WEBP" else ".png"
+PIXEL_DENSITY = 2   # variants are sharp on high-DPI screens
+MANIFEST_NAME = "manifest.json"
+
+
+def _variant_size(display_px):
+    """Smallest configured size that covers `display_px` CSS pixels at PIXEL_DENSITY."""
+    wanted = display_px * PIXEL_DENSITY
+    for size in THUMBNAIL_SIZES:
+        if size >= wanted:
+            return size
+    return THUMBNAIL_SIZES[-1]
+
+
+def _encode(image):
+    buffer = io.BytesIO()
+    if VARIANT_FORMAT == "WEBP":
+        image.save(buffer, format="WEBP", quality=85, method=4)
+    else:
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+class ThumbnailStore:
+    """
+    Content-addressed variant cache with a JSON manifest.
+
+    manifest["sources"][path] = {"mtime_ns", "size", "digest"}
+    manifest["variants"][digest] = {"<size>": filename or null}
+    A null variant means the original is already smaller than any re-encoding,
+    so the original is served.
+    """
+
+    def __init__(self, directory=THUMBNAIL_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._unreadable = set()   # (path, mtime_ns) that PIL couldn't open; not retried
+        self.generated = 0
+
+    def _load(self):
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+            self._manifest.setdefault("sources", {})
+            self._manifest.setdefault("variants", {})
+        return self._manifest
+
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _variants(self, path, stat):
+        """Variant map for an up-to-date source, or None if it must be (re)built."""
+        manifest = self._load()
+        source = manifest["sources"].get(path)
+        if source and source["mtime_ns"] == stat.st_mtime_ns and source["size"] == stat.st_size:
+            return manifest["variants"].get(source["digest"])
+        return None
+
+    def generate(self, path, save=True):
+        """
+        Write every configured variant of one image (used offline and after uploads).
+
+        Returns:
+            dict | None: {"<size>": filename or None}, or None if the file isn't a readable raster image.
+        """
+        path = os.path.normpath(path)
+        if not path.lower().endswith(RASTER_EXTENSIONS):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            variants = self._variants(path, stat)
+        if variants is not None:
+            return variants
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            with self._lock:
+                variants = self._load()["variants"].get(digest)
+            if variants is None:
+                with Image.open(io.BytesIO(data)) as image:
+                    # JPEGs decode straight at a reduced scale when that still covers the largest size
+                    image.draft("RGB", (THUMBNAIL_SIZES[-1], THUMBNAIL_SIZES[-1]))
+                    transparent = "A" in image.getbands() or "transparency" in image.info
+                    image = image.convert("RGBA" if transparent else "RGB")
+                variants = {}
+                # Largest first, each size resampled from the previous one rather than the original
+                for size in reversed(THUMBNAIL_SIZES):
+                    image.thumbnail((size, size), Image.LANCZOS)
+                    encoded = _encode(image)
+                    if len(encoded) >= len(data):
+                        variants[str(size)] = None
+                        continue
+                    filename = f"{digest[:20]}-{size}{VARIANT_EXTENSION}"
+                    os.makedirs(self.directory, exist_ok=True)
+                    with open(os.path.join(self.directory, filename), "wb") as f:
+                        f.write(encoded)
+                    variants[str(size)] = filename
+                self.generated += 1
+        except Exception as e:
+            print(f"[⚠️ Thumbnail skipped]: {path} → {e}")
+            self._unreadable.add((path, stat.st_mtime_ns))
+            return None
+
+        with self._lock:
+            manifest = self._load()
+            manifest["variants"][digest] = variants
+            manifest["sources"][path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": digest}
+            if save:
+                self._save()
+        return variants
+
+    def path_for(self, path, display_px):
+        """
+        File to serve for `path` drawn at `display_px` CSS pixels: the matching
+        variant, built on first use, or the original when there is none.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path
+        key = os.path.normpath(path)
+        with self._lock:
+            variants = self._variants(key, stat)
+        if variants is None and (key, stat.st_mtime_ns) not in self._unreadable:
+            variants = self.generate(key)
+        filename = (variants or {}).get(str(_variant_size(display_px)))
+        if not filename:
+            return path
+        variant_path = os.path.join(self.directory, filename)
+        return variant_path if os.path.exists(variant_path) else path
+
+    def build_all(self, directories=SOURCE_DIRS):
+        """Generate variants for every image under `directories`, recursively (one manifest write)."""
+        built = 0
+        for directory in directories:
+            for root, dirs, files in os.walk(directory):
+                dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != os.path.normpath(self.directory))
+                for name in sorted(files):
+                    if name.lower().endswith(RASTER_EXTENSIONS):
+                        if self.generate(os.path.join(root, name), save=False) is not None:
+                            built += 1
+        with self._lock:
+            self._load()
+            self._save()
+        return built
+
+
+thumbnail_store = ThumbnailStore()
+
+
+def thumbnail_path(path, display_px):
+    return thumbnail_store.path_for(path, display_px)
+
+
+def generate_thumbnails(path):
+    """Call after writing a new crest, logo or avatar to disk."""
+    return thumbnail_store.generate(path)
+
+
+if __name__ == "__main__":
+    # 🖼️ python -m Controllers.thumbnails [folder ...]
+    folders = sys.argv[1:] or SOURCE_DIRS
+    count = thumbnail_store.build_all(folders)
+    print(f"✅ Thumbnails ready for {count} images ({thumbnail_store.generated} newly encoded) in {THUMBNAIL_DIR}")
@@ -0,0 +1,127 @@
+# time_service.py
+# Match kick-offs and prediction deadlines are stored as UTC text and mirrored
+# as integer epochs (matches.match_ts, rounds.deadline_ts — db_migrations #14),
+# so range and status checks compare integers. This module converts between
+# the two and turns whole result sets into a player's local time at once:
+# UTC offsets are looked up once per distinct quarter-hour and every distinct
+# local day / time of day is formatted once, instead of parsing, localizing
+# and formatting each card separately.
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+TIME_FORMAT = '%I:%M %p'
+DATE_FORMAT = '%a %d %b %Y'
+OFFSET_STEP = 900   # timezone transitions fall on quarter hours (UTC)
+_EPOCH = datetime(1970, 1, 1)
+
+
+class LocalTime(NamedTuple):
+    local_dt: datetime
+    time_str: str
+    date_friendly: str
+
+
+def now_ts():
+    """Current UTC time as an epoch integer."""
+    return int(time.time())
+
+
+def to_epoch(value):
+    """
+    Epoch seconds for a stored UTC time: 'YYYY-MM-DDTHH:MM:SS' (optionally with
+    a space instead of 'T' or a trailing 'Z'), a datetime (naive means UTC) or
+    an epoch already.
+
+    Returns:
+        int | None: None for None.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", ""))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def utc_datetime(ts):
+    """Naive UTC datetime for an epoch (the form the stored text parses to)."""
+    return None if ts is None else _EPOCH + timedelta(seconds=ts)
+
+
+def _probe(t, tz):
+    """(utc offset in seconds, tzinfo, fold) in effect at epoch `t`."""
+    dt = datetime.fromtimestamp(t, tz)
+    return int(dt.utcoffset().total_seconds()), dt.tzinfo, dt.fold
+
+
+def localize(timestamps, tz):
+    """
+    Convert epochs to `tz` in one pass. The zone is consulted twice per UTC day
+    (per quarter-hour only on days with a DST change) and each distinct instant,
+    local day and time of day is built once.
+
+    Args:
+        timestamps (iterable): Epoch seconds (UTC).
+        tz (tzinfo): The player's timezone (pytz or zoneinfo).
+
+    Returns:
+        list[LocalTime]: (local_dt, time_str, date_friendly) for each timestamp, in order.
+    """
+    ts = np.fromiter(timestamps, dtype=np.int64)
+    if not ts.size:
+        return []
+
+    probes = []
+    utc_days, day_index = np.unique(ts // 86400, return_inverse=True)
+    day_probe = np.full(len(utc_days), -1, dtype=np.int64)
+    for i, day in enumerate(utc_days.tolist()):
+        first = _probe(day * 86400, tz)
+        if first[0] == _probe(day * 86400 + 86400 - OFFSET_STEP, tz)[0]:
+            day_probe[i] = len(probes)
+            probes.append(first)
+    probe_index = day_probe[day_index]
+    step_probe = {}
+    for row in np.flatnonzero(probe_index < 0).tolist():
+        step = int(ts[row]) // OFFSET_STEP
+        if step not in step_probe:
+            step_probe[step] = len(probes)
+            probes.append(_probe(step * OFFSET_STEP, tz))
+        probe_index[row] = step_probe[step]
+
+    local = ts + np.array([probe[0] for probe in probes], dtype=np.int64)[probe_index]
+    days, seconds = np.divmod(local, 86400)
+    day_keys, date_index = np.unique(days, return_inverse=True)
+    dates = [(_EPOCH + timedelta(days=int(day))).strftime(DATE_FORMAT) for day in day_keys]
+    second_keys, time_index = np.unique(seconds, return_inverse=True)
+    times = [(_EPOCH + timedelta(seconds=int(second))).strftime(TIME_FORMAT) for second in second_keys]
+
+    _, first_row, instant_index = np.unique(ts, return_index=True, return_inverse=True)
+    local_dts = []
+    for row in first_row.tolist():
+        _, tzinfo, fold = probes[probe_index[row]]
+        local_dts.append((_EPOCH + timedelta(seconds=int(local[row]))).replace(tzinfo=tzinfo, fold=fold))
+
+    return [
+        LocalTime(local_dts[i], times[t], dates[d])
+        for i, t, d in zip(instant_index.tolist(), time_index.tolist(), date_index.tolist())
+    ]
+
+
+def localize_rows(rows, tz, field="match_ts"):
+    """
+    Add local_dt / time_str / date_friendly to each dict in `rows` from its
+    `field` epoch. Rows are updated in place and returned.
+    """
+    for row, local in zip(rows, localize((row[field] for row in rows), tz)):
+        row["local_dt"], row["time_str"], row["date_friendly"] = local
+    return rows
+
+
+def local_time(value, tz) -> Optional[LocalTime]:
+    """Single-value form of localize() for a stored UTC time or epoch."""
+    ts = to_epoch(value)
+    return None if ts is None else localize((ts,), tz)[0]
@@ -1,6 +1,7 @@
 # utils.py
 import bcrypt
-from Controllers.db_controller import get_connection
+from Controllers.db_controller import get_connection, pool
+from Controllers.models import row_factory
 
 # ------------------- Password Utilities ------------------- #
 
@@ -13,38 +14,85 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode(), hashed)
 
 # ------------------- Database Utilities ------------------- #
+# All helpers run on the calling thread's pooled connection (see db_controller),
+# so a page full of small queries no longer pays connect/teardown per call.
 
 def execute_query(query, params=(), dict_cursor=False):
     conn = get_connection()
     cur = conn.cursor()
     try:
         cur.execute(query, params)
-        conn.commit() 
+        conn.commit()
         return conn, cur
-    finally:
+    except Exception:
+        conn.rollback()
         cur.close()
-        conn.close()
+        raise
 
 
 def fetch_one(query: str, params: tuple = (), dict_cursor=False):
-    conn = get_connection()
-    cur = conn.cursor()
+    cur = pool.connection().cursor()
     try:
         cur.execute(query, params)
         return cur.fetchone()
     finally:
         cur.close()
-        conn.close()
 
 def fetch_all(query: str, params: tuple = (), dict_cursor=False):
-    conn = get_connection()
-    cur = conn.cursor()
+    cur = pool.connection().cursor()
+    try:
+        cur.execute(query, params)
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+def fetch_models(model, query: str, params: tuple = ()):
+    """fetch_all() that builds `model` instances (Controllers/models.py) straight from the cursor."""
+    cur = pool.connection().cursor()
+    cur.row_factory = row_factory(model)
     try:
         cur.execute(query, params)
         return cur.fetchall()
     finally:
         cur.close()
-        conn.close()
+
+def fetch_model(model, query: str, params: tuple = ()):
+    """fetch_one() counterpart of fetch_models(); None when there is no row."""
+    cur = pool.connection().cursor()
+    cur.row_factory = row_factory(model)
+    try:
+        cur.execute(query, params)
+        return cur.fetchone()
+    finally:
+        cur.close()
+
+def fetch_results(statements: dict, params=()):
+    """
+    Run several SELECTs as one read: one cursor, one snapshot of the database.
+
+    Args:
+        statements (dict): name → (sql, "one" | "all").
+        params: Bound to every statement; a dict of named parameters may carry
+            names that some of the statements don't use.
+
+    Returns:
+        dict: name → row (or None) for "one", list of rows for "all".
+    """
+    conn = pool.connection()
+    cur = conn.cursor()
+    own_transaction = not conn.in_transaction
+    try:
+        if own_transaction:
+            cur.execute("BEGIN")
+        results = {}
+        for name, (query, mode) in statements.items():
+            cur.execute(query, params)
+            results[name] = cur.fetchone() if mode == "one" else cur.fetchall()
+        return results
+    finally:
+        cur.close()
+        if own_transaction and conn.in_transaction:
+            conn.commit()
 
 
 
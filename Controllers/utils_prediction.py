@@ -1,5 +1,9 @@
+import json
+import time
+import hashlib
+import numpy as np
 from Controllers.db_controller import get_connection
-from Controllers.utils import fetch_one, fetch_all, execute_query
+from config import SCORING_CHUNK_SIZE
 
 def calculate_prediction_score(match, prediction):
     actual_home = match['home_score']
@@ -32,21 +36,198 @@ def calculate_prediction_score(match, prediction):
     return score
 
 
+# 🧮 Same rules as calculate_prediction_score, as one SQL expression over
+# predictions `p` joined to matches `m` (only used for finished matches).
+SCORE_SQL = """
+    (CASE
+        WHEN p.predicted_home_score = m.home_score AND p.predicted_away_score = m.away_score THEN 3
+        WHEN (p.predicted_home_score > p.predicted_away_score AND m.home_score > m.away_score)
+          OR (p.predicted_home_score < p.predicted_away_score AND m.home_score < m.away_score)
+          OR (p.predicted_home_score = p.predicted_away_score AND m.home_score = m.away_score) THEN 1
+        ELSE 0
+     END
+     + CASE
+        WHEN m.penalty_winner != 0 AND p.predicted_penalty_winner_id != 0
+         AND m.penalty_winner = p.predicted_penalty_winner_id THEN 1
+        ELSE 0
+     END)
+"""
+
+
+def score_predictions(match_ids=None, round_id=None):
+    """
+    Re-score predictions for finished matches in one transaction.
+
+    Scope is the given matches, a whole round, or (neither given) the whole
+    season. Rows whose score is already right are left alone, so the
+    standings triggers only fire for real changes.
+
+    Returns:
+        dict: {player_id: points gained (or lost)} for players whose score changed.
+    """
+    scope, params = "", ()
+    if match_ids is not None:
+        scope, params = "AND m.id IN (SELECT value FROM json_each(?))", (json.dumps(list(match_ids)),)
+    elif round_id is not None:
+        scope, params = "AND m.round_id = ?", (round_id,)
+
+    changed = f"""
+        m.id = p.match_id
+        AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+        AND p.score IS NOT {SCORE_SQL}
+        {scope}
+    """
+
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(f"""
+            SELECT p.player_id, SUM({SCORE_SQL} - COALESCE(p.score, 0)) AS delta
+            FROM predictions AS p, matches AS m
+            WHERE {changed}
+            GROUP BY p.player_id
+        """, params)
+        deltas = {row[0]: row[1] for row in cur.fetchall()}
+        if deltas:
+            cur.execute(f"""
+                UPDATE predictions AS p
+                SET score = {SCORE_SQL}
+                FROM matches AS m
+                WHERE {changed}
+            """, params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    return deltas
+
+
 def update_scores_for_match(match_id):
-    # Get match details
-    match_query = "SELECT * FROM matches WHERE id = ?;"
-    match_row = fetch_one(match_query, (match_id,))
-    
-    if not match_row or match_row['home_score'] is None or match_row['away_score'] is None:
-        return  # Match not finished
-
-    match = dict(match_row)  # Convert sqlite3.Row to dict
-
-    # Get all predictions for that match
-    pred_query = "SELECT * FROM predictions WHERE match_id = ?;"
-    predictions = fetch_all(pred_query, (match_id,))
-
-    for pred in predictions:
-        score = calculate_prediction_score(match, pred)
-        update_query = "UPDATE predictions SET score = ? WHERE id = ?;"
-        execute_query(update_query, (score, pred['id']))
+    """Re-score one match. Returns per-player deltas (empty if not finished)."""
+    return score_predictions(match_ids=[match_id])
+
+
+def update_scores_for_round(round_id):
+    """Re-score every finished match in a round."""
+    return score_predictions(round_id=round_id)
+
+
+def update_scores_for_season():
+    """Re-score every finished match. Returns per-player deltas."""
+    return recalculate_all_points()["deltas"]
+
+
+def result_hash(home_score, away_score, penalty_winner):
+    return hashlib.sha1(f"{home_score}:{away_score}:{penalty_winner}".encode("utf-8")).hexdigest()
+
+
+def score_chunk(rows):
+    """
+    Vectorized calculate_prediction_score over a chunk of rows shaped
+    (prediction_id, player_id, old_score, predicted_home, predicted_away,
+    predicted_penalty_winner, home_score, away_score, penalty_winner).
+
+    Returns:
+        np.ndarray: New scores, aligned with rows.
+    """
+    data = np.array([row[3:] for row in rows], dtype=object)
+    data[data == None] = 0  # noqa: E711 — NULL penalty winners never match
+    ph, pa, ppw, ah, aa, apw = (data[:, i].astype(np.int64) for i in range(6))
+
+    exact = (ph == ah) & (pa == aa)
+    same_outcome = np.sign(ph - pa) == np.sign(ah - aa)
+    scores = np.where(exact, 3, np.where(same_outcome, 1, 0))
+    scores += ((apw != 0) & (ppw != 0) & (apw == ppw)).astype(np.int64)
+    return scores
+
+
+def recalculate_all_points(chunk_size=SCORING_CHUNK_SIZE, force=False):
+    """
+    Season-wide rescoring in a single pass and a single transaction.
+
+    Matches whose result (score + penalty winner) hashes the same as at the last
+    run, and whose predictions haven't changed since, are skipped. Predictions
+    for the rest are streamed joined with their match result, scored in chunks,
+    and only changed scores are written back with executemany.
+
+    Args:
+        chunk_size (int): Predictions scored per batch.
+        force (bool): Rescore every finished match regardless of its hash.
+
+    Returns:
+        dict: Counts, timing/throughput and per-player `deltas`.
+    """
+    started = time.perf_counter()
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute("""
+            SELECT m.id, m.home_score, m.away_score, m.penalty_winner, ms.result_hash
+            FROM matches m
+            LEFT JOIN match_scoring ms ON ms.match_id = m.id
+            WHERE m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+        """)
+        finished = cur.fetchall()
+        stale = {}
+        for match_id, home, away, penalty_winner, stored_hash in finished:
+            new_hash = result_hash(home, away, penalty_winner)
+            if force or new_hash != stored_hash:
+                stale[match_id] = new_hash
+
+        cur.execute("""
+            SELECT p.id, p.player_id, p.score,
+                   p.predicted_home_score, p.predicted_away_score, p.predicted_penalty_winner_id,
+                   m.home_score, m.away_score, m.penalty_winner
+            FROM predictions p
+            JOIN matches m ON m.id = p.match_id
+            WHERE p.match_id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(list(stale)),))
+
+        writer = conn.cursor()
+        deltas, scanned, updated = {}, 0, 0
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            new_scores = score_chunk(rows)
+            changes = []
+            for row, new_score in zip(rows, new_scores.tolist()):
+                old_score = row[2] or 0
+                if row[2] is None or new_score != old_score:
+                    changes.append((new_score, row[0]))
+                    if new_score != old_score:
+                        deltas[row[1]] = deltas.get(row[1], 0) + new_score - old_score
+            writer.executemany("UPDATE predictions SET score = ? WHERE id = ?", changes)
+            scanned += len(rows)
+            updated += len(changes)
+
+        writer.executemany("""
+            INSERT OR REPLACE INTO match_scoring (match_id, result_hash, scored_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+        """, list(stale.items()))
+        writer.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    return {
+        "matches_finished": len(finished),
+        "matches_rescored": len(stale),
+        "matches_skipped": len(finished) - len(stale),
+        "predictions_scanned": scanned,
+        "predictions_updated": updated,
+        "seconds": round(seconds, 3),
+        "predictions_per_second": round(scanned / seconds) if seconds else scanned,
+        "deltas": deltas,
+    }
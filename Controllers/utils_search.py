@@ -0,0 +1,76 @@
+# utils_search.py
+# Search box backend: one FTS5 table (search_index, db_migrations #13) holds
+# teams, football players and leagues and is kept in sync by triggers on those
+# tables. Matching is per word, prefix-based and accent-insensitive
+# ("muller" finds "Müller", "barc" finds "Barcelona"); results are ranked
+# with bm25, a hit in the name outweighing one in official name / TLA / code.
+#
+# Prefixes start at PREFIX_MIN_LENGTH letters: a two-letter prefix matches a
+# large share of 100k players and ranking them all costs ~20 ms, so shorter
+# words ("ac", "fc") only match whole words.
+import re
+
+from Controllers.utils import fetch_all
+from config import SEARCH_RESULT_LIMIT
+
+SEARCH_KINDS = ("team", "player", "league")
+KIND_LABELS = {"team": "Team", "player": "Player", "league": "League"}
+MIN_TERM_LENGTH = 2
+PREFIX_MIN_LENGTH = 3   # matches search_index's prefix = '3' index
+MAX_TERMS = 8
+NAME_WEIGHT = 10.0
+ALIASES_WEIGHT = 4.0
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 MATCH expression in which every word must match.
+    Words of PREFIX_MIN_LENGTH letters or more also match as a prefix, with the
+    exact word listed too so it outranks longer ones ("real" → Real Madrid
+    before Realpe). "AC Mil" → '"ac" AND ("mil" OR "mil"*)'.
+
+    Returns:
+        str | None: The expression, or None when no word is long enough to search.
+    """
+    terms = [w for w in _WORD.findall(text.lower()) if len(w) >= MIN_TERM_LENGTH][:MAX_TERMS]
+    if not terms:
+        return None
+    return " AND ".join(
+        f'("{term}" OR "{term}"*)' if len(term) >= PREFIX_MIN_LENGTH else f'"{term}"'
+        for term in terms
+    )
+
+
+def search_database(text, limit=SEARCH_RESULT_LIMIT, kinds=SEARCH_KINDS):
+    """
+    Ranked search over teams, football players and leagues.
+
+    Args:
+        text (str): What the user typed.
+        limit (int): Maximum number of results.
+        kinds (tuple): Subset of SEARCH_KINDS to return.
+
+    Returns:
+        list[dict]: [{"type", "kind", "id", "name", "extra"}], best match first.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+    kinds = tuple(k for k in kinds if k in SEARCH_KINDS)
+    if not kinds:
+        return []
+    kind_filter = "" if len(kinds) == len(SEARCH_KINDS) else \
+        f"AND kind IN ({', '.join('?' for _ in kinds)})"
+    rows = fetch_all(f"""
+        SELECT kind, ref_id, name, detail
+        FROM search_index
+        WHERE search_index MATCH ? {kind_filter}
+        ORDER BY bm25(search_index, {NAME_WEIGHT}, {ALIASES_WEIGHT})
+        LIMIT ?
+    """, (match, *(kinds if kind_filter else ()), limit))
+    return [
+        {"type": KIND_LABELS[row[0]], "kind": row[0], "id": row[1], "name": row[2], "extra": row[3] or ""}
+        for row in rows
+    ]
@@ -1,6 +1,7 @@
 import requests
 from Controllers.db_controller import get_connection
 from Controllers.utils import fetch_all, execute_query
+from Controllers.reference_cache import invalidate
 import os
 
 from config import API_TOKEN, BASE_URL
@@ -17,6 +18,7 @@ def get_all_leagues():
 def delete_league(league_id):
     query = "DELETE FROM leagues WHERE id = ?"
     execute_query(query, (league_id,))
+    invalidate("leagues")
 
 def update_league_details(league_id, name, country, type_value, is_active, logo_path, trade_name, start_date, end_date):
     query = """
@@ -35,6 +37,7 @@ def update_league_details(league_id, name, country, type_value, is_active, logo_
         end_date.isoformat() if end_date else None,
         league_id  # ✅ Now at the end
     ))
+    invalidate("leagues")
 
 
 
@@ -61,6 +64,7 @@ def insert_league(league_data):
         start_date,
         end_date
     ))
+    invalidate("leagues")
 
 
 
@@ -74,6 +78,7 @@ def fetch_leagues_from_api():
 def delete_all_leagues():
     query = "DELETE FROM leagues"
     execute_query(query)
+    invalidate("leagues")
 
 def get_stages_by_league(league_id):
     query = """
@@ -91,11 +96,13 @@ def update_stage(stage_id, name, is_two_legged, allows_draw, has_penalties):
         WHERE id = ?
     """
     execute_query(query, (name, is_two_legged, allows_draw, has_penalties, stage_id))
+    invalidate("stages")
 
 
 def delete_stage(stage_id):
     query = "DELETE FROM stages WHERE id = ?"
     execute_query(query, (stage_id,))
+    invalidate("stages")
 
 
 def insert_stage(name, league_id):
@@ -104,6 +111,7 @@ def insert_stage(name, league_id):
         VALUES (?, ?)
     """
     execute_query(query, (name, league_id))
+    invalidate("stages")
 
 
 def get_league_logo_path(logo_filename):
@@ -118,4 +126,5 @@ def add_league(name, country, type_value, is_active, logo_path, code, trade_name
         INSERT INTO leagues (name, country, type, is_active, logo_path, code, Trade_Name, start_date, end_date)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
-    execute_query(query, (name, country, type_value, is_active, logo_path, code, trade_name, start_date, end_date))
\ No newline at end of file
+    execute_query(query, (name, country, type_value, is_active, logo_path, code, trade_name, start_date, end_date))
+    invalidate("leagues")
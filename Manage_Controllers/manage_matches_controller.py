@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from Controllers.db_controller import get_connection
 from Controllers.utils import fetch_all, execute_query, fetch_one
+from Controllers.reference_cache import invalidate
 from config import API_TOKEN, BASE_URL
 import requests
 import os
@@ -102,6 +103,7 @@ def insert_match(conn, match, league_id):
         cur.execute("INSERT INTO stages (name, league_id) VALUES (?, ?)", (stage_name, league_id))
         stage_id = cur.lastrowid
         conn.commit()
+        invalidate("stages")
 
     # 6. Status mapping
     status = STATUS_MAP.get(match.get('status'), 'upcoming')
@@ -327,6 +329,7 @@ def get_or_create_stage(stage_name, league_id):
     cur = conn.cursor()
     cur.execute(insert_query, (stage_name.upper(), league_id))
     conn.commit()
+    invalidate("stages")
     return cur.lastrowid
 
 def get_or_create_round_by_week(conn, match_datetime):
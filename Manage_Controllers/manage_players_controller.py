@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from Controllers.db_controller import get_connection
 from Controllers.utils import fetch_all, execute_query, fetch_one
+from Controllers.reference_cache import invalidate
+from Controllers.time_service import now_ts
 from config import API_TOKEN, BASE_URL
 import requests
 import os
@@ -55,6 +57,7 @@ def update_player(player_id, email, role, is_confirmed, timezone, bonous):
         WHERE id = ?
     """
     execute_query(query, (email, role, is_confirmed, timezone, bonous, player_id))
+    invalidate("players")
 
 # 🔑 Reset player password
 def reset_player_password(player_id, new_password):
@@ -126,11 +129,11 @@ def get_all_player_predictions(player_id):
 def get_next_round():
     query = """
         SELECT * FROM rounds
-        WHERE prediction_deadline > CURRENT_TIMESTAMP
-        ORDER BY prediction_deadline ASC
+        WHERE deadline_ts > ?
+        ORDER BY deadline_ts ASC
         LIMIT 1
     """
-    round_info = fetch_one(query)
+    round_info = fetch_one(query, (now_ts(),))
 
     if not round_info:
         return None
@@ -197,9 +200,22 @@ def get_player_predictions_for_round(player_id, round_id):
     """
     return fetch_all(query, (player_id, round_id))
 
+PLAYER_PREDICTIONS_UPSERT = """
+    INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (player_id, match_id) DO UPDATE
+    SET predicted_home_score = excluded.predicted_home_score,
+        predicted_away_score = excluded.predicted_away_score,
+        -- a penalty winner only survives while the score is still a draw
+        predicted_penalty_winner_id = CASE
+            WHEN excluded.predicted_home_score = excluded.predicted_away_score THEN predicted_penalty_winner_id
+        END,
+        created_at = CURRENT_TIMESTAMP
+"""
+
 def save_predictions_for_player(player_id, predictions: dict):
     """
-    Saves predictions for a given player.
+    Saves predictions for a given player in one transaction (one executemany upsert).
 
     Parameters:
     - player_id: int — The ID of the player making predictions.
@@ -208,39 +224,29 @@ def save_predictions_for_player(player_id, predictions: dict):
     Returns:
     - True if successful (any predictions processed), False otherwise.
     """
-    saved_any = False
-
+    rows = []
     for match_id, scores in predictions.items():
         home = scores.get("home")
         away = scores.get("away")
 
         if home is None or away is None or not str(home).isdigit() or not str(away).isdigit():
             continue
+        rows.append((player_id, match_id, int(home), int(away)))
+
+    if not rows:
+        return False
 
-        home = int(home)
-        away = int(away)
-
-        existing = fetch_one(
-            "SELECT id FROM predictions WHERE player_id = ? AND match_id = ?",
-            (player_id, match_id)
-        )
-
-        if existing:
-            execute_query(
-                "UPDATE predictions SET predicted_home_score = ?, predicted_away_score = ?, created_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (home, away, existing["id"])
-            )
-        else:
-            execute_query(
-                """
-                INSERT INTO predictions (player_id, match_id, predicted_home_score, predicted_away_score)
-                VALUES (?, ?, ?, ?)
-                """,
-                (player_id, match_id, home, away)
-            )
-        saved_any = True  # Flag at least one successful operation
-
-    return saved_any
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(PLAYER_PREDICTIONS_UPSERT, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return True
 
 def update_player_info(player):
     """
@@ -266,6 +272,7 @@ def update_player_info(player):
         player['role'],
         player['id']
     ))
+    invalidate("players")
 
     # If new_password is provided → hash and update
     new_password = player.get("new_password", "").strip()
@@ -283,6 +290,7 @@ def update_player_info(player):
 def delete_player(player_id):
     try:
         execute_query("DELETE FROM players WHERE id = ?", (player_id,))
+        invalidate("players")
         return True
     except Exception as e:
         print(f"Error deleting player: {e}")
@@ -1,5 +1,6 @@
 import requests
 from Controllers.utils import fetch_all, execute_query, fetch_one
+from Controllers.reference_cache import invalidate
 import os
 from Controllers.db_controller import get_connection
 
@@ -62,12 +63,15 @@ def get_teams_by_nationality(selected_nationality):
 
 def delete_teams_for_league(league_id):
     execute_query("DELETE FROM teams WHERE id = ?", (league_id,))
+    invalidate("teams")
 
 def delete_team(team_id):
     execute_query("DELETE FROM teams WHERE id = ?", (team_id,))
+    invalidate("teams")
 
 def update_team(team_id, name, tla):
     execute_query("UPDATE teams SET name = ?, tla = ? WHERE id = ?", (name, tla, team_id))
+    invalidate("teams")
 
 def insert_team_manual(name, official_name, tla, logo_path, nationality, venue_name="no_data"):
     conn = get_connection()
@@ -84,6 +88,7 @@ def insert_team_manual(name, official_name, tla, logo_path, nationality, venue_n
         """, (next_id, name, official_name, tla, logo_path, nationality, venue_name))
         
         conn.commit()
+        invalidate("teams")
     finally:
         cur.close()
         conn.close()
@@ -111,6 +116,7 @@ def fetch_and_insert_teams(league_id):
             t.get('area', {}).get('name')
         ))
         count += 1
+    invalidate("teams")
     return count
 
 def get_team_logo_path(filename):
@@ -135,6 +141,7 @@ def update_team_full(team_id, name, official_name, tla, logo_path, nationality,
         WHERE id = ?
     """
     execute_query(query, (name, official_name, tla, logo_path, nationality, venue_name,color, venue_location,venue_capacity  ,team_id))
+    invalidate("teams")
 
 
 def insert_team(conn, team):
@@ -187,12 +194,14 @@ def fetch_all_teams_from_api():
             for team in data.get('teams', []):
                 total_inserted += insert_team(conn, team)
     conn.close()
+    invalidate("teams")
     return total_inserted
 
 
 def delete_all_teams():
     query = "DELETE FROM teams"
     execute_query(query)
+    invalidate("teams")
 
 def delete_teams_by_nationality(nationality: str) -> int:
     """
@@ -212,6 +221,7 @@ def delete_teams_by_nationality(nationality: str) -> int:
 
         cur.execute("DELETE FROM teams WHERE nationality = ?", (nationality,))
         conn.commit()
+        invalidate("teams")
         return count
     finally:
         cur.close()
@@ -1,45 +1,9 @@
 from Controllers.db_controller import get_connection
 from Controllers.utils import fetch_all, fetch_one
-import os
-import smtplib
-import os
-from dotenv import load_dotenv, find_dotenv
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from Controllers.utils import fetch_all
-
-# Load environment
-load_dotenv(find_dotenv(), override=True)
-SMTP_SERVER = os.getenv("SMTP_SERVER")
-SMTP_PORT = int(os.getenv("SMTP_PORT"))
-SENDER_EMAIL = os.getenv("SENDER_EMAIL")
-SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+from Controllers.mailer import queue_emails, request_delivery
 
-def send_tournament_end_emails():
-    # 1. Get leaderboard (winner is rank 1)
-    leaderboard = fetch_all("""
-        SELECT p.id, p.username, p.email,
-               COALESCE((SELECT SUM(score) FROM predictions WHERE player_id = p.id), 0) + COALESCE(p.bonous, 0) AS total_points
-        FROM players p
-        ORDER BY total_points DESC, username ASC
-    """)
-
-    if not leaderboard:
-        return
-
-    winner = leaderboard[0]
-    winner_name = winner["username"]
-    winner_score = winner["total_points"]
-
-    # 2. Loop over all players
-    for player in leaderboard:
-        name = player["username"]
-        email = player["email"]
-        rank = leaderboard.index(player) + 1
-        points = player["total_points"]
-
-        subject = "🏁 Tournament Ended — See the Winner and Your Final Stats!"
-        body = f"""
+TOURNAMENT_END_SUBJECT = "🏁 Tournament Ended — See the Winner and Your Final Stats!"
+TOURNAMENT_END_BODY = """
         <html>
         <body style="font-family:Arial, sans-serif; background-color:#f9fafb; padding:20px; color:#111827;">
             <h2>🏆 What a Tournament!</h2>
@@ -60,35 +24,62 @@ def send_tournament_end_emails():
         </html>
         """
 
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = SENDER_EMAIL
-        msg["To"] = email
-        msg.attach(MIMEText(body, "html"))
-
-        try:
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls()
-                server.login(SENDER_EMAIL, SENDER_PASSWORD)
-                server.send_message(msg)
-                print(f"✅ Sent to {email}")
-        except Exception as e:
-            print(f"❌ Failed to send email to {email}: {e}")
+
+def send_tournament_end_emails():
+    """
+    Queue the end-of-tournament e-mail for every player; the background sender delivers it.
+
+    Returns:
+        dict: {"queued": number of e-mails added to the outbox}, or None with no players.
+    """
+    # 1. Get leaderboard (winner is rank 1), already ordered by idx_standings_rank
+    leaderboard = fetch_all("""
+        SELECT p.id, p.username, p.email, s.total_points
+        FROM standings s
+        JOIN players p ON p.id = s.player_id
+        ORDER BY s.total_points DESC, s.username ASC
+    """)
+
+    if not leaderboard:
+        return
+
+    winner = leaderboard[0]
+    # Keyed by winner, so a second click for the same final table doesn't re-send
+    season_key = f"{winner['id']}:{winner['total_points']}"
+
+    # 2. Render every player's e-mail
+    messages = [
+        {
+            "kind": "tournament_end",
+            "dedupe_key": f"tournament_end:{season_key}:{player['id']}",
+            "recipient": player["email"],
+            "subject": TOURNAMENT_END_SUBJECT,
+            "body": TOURNAMENT_END_BODY.format(
+                name=player["username"],
+                winner_name=winner["username"],
+                winner_score=winner["total_points"],
+                rank=rank,
+                points=player["total_points"],
+            ),
+            "subtype": "html",
+        }
+        for rank, player in enumerate(leaderboard, start=1)
+    ]
+
+    queued = queue_emails(messages)
+    request_delivery()
+    print(f"✅ Tournament end e-mail queued for {queued} players")
+    return {"queued": queued}
 
 def end_season():
     conn = get_connection()
     cur = conn.cursor()
 
-    # Determine the winner based on prediction scores + bonous
+    # Determine the winner based on prediction scores + bonous (top of the standings)
     cur.execute("""
-        SELECT p.id
-        FROM players p
-        LEFT JOIN (
-            SELECT player_id, SUM(score) AS pred_score
-            FROM predictions
-            GROUP BY player_id
-        ) pr ON p.id = pr.player_id
-        ORDER BY COALESCE(pred_score, 0) + COALESCE(p.bonous, 0) DESC
+        SELECT player_id
+        FROM standings
+        ORDER BY total_points DESC, username ASC
         LIMIT 1
     """)
     
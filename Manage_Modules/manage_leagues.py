@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 from Manage_Controllers import manage_leagues_controller as ctrl
+from Controllers.thumbnails import generate_thumbnails
 import datetime
 
 def manage_leagues():
@@ -57,6 +58,7 @@ def manage_leagues():
                     os.makedirs("Assets/Leagues", exist_ok=True)
                     with open(f"Assets/Leagues/{logo_filename}", "wb") as f:
                         f.write(logo_file.read())
+                    generate_thumbnails(f"Assets/Leagues/{logo_filename}")
 
                     code = logo_file.name.split(".")[0].upper()
                     ctrl.add_league(
@@ -127,6 +129,7 @@ def manage_leagues():
                         os.makedirs("Assets/Leagues", exist_ok=True)
                         with open(f"Assets/Leagues/{logo_path}", "wb") as f:
                             f.write(logo_file.read())
+                        generate_thumbnails(f"Assets/Leagues/{logo_path}")
 
                     if st.button("💾 Save Changes", key=f"update_{league['id']}"):
                         ctrl.update_league_details(
@@ -104,40 +104,40 @@ def manage_players():
                 for pred in predictions
             }
 
+            # One form for the round: a single save writes every changed prediction at once
             matches = next_round['matches']
-            for match in matches:
-                match_id = match['id']
-                home = match['home_team_name']
-                away = match['away_team_name']
-                prev = predictions_dict.get(match_id, {"home": 0, "away": 0})
-                # Convert UTC time to player timezone in 12-hour format
-                utc_dt = datetime.fromisoformat(match['match_datetime'])  # assuming this is in ISO format and UTC
-                player_tz = pytz.timezone(player['timezone'] or "Africa/Cairo")
-                localized_dt = pytz.utc.localize(utc_dt).astimezone(player_tz)
-                formatted_time = localized_dt.strftime("%Y-%m-%d • %I:%M %p")  # e.g., "2025-07-06 • 08:30 PM"
+            entries = {}
+            with st.form(key=f"round_preds_{p['id']}_{next_round['id']}"):
+                for match in matches:
+                    match_id = match['id']
+                    home = match['home_team_name']
+                    away = match['away_team_name']
+                    prev = predictions_dict.get(match_id, {"home": None, "away": None})
+                    # Convert UTC time to player timezone in 12-hour format
+                    utc_dt = datetime.fromisoformat(match['match_datetime'])  # assuming this is in ISO format and UTC
+                    player_tz = pytz.timezone(player['timezone'] or "Africa/Cairo")
+                    localized_dt = pytz.utc.localize(utc_dt).astimezone(player_tz)
+                    formatted_time = localized_dt.strftime("%Y-%m-%d • %I:%M %p")  # e.g., "2025-07-06 • 08:30 PM"
 
-                with st.container():
-                    st.markdown(f"""
-                        <div class='glass-box'>
-                            <b>{home} vs {away}</b><br>
-                            <small style='color:gray;'>Kickoff: {formatted_time} ({player['timezone']})</small>
-                    """, unsafe_allow_html=True)
+                    with st.container():
+                        st.markdown(f"""
+                            <div class='glass-box'>
+                                <b>{home} vs {away}</b><br>
+                                <small style='color:gray;'>Kickoff: {formatted_time} ({player['timezone']})</small>
+                        """, unsafe_allow_html=True)
 
-                    col1, col2, col3 = st.columns([2, 2, 1])
-                    with col1:
-                        home_score = st.number_input(f"{home} goals", min_value=0, value=prev['home'], key=f"ph_{p['id']}_{match_id}")
-                    with col2:
-                        away_score = st.number_input(f"{away} goals", min_value=0, value=prev['away'], key=f"pa_{p['id']}_{match_id}")
-                    with col3:
-                        if st.button("💾 Save", key=f"save_pred_{p['id']}_{match_id}"):
-                            saved = ctrl.save_predictions_for_player(p['id'], {
-                                match_id: {
-                                    "home": home_score,
-                                    "away": away_score
-                                }
-                            })
-                            if saved:
-                                st.success("✅ Prediction saved!")
-                            else:
-                                st.warning("⚠️ No valid prediction or already saved.")
-                    st.markdown("</div>", unsafe_allow_html=True)
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            home_score = st.number_input(f"{home} goals", min_value=0, value=prev['home'], key=f"ph_{p['id']}_{match_id}")
+                        with col2:
+                            away_score = st.number_input(f"{away} goals", min_value=0, value=prev['away'], key=f"pa_{p['id']}_{match_id}")
+                        if (home_score, away_score) != (prev['home'], prev['away']):
+                            entries[match_id] = {"home": home_score, "away": away_score}
+                        st.markdown("</div>", unsafe_allow_html=True)
+
+                if st.form_submit_button("💾 Save Predictions"):
+                    saved = ctrl.save_predictions_for_player(p['id'], entries)
+                    if saved:
+                        st.success("✅ Predictions saved!")
+                    else:
+                        st.warning("⚠️ No valid prediction or already saved.")
@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 from Manage_Controllers import manage_teams_controller as ctrl
+from Controllers.thumbnails import generate_thumbnails
 import base64
 
 import base64
@@ -212,6 +213,7 @@ def manage_teams():
                         os.makedirs("Assets/Teams", exist_ok=True)
                         with open(f"Assets/Teams/{logo_filename}", "wb") as f:
                             f.write(logo_file.read())
+                        generate_thumbnails(f"Assets/Teams/{logo_filename}")
 
                         # Call your controller method to insert
                         try:
@@ -287,6 +289,7 @@ def manage_teams():
                         os.makedirs("Assets/Teams", exist_ok=True)
                         with open(f"Assets/Teams/{new_logo_filename}", "wb") as f:
                             f.write(logo_file.read())
+                        generate_thumbnails(f"Assets/Teams/{new_logo_filename}")
 
                 col_save, col_del = st.columns([1, 1])
                 if col_save.button("💾 Save Changes", key=f"save_{team['id']}"):
@@ -1,11 +1,68 @@
 import streamlit as st
 from Controllers.send_email import send_reminder_email_to_all
-from Controllers.utils_prediction import update_scores_for_match
-from Controllers.utils import fetch_all
+from Controllers.mailer import request_delivery, outbox_stats
+from Controllers.reminder_scheduler import get_scheduled_reminders
 from Controllers.predictions_controller import get_next_round_info
-from Controllers.api_controller import update_all_teams, update_all_players, fetch_all_target_leagues, fix_all_prediction_deadlines, insert_or_update_match_with_score
+from Controllers.leaderboard_controller import rebuild_standings
+from Controllers.leagues_controller import rebuild_league_tables
+from Controllers.api_controller import fix_all_prediction_deadlines
+from Controllers import job_runner
 import Manage_Controllers.manage_tournment_controller as manage
 from auto_push_db import auto_push_db
+from config import JOB_POLL_SECONDS
+
+
+def start_job(kind, params=None):
+    """Queue a background job unless the same kind is already queued/running."""
+    label, _ = job_runner.JOB_HANDLERS[kind]
+    if job_runner.has_active_job(kind):
+        st.warning(f"⏳ {label} is already queued or running.")
+        return
+    job_id = job_runner.enqueue(kind, params)
+    st.toast(f"🚀 {label} started in the background (job #{job_id})", icon="🚀")
+
+
+def _format_eta(seconds):
+    if seconds is None:
+        return "estimating…"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m {secs}s"
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_jobs_panel():
+    """Live view of background jobs; polls the jobs table, never blocks on the work itself."""
+    jobs = job_runner.list_jobs(limit=8)
+    if not jobs:
+        st.caption("No background jobs yet.")
+        return
+    if any(job["status"] in job_runner.ACTIVE_STATUSES for job in jobs):
+        job_runner.ensure_runner()
+
+    status_icons = {"queued": "🕒", "running": "⚙️", "done": "✅", "failed": "❌", "cancelled": "⛔"}
+    for job in jobs:
+        label, _ = job_runner.JOB_HANDLERS.get(job["kind"], (job["kind"], None))
+        done, total = job["progress_done"], job["progress_total"]
+        col_info, col_action = st.columns([5, 1])
+        with col_info:
+            st.markdown(f"{status_icons.get(job['status'], '')} **{label}** · job #{job['id']} · {job['status']}")
+            if job["status"] == "running":
+                fraction = done / total if total else 0.0
+                st.progress(min(fraction, 1.0), text=f"{done}/{total} · ETA {_format_eta(job['eta_seconds'])}"
+                                                     + (f" · {job['message']}" if job["message"] else ""))
+            elif job["status"] == "done" and job["result"]:
+                st.caption(", ".join(f"{k}: {v}" for k, v in job["result"].items()))
+            elif job["status"] in ("failed", "cancelled"):
+                st.caption((job["error"] or "Stopped") + f" · {done}/{total} done")
+        with col_action:
+            if job["status"] in job_runner.ACTIVE_STATUSES:
+                if st.button("Cancel", key=f"cancel_job_{job['id']}", disabled=bool(job["cancel_requested"])):
+                    job_runner.request_cancel(job["id"])
+            elif job["status"] in ("failed", "cancelled"):
+                if st.button("Resume", key=f"resume_job_{job['id']}"):
+                    job_runner.resume_job(job["id"])
+
 
 def manage_tournment():
     # 💠 Header
@@ -69,10 +126,10 @@ def manage_tournment():
                     st.success("✅ Data pushed to database successfully!")
 
             if st.button("📧 Send Reminder Emails", help="Notify users of upcoming rounds", type="primary"):
-                with st.spinner("📨 Sending email reminders..."):
+                with st.spinner("📨 Queueing email reminders..."):
                     info = get_next_round_info()
                     if info:
-                        send_reminder_email_to_all(
+                        report = send_reminder_email_to_all(
                             round_id=info['round_id'],
                             round_name=info['round_name'],
                             deadline=info['deadline'],
@@ -80,17 +137,47 @@ def manage_tournment():
                             match_count=info['match_count'],
                             level="test"
                         )
-                        st.success("✅ Reminder emails sent successfully!")
+                        if report is None:
+                            st.error("❌ Failed to queue reminder emails.")
+                        elif not report["queued"]:
+                            st.info("📭 No new reminder emails to queue.")
+                        else:
+                            st.success(f"✅ Reminder emails queued for {report['queued']} players, "
+                                       f"sending in the background.")
                     else:
                         st.warning("⚠️ No upcoming round found.")
 
+            scheduled = get_scheduled_reminders()
+            if scheduled:
+                fire_at, round_name, level = scheduled[0]
+                st.caption(f"⏰ Next automatic reminder: **{level}** for {round_name} "
+                           f"at {fire_at.strftime('%Y-%m-%d %H:%M')} (UTC)")
+
+            outbox = outbox_stats()
+            if outbox.get("pending") or outbox.get("failed"):
+                st.caption(f"📮 Outbox: {outbox.get('pending', 0)} pending, {outbox.get('failed', 0)} failed")
+                if st.button("📮 Retry Pending Emails", help="Send e-mails still waiting in the outbox", type="secondary"):
+                    request_delivery()
+                    st.success(f"✅ {outbox.get('pending', 0)} pending e-mails handed to the background sender.")
+
             if st.button("📊 Calculate Match Points", help="Recalculate scores for all matches", type="primary"):
-                with st.spinner("🧮 Calculating points..."):
+                start_job("calculate_points")
+
+            if st.button("🏆 Rebuild Leaderboard", help="Recompute standings from predictions and bonus points", type="primary"):
+                with st.spinner("🔁 Rebuilding standings..."):
+                    try:
+                        report = rebuild_standings()
+                        st.success(f"✅ Standings checked for {report['players']} players "
+                                   f"({report['fixed']} fixed, {report['removed']} stale rows removed).")
+                    except Exception as e:
+                        st.error(f"❌ Error: {e}")
+
+            if st.button("📊 Rebuild League Tables", help="Recompute league tables from finished matches", type="primary"):
+                with st.spinner("🔁 Rebuilding league tables..."):
                     try:
-                        matches = fetch_all("SELECT id FROM matches")
-                        for match in matches:
-                            update_scores_for_match(match["id"])
-                        st.success(f"✅ Points updated for {len(matches)} matches.")
+                        report = rebuild_league_tables()
+                        st.success(f"✅ League tables rebuilt: {report['rows']} rows "
+                                   f"({report['fixed']} fixed, {report['removed']} stale rows removed).")
                     except Exception as e:
                         st.error(f"❌ Error: {e}")
 
@@ -100,15 +187,11 @@ def manage_tournment():
 
     with col3:
         if st.button("🧠 Update Team Info", help="Fetch and refresh all team data", type="primary"):
-            with st.spinner("🔄 Updating team information..."):
-                update_all_teams()
-            st.success("✅ Team information updated!")
+            start_job("update_teams")
 
     with col4:
         if st.button("👟 Update Player Info", help="Fetch and refresh player data", type="primary"):
-            with st.spinner("🔄 Updating player information..."):
-                update_all_players()
-            st.success("✅ Player information updated!")
+            start_job("update_players")
 
     st.markdown("---")
 
@@ -135,22 +218,21 @@ def manage_tournment():
         format_func=lambda x: league_map[x]
     )
 
+    incremental = st.checkbox("⚡ Only recent & upcoming matches (incremental sync)", value=True,
+                              help="Fetch a window around today instead of the whole season; unchanged matches are skipped")
+
     if st.button("📅 Fetch Matches & Scores", type="primary", help="Download schedules and scores for selected leagues"):
         if selected_leagues:
-            with st.spinner("🔄 Fetching match data..."):
-                fetch_all_target_leagues(selected_leagues)
-                st.success("✅ Match data fetched successfully!")
-            with st.spinner("🧮 Calculating points..."):
-                try:
-                    matches = fetch_all("SELECT id FROM matches")
-                    for match in matches:
-                        update_scores_for_match(match["id"])
-                    st.success(f"✅ Points updated for {len(matches)} matches.")
-                except Exception as e:
-                    st.error(f"❌ Error: {e}")
+            start_job("fetch_matches", {"leagues": selected_leagues, "incremental": incremental})
         else:
             st.warning("⚠️ Please select at least one league.")
             
     if st.button("🔄 Fix Round Deadlines"):
         fix_all_prediction_deadlines()
 
+    st.markdown("---")
+
+    # ⚙️ Background Jobs (run in a separate worker process; safe to close the browser)
+    st.markdown("### ⚙️ Background Jobs")
+    render_jobs_panel()
+
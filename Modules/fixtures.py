@@ -1,9 +1,15 @@
 import streamlit as st
 from datetime import datetime
 from Controllers import fixtures_controller as ctrl
+from Controllers.predictions_controller import get_localzone_for_player
+from Controllers.time_service import localize
 from Renders.render_helpers import render_league_banner, render_match_card
+from Renders import live_updates
 
 def render_fixtures(player_id):
+    # 🔄 Remember which data version this render is based on
+    live_updates.snapshot_version("fixtures")
+
     # 🌟 Title
     st.markdown("""
         <div style="text-align: center; padding: 15px 0; margin-bottom: 20px;">
@@ -14,13 +20,12 @@ def render_fixtures(player_id):
         </div>
     """, unsafe_allow_html=True)
 
-    # 📥 Fetch fixtures
-    fixtures_by_date = ctrl.get_upcoming_fixtures_grouped()
-    if not fixtures_by_date:
+    # 📥 Fetch match dates only; fixtures are loaded for the selected date below
+    available_dates = ctrl.get_fixture_dates()
+    if not available_dates:
         st.info("No fixtures available.")
         return
 
-    available_dates = sorted(fixtures_by_date.keys())
     today_str = datetime.today().strftime('%Y-%m-%d')
 
     # 🧠 Select default: first date on or after today
@@ -34,13 +39,43 @@ def render_fixtures(player_id):
 
     st.divider()
 
-    if selected_date not in fixtures_by_date:
+    # 📄 Keyset pages for long days: cursors[i] is where page i starts
+    cursors = st.session_state.setdefault("fixtures_cursors", {}).setdefault(selected_date, [None])
+    page = min(st.session_state.setdefault("fixtures_page", {}).get(selected_date, 0), len(cursors) - 1)
+    fixtures, next_cursor = ctrl.get_fixtures_for_date(selected_date, after=cursors[page])
+
+    if not fixtures:
         st.warning(f"📭 No matches scheduled for **{selected_date}**. Take the day off 😎!")
         return
 
+    # 🌍 Kick-offs for the whole page in the player's timezone, converted in one pass
+    page_matches = [match for matches in fixtures.values() for match in matches]
+    match_times = dict(zip(
+        (match.id for match in page_matches),
+        localize((match.match_ts for match in page_matches), get_localzone_for_player(player_id)),
+    ))
+
     # 📅 Display Matches for Selected Date
     st.subheader(f"🗓️ Fixtures on {selected_date}")
-    for league_name, matches in fixtures_by_date[selected_date].items():
+    for league_name, matches in fixtures.items():
         render_league_banner(league_name, ctrl.get_logo_path_from_league(league_name))
         for match in matches:
-            render_match_card(match, player_id)
+            render_match_card(match, player_id, match_time=match_times[match.id])
+
+    if page > 0 or next_cursor:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        if page > 0 and prev_col.button("⬅️ Previous", key=f"fixtures_prev_{selected_date}"):
+            st.session_state["fixtures_page"][selected_date] = page - 1
+            st.rerun()
+        page_col.markdown(f"<div style='text-align:center;'>Page {page + 1}</div>", unsafe_allow_html=True)
+        if next_cursor and next_col.button("Next ➡️", key=f"fixtures_next_{selected_date}"):
+            del cursors[page + 1:]
+            cursors.append(next_cursor)
+            st.session_state["fixtures_page"][selected_date] = page + 1
+            st.rerun()
+
+    # ⏱️ Countdowns tick in the browser; rerun only on new scores/statuses or at kick-off/full-time
+    wake_at = []
+    for match in page_matches:
+        wake_at += [match.match_ts, match.match_ts + 2 * 3600]
+    live_updates.watch_for_changes("fixtures", wake_at=wake_at)
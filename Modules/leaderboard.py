@@ -2,25 +2,12 @@ from Modules import under_update
 from Controllers import leaderboard_controller as ctrl
 import streamlit as st
 import os
-import base64
+from Renders.asset_cache import image_data_uri
 # def render(player_id):
 #     under_update.under_update_view()
 
-def convert_img_to_base64(path):
-    if not os.path.exists(path):
-        print(f"[⚠️ File not found]: {path}")
-        return None
-    try:
-        with open(path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode("utf-8")
-        return encoded
-    except Exception as e:
-        print(f"[❌ Error reading file]: {path} → {e}")
-        return None
-
-def render_team_logo_img(logo_path):
-    logo_b64 = convert_img_to_base64(logo_path)
-    return f"data:image/png;base64,{logo_b64}" if logo_b64 else None
+def render_team_logo_img(logo_path, display_px=None):
+    return image_data_uri(logo_path, display_px)
 
 def render(player_id):
     player = ctrl.get_player_info(player_id)
@@ -32,7 +19,7 @@ def render(player_id):
         <div style="background-color:#1f2937; padding:30px; border-radius:16px; margin-top:24px; box-shadow: 0 0 12px rgba(255,255,255,0.04);">
             <h2 style="color:#facc15; text-align:center;">🏅 Player Profile</h2>
             <div style="text-align:center;">
-                <img src="{render_team_logo_img(os.path.join('Assets', 'Avatars', player['avatar_path']))}" style="width:80px; height:80px; border-radius:50%; box-shadow:0 0 6px rgba(255,255,255,0.2); margin-bottom:10px;">
+                <img src="{render_team_logo_img(os.path.join('Assets', 'Avatars', player['avatar_path']), display_px=80)}" style="width:80px; height:80px; border-radius:50%; box-shadow:0 0 6px rgba(255,255,255,0.2); margin-bottom:10px;">
                 <h3 style="color:#f9fafb;">{player['username']}</h3>
                 <p style="color:#9ca3af; font-size:13px;">📧 {player['email']} • 🕓 Joined: {player['created_at'][:10]}</p>
                 <div style="margin-top:12px; color:#facc15; font-size:16px;">
@@ -44,13 +31,7 @@ def render(player_id):
             </div>
         </div>
     """, unsafe_allow_html=True)
-    leaderboard = ctrl.fetch_all("""
-        SELECT p.id, p.username, p.avatar_name,
-               COALESCE((SELECT SUM(score) FROM predictions WHERE player_id = p.id), 0) + COALESCE(p.bonous, 0) AS total_points,
-               p.total_leagues_won, p.total_cups_won
-        FROM players p
-        ORDER BY total_points DESC, p.username ASC
-    """)
+    leaderboard = ctrl.get_leaderboard()
 
     st.markdown("""
         <style>
@@ -114,7 +95,7 @@ def render(player_id):
 
     for idx, row in enumerate(leaderboard):
         pid, username, avatar, total, leagues, cups = row
-        avatar_src = render_team_logo_img(os.path.join("Assets", "Avatars", avatar)) if avatar else ""
+        avatar_src = render_team_logo_img(os.path.join("Assets", "Avatars", avatar), display_px=64) if avatar else ""
         highlight_class = "highlight" if pid == player_id else ""
 
         st.markdown(f"""
@@ -10,5 +10,5 @@ ASSET_LOGO_FOLDER = "Assets/Leagues"
 
 from Renders import render_leagues_helper as leagues_view
 
-def render():
-    leagues_view.render()
+def render(player_id=None):
+    leagues_view.render(player_id)
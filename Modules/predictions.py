@@ -2,14 +2,16 @@ from Modules import under_update
 import streamlit as st
 from datetime import datetime
 from Controllers import predictions_controller as ctrl
-from Renders.render_predictions_helper import render_league_banner, render_match_card
-from dateutil import tz
-import pytz
+from Renders.render_predictions_helper import render_league_banner, render_match_card, render_round_prediction_grid
+from Renders import live_updates
 
 # def render(player_id):
 #     under_update.under_update_view()
 
 def render(player_id):
+    # 🔄 Remember which data version this render is based on
+    live_updates.snapshot_version("predictions")
+
     # 🌍 Get user's local timezone
     local_tz = ctrl.get_localzone_for_player(player_id)
     #print("Player timezone:", local_tz.zone)  # Optional debug
@@ -49,23 +51,19 @@ def render(player_id):
     </div>
     """, unsafe_allow_html=True)
 
-    # 📥 Fetch fixtures grouped by round
-    rounds = ctrl.get_upcoming_predictable_fixtures_grouped_by_round()
+    # 📥 Rounds for the selector (names and deadlines only)
+    rounds = ctrl.get_predictable_rounds()
     if not rounds:
         st.info("No upcoming rounds with predictable fixtures.")
         return
 
-    # Sort rounds by deadline (UTC)
-    sorted_rounds = sorted(rounds.items(), key=lambda x: x[1]["deadline"])
-
-    # Build selectbox options
+    # Build selectbox options (already sorted by deadline)
     options = []
-    for round_id, info in sorted_rounds:
-        deadline_utc = datetime.fromisoformat(info["deadline"]).replace(tzinfo=pytz.UTC)
-        deadline_local = deadline_utc.astimezone(local_tz)
+    for info in rounds:
+        deadline_local = datetime.fromtimestamp(info["deadline_ts"], local_tz)
         options.append({
             "label": f"{info['round_name']} — Deadline: {deadline_local.strftime('%b %d, %Y %I:%M %p')}",
-            "round_id": round_id,
+            "round": info,
             "deadline_local": deadline_local
         })
 
@@ -79,15 +77,48 @@ def render(player_id):
     # 🎯 Select round from dropdown
     selected_label = st.selectbox("🔘 Select Gameweek", options=[opt["label"] for opt in options], index=default_index)
     selected_index = next(i for i, opt in enumerate(options) if opt["label"] == selected_label)
-    selected_round_id = options[selected_index]["round_id"]
-    selected_round = rounds[selected_round_id]
+    selected_round = options[selected_index]["round"]
+    selected_round_id = selected_round["round_id"]
+
+    # 📦 Load the whole round (matches, rules, this player's predictions) in one go
+    round_view = ctrl.load_round_view(player_id, selected_round_id, local_tz=local_tz)
 
-    # 🧮 Match stats
-    predicted, unpredicted = ctrl.get_prediction_stats_for_player(player_id, selected_round_id)
-    match_count = selected_round.get("match_count", len(selected_round["matches"]))
     deadline_local = options[selected_index]["deadline_local"]
+    _render_round(round_view, selected_round, deadline_local, player_id, local_tz)
+
+    # ⏱️ Countdowns tick in the browser; rerun only on new data, the deadline or a kick-off/full-time
+    wake_at = [deadline_local.timestamp()]
+    for match in round_view["matches"]:
+        kickoff = match["match_ts"]
+        wake_at += [kickoff, kickoff + 2 * 3600]
+    live_updates.watch_for_changes("predictions", wake_at=wake_at)
+
+
+@st.fragment
+def _render_round(round_view, selected_round, deadline_local, player_id, local_tz):
+    """
+    Round header, prediction grid and match cards. Saving the grid reruns only
+    this fragment: the saved predictions are written into round_view's match
+    dicts, so the header counts and the affected cards redraw without
+    reloading the round or the rest of the page.
+    """
+    now_local = datetime.now(local_tz)
     time_left = deadline_local - now_local
     can_predict = now_local < deadline_local
+    match_count = len(round_view["matches"])
+
+    # The header sits above the grid but its counts depend on what the grid saves
+    style = st.empty()
+    header = st.empty()
+
+    # 📝 One form for the whole round
+    if player_id and can_predict:
+        render_round_prediction_grid(round_view["matches"], player_id)
+
+    # 🧮 Match stats
+    predicted = sum(1 for match in round_view["matches"] if match["prediction"])
+    unpredicted = match_count - predicted
+    round_view["predicted_count"], round_view["unpredicted_count"] = predicted, unpredicted
 
     # ✨ Style for completion animation (must be injected separately before HTML)
     confetti_animation = """
@@ -116,7 +147,7 @@ def render(player_id):
 
     # Render confetti style early if needed
     if can_predict and unpredicted == 0:
-        st.markdown(confetti_animation, unsafe_allow_html=True)
+        style.markdown(confetti_animation, unsafe_allow_html=True)
 
     # 🔔 Prediction status block
     prediction_status_html = f"""
@@ -127,6 +158,7 @@ def render(player_id):
     """
 
     # 🧾 Round header info
+    time_left_attrs = live_updates.countdown_attrs(deadline_local, done="0:00:00", style="clock")
     header_html = f"""
         <div style="margin-top: 10px; margin-bottom: 20px; padding: 14px 20px; border-radius: 12px;
                     background: linear-gradient(90deg, #edf2fb, #e2eafc);
@@ -140,17 +172,17 @@ def render(player_id):
                     {match_count} match{'es' if match_count != 1 else ''}
                 </span>
                 <br><br>
-                {"⏳ Prediction closes: <b>" + deadline_local.strftime('%b %d, %Y %I:%M %p %Z') + "</b><br>🕒 Time left: <b>" + str(time_left).split('.')[0] + "</b>" if can_predict else "❌ <b>Prediction deadline passed!</b>"}
+                {"⏳ Prediction closes: <b>" + deadline_local.strftime('%b %d, %Y %I:%M %p %Z') + "</b><br>🕒 Time left: <b " + time_left_attrs + ">" + str(time_left).split('.')[0] + "</b>" if can_predict else "❌ <b>Prediction deadline passed!</b>"}
             </p>
             {prediction_status_html}
         </div>
     """
 
-    st.markdown(header_html, unsafe_allow_html=True)
+    header.markdown(header_html, unsafe_allow_html=True)
 
     # 📊 Group matches by league
     grouped_by_league = {}
-    for match in selected_round["matches"]:
+    for match in round_view["matches"]:
         league = match["league_name"]
         grouped_by_league.setdefault(league, []).append(match)
 
@@ -158,4 +190,4 @@ def render(player_id):
     for league_name, league_matches in grouped_by_league.items():
         render_league_banner(league_name, ctrl.get_logo_path_from_league(league_name))
         for match in league_matches:
-            render_match_card(match, player_id, can_predict=can_predict)
+            render_match_card(match, player_id, can_predict=can_predict, local_tz=local_tz)
@@ -1,19 +1,12 @@
 import os
-import io
-import base64
 import glob
-from PIL import Image
 import streamlit as st
 from Controllers.players_controller import get_player_info, update_player_info, delete_player
+from Renders.asset_cache import image_data_uri
 from streamlit_extras.metric_cards import style_metric_cards
 
 AVATAR_FOLDER = "Assets/Avatars"
 
-def image_to_base64(img: Image.Image) -> str:
-    buffered = io.BytesIO()
-    img.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode()
-
 def render(player_id):
     
 
@@ -91,11 +84,10 @@ def render(player_id):
         avatar_path = os.path.join(AVATAR_FOLDER, avatar_name) if avatar_name else None
 
         if not st.session_state.get("edit_mode", False):
-            if avatar_path and os.path.exists(avatar_path):
-                img = Image.open(avatar_path)
-                b64_img = image_to_base64(img)
+            avatar_src = image_data_uri(avatar_path, display_px=160) if avatar_path else None
+            if avatar_src:
                 st.markdown(
-                    f'<div class="avatar-frame" style="background-image: url(data:image/png;base64,{b64_img});"></div>',
+                    f'<div class="avatar-frame" style="background-image: url({avatar_src});"></div>',
                     unsafe_allow_html=True
                 )
             else:
@@ -119,8 +111,7 @@ def render(player_id):
 
                 for idx, avatar_file in enumerate(avatar_files):
                     avatar_path = os.path.join(AVATAR_FOLDER, avatar_file)
-                    img = Image.open(avatar_path)
-                    b64_img = image_to_base64(img)
+                    avatar_src = image_data_uri(avatar_path, display_px=80)
 
                     border_color = "#3b82f6" if avatar_file == selected_avatar else "#ccc"
                     with cols[idx % 5]:
@@ -128,7 +119,7 @@ def render(player_id):
                             st.session_state.selected_avatar_name = avatar_file
 
                         st.markdown(
-                            f"<img class='avatar-thumb' src='data:image/png;base64,{b64_img}' width='80' "
+                            f"<img class='avatar-thumb' src='{avatar_src}' width='80' "
                             f"style='border: 4px solid {border_color}; border-radius: 50%;'/>",
                             unsafe_allow_html=True
                         )
@@ -141,10 +132,6 @@ def render(player_id):
         st.markdown(f"**👤 Name:** {player['username']}")
         st.markdown(f"**📧 Email:** {player['email']}")
         st.markdown(f"**🗓️ Joined:** {player['created_at']}")
-        # img = qrcode.make(f"https://yourdomain.com/player/{player_id}")
-        buf = io.BytesIO()
-        # img.save(buf)
-        # st.image(buf.getvalue(), caption="📲 Scan to View My Profile")
 
     with col3:
         colA, colB, colC = st.columns(3)
@@ -1,9 +1,50 @@
+import streamlit as st
 from Modules import under_update
-from Controllers.teams_controller import get_all_teams
-from Renders.render_helpers_team import render_team_gallery
+from Controllers import teams_controller as ctrl
+from Renders.render_helpers_team import render_team_gallery, render_team_details
+
 def render():
     #under_update.under_update_view()
-    teams = get_all_teams()
-    render_team_gallery(teams)
-    
-    
\ No newline at end of file
+    filters = ctrl.get_team_filters()
+
+    # 🧭 Filters (indexed: teams.nationality, team_competitions.league_id)
+    nation_col, league_col = st.columns(2)
+    nationality = nation_col.selectbox(
+        "🌍 Nationality",
+        [None] + [nationality for nationality, _ in filters["nationalities"]],
+        format_func=lambda n: "All countries" if n is None else n,
+    )
+    league_names = {league_id: name for league_id, name, _ in filters["leagues"]}
+    league_id = league_col.selectbox(
+        "🏆 League",
+        [None] + list(league_names),
+        format_func=lambda i: "All leagues" if i is None else league_names[i],
+    )
+
+    # 📄 Keyset pages per filter: cursors[i] is where page i starts
+    key = (nationality, league_id)
+    cursors = st.session_state.setdefault("teams_cursors", {}).setdefault(key, [None])
+    page = min(st.session_state.setdefault("teams_page", {}).get(key, 0), len(cursors) - 1)
+    teams, next_cursor = ctrl.get_teams_page(nationality, league_id, after=cursors[page])
+
+    if not teams:
+        st.info("No teams match these filters.")
+        return
+
+    st.caption(f"{ctrl.count_teams(nationality, league_id)} teams")
+    selected = render_team_gallery(teams)
+
+    if page > 0 or next_cursor:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        if page > 0 and prev_col.button("⬅️ Previous", key="teams_prev"):
+            st.session_state["teams_page"][key] = page - 1
+            st.rerun()
+        page_col.markdown(f"<div style='text-align:center;'>Page {page + 1}</div>", unsafe_allow_html=True)
+        if next_cursor and next_col.button("Next ➡️", key="teams_next"):
+            del cursors[page + 1:]
+            cursors.append(next_cursor)
+            st.session_state["teams_page"][key] = page + 1
+            st.rerun()
+
+    if selected:
+        render_team_details(selected)
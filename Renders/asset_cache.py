@@ -0,0 +1,159 @@
+import os
+import base64
+import mimetypes
+import threading
+from collections import OrderedDict
+
+from Controllers.thumbnails import thumbnail_store, thumbnail_path
+from config import ASSET_CACHE_MAX_BYTES, THUMBNAIL_DIR
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg")
+PREWARM_DIRS = (
+    os.path.join("Assets", "Teams"),
+    os.path.join("Assets", "Leagues"),
+    os.path.join("Assets", "Avatars"),
+)
+
+
+class AssetCache:
+    """
+    Process-wide LRU cache of base64-encoded images, bounded by total bytes.
+
+    Entries are keyed by file path and remember the file's mtime/size, so an
+    image replaced on disk (new logo, uploaded avatar) is re-read on next use.
+    """
+
+    def __init__(self, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, encoded)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, encoded) = self._entries.popitem(last=False)
+            self._bytes -= len(encoded)
+            self.evictions += 1
+
+    def get_base64(self, path):
+        """
+        Return the base64 string for an image file, or None if it can't be read.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            print(f"[⚠️ File not found]: {path}")
+            return None
+
+        key = os.path.normpath(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        try:
+            with open(path, "rb") as img_file:
+                encoded = base64.b64encode(img_file.read()).decode("utf-8")
+        except Exception as e:
+            print(f"[❌ Error reading file]: {path} → {e}")
+            return None
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= len(old[2])
+            if len(encoded) <= self.max_bytes:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, encoded)
+                self._bytes += len(encoded)
+                self._evict()
+        return encoded
+
+    def prewarm(self, directories=PREWARM_DIRS):
+        """Encode every image under the given folders ahead of the first render."""
+        loaded = 0
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    if self.get_base64(os.path.join(directory, name)) is not None:
+                        loaded += 1
+        return loaded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+asset_cache = AssetCache()
+_prewarm_started = False
+_prewarm_lock = threading.Lock()
+
+
+def _prewarm(directories):
+    # Pages embed thumbnails, so build any that are missing and keep those in memory
+    thumbnail_store.build_all(directories)
+    asset_cache.prewarm((THUMBNAIL_DIR,))
+
+
+def prewarm_in_background(directories=PREWARM_DIRS):
+    """
+    Start warming the cache once per process (app.py calls this on every rerun).
+    """
+    global _prewarm_started
+    with _prewarm_lock:
+        if _prewarm_started:
+            return
+        _prewarm_started = True
+    threading.Thread(target=_prewarm, args=(directories,), daemon=True).start()
+
+
+def convert_img_to_base64(path):
+    """
+    Converts an image file to a base64 string for HTML embedding (cached).
+
+    Parameters:
+        path (str): The full path to the image file.
+
+    Returns:
+        str: Base64-encoded image string or None if file not found or error.
+    """
+    return asset_cache.get_base64(path)
+
+
+def image_data_uri(path, display_px=None):
+    """
+    data: URI for an <img> (or CSS background) drawn at `display_px` CSS pixels.
+    With a size, the smallest thumbnail that stays sharp is embedded instead of
+    the original file (Controllers/thumbnails.py).
+
+    Returns:
+        str: The data URI, or None if the image can't be read.
+    """
+    if display_px:
+        path = thumbnail_path(path, display_px)
+    encoded = asset_cache.get_base64(path)
+    if not encoded:
+        return None
+    mime = mimetypes.guess_type(path)[0] or "image/png"
+    return f"data:{mime};base64,{encoded}"
@@ -0,0 +1,97 @@
+import time
+import streamlit as st
+import streamlit.components.v1 as components
+from Controllers.live_controller import get_data_version
+from config import LIVE_POLL_SECONDS
+
+# Ticks every `.live-countdown[data-target]` element on the page once per second
+# in the browser, so countdowns move without re-running the Streamlit script.
+COUNTDOWN_TICKER = """
+<script>
+(function () {
+    const doc = window.parent.document;
+    const pad = (n) => String(n).padStart(2, "0");
+
+    function format(ms, style) {
+        let s = Math.floor(ms / 1000);
+        const d = Math.floor(s / 86400); s %= 86400;
+        const h = Math.floor(s / 3600); s %= 3600;
+        const m = Math.floor(s / 60);
+        const sec = s % 60;
+        if (style === "clock") {
+            return (d ? d + (d === 1 ? " day, " : " days, ") : "") + h + ":" + pad(m) + ":" + pad(sec);
+        }
+        const parts = [];
+        if (d) parts.push(d + "d");
+        if (h) parts.push(h + "h");
+        if (m) parts.push(m + "m");
+        if (sec) parts.push(sec + "s");
+        return parts.join(" ");
+    }
+
+    function tick() {
+        doc.querySelectorAll(".live-countdown[data-target]").forEach((el) => {
+            const left = Number(el.dataset.target) - Date.now();
+            el.textContent = left > 0
+                ? (el.dataset.prefix || "") + format(left, el.dataset.style)
+                : (el.dataset.done || "");
+        });
+    }
+
+    tick();
+    setInterval(tick, 1000);
+})();
+</script>
+"""
+
+
+def countdown_attrs(target_dt, prefix="", done="", style="parts"):
+    """
+    HTML attributes that hand a countdown over to the client-side ticker.
+
+    Args:
+        target_dt (datetime): Timezone-aware moment the countdown runs to.
+        prefix (str): Text shown before the remaining time.
+        done (str): Text shown once the target has passed.
+        style (str): "parts" (1d 2h 3m) or "clock" (1 day, 2:03:04).
+    """
+    target_ms = int(target_dt.timestamp() * 1000)
+    return (
+        f'class="live-countdown" data-target="{target_ms}" data-style="{style}" '
+        f'data-prefix="{prefix}" data-done="{done}"'
+    )
+
+
+def render_countdown_ticker():
+    components.html(COUNTDOWN_TICKER, height=0)
+
+
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+def _poll_for_changes(key):
+    version = get_data_version()
+    wake_at = st.session_state.get(f"live_wake_{key}")
+    if version != st.session_state.get(f"live_version_{key}") or (wake_at and time.time() >= wake_at):
+        st.rerun()
+
+
+def snapshot_version(key):
+    """
+    Remember the data version a page is about to render from.
+    Call this before the page runs its queries.
+    """
+    st.session_state[f"live_version_{key}"] = get_data_version()
+
+
+def watch_for_changes(key, wake_at=()):
+    """
+    Keep a page live without re-running it every second.
+
+    A small fragment polls the change counter every LIVE_POLL_SECONDS and
+    triggers a full rerun only when matches/rounds changed since
+    snapshot_version(), or when one of the `wake_at` moments (deadlines,
+    kick-offs, as epoch seconds) has passed.
+    """
+    upcoming = [ts for ts in wake_at if ts > time.time()]
+    st.session_state[f"live_wake_{key}"] = min(upcoming) if upcoming else None
+    render_countdown_ticker()
+    _poll_for_changes(key)
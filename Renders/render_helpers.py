@@ -1,5 +1,4 @@
 import streamlit as st
-import base64
 from pathlib import Path
 from datetime import datetime, timedelta
 from tzlocal import get_localzone
@@ -8,6 +7,9 @@ import os
 from Controllers.fixtures_controller import get_league_dates, calculate_league_progress
 from datetime import datetime, timedelta, timezone
 from Controllers import predictions_controller as ctrl
+from Renders.asset_cache import image_data_uri
+from Renders.live_updates import countdown_attrs
+from Controllers.time_service import local_time
 
 import uuid
 # 🎨 Optional: Unique colors per league
@@ -21,30 +23,6 @@ LEAGUE_COLORS = {
     "Europa League": "#ff7c00,#121212",         # Bright orange & dark gray/black
 }
 
-def convert_img_to_base64(path):
-    """
-    Converts an image file to a base64 string for HTML embedding.
-    
-    Parameters:
-        path (str): The full path to the image file.
-    
-    Returns:
-        str: Base64-encoded image string or None if file not found or error.
-    """
-    if not os.path.exists(path):
-        print(f"[⚠️ File not found]: {path}")
-        return None
-
-    try:
-        with open(path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode("utf-8")
-        return encoded
-    except Exception as e:
-        print(f"[❌ Error reading file]: {path} → {e}")
-        return None
-
-
-    
 def render_league_banner(league_name, logo_path=None):
     import re
     from datetime import datetime
@@ -56,9 +34,8 @@ def render_league_banner(league_name, logo_path=None):
     float_anim = f"float-logo-{class_id}"
 
     logo_html = ""
-    logo_b64 = convert_img_to_base64(logo_path) if logo_path else None
-    if logo_b64:
-        data_uri = f"data:image/png;base64,{logo_b64}"
+    data_uri = image_data_uri(logo_path, display_px=60) if logo_path else None
+    if data_uri:
         logo_html = f"""
         <div class="{logo_class}">
             <img src="{data_uri}" class="league-logo-img" alt="{league_name} logo" />
@@ -234,36 +211,10 @@ def calculate_countdown(local_dt):
         # Match has finished
         return "finished", None
 
-def render_team_logo_img(logo_path):
-    try:
-        logo_b64 = convert_img_to_base64(logo_path)
-        return f"data:image/png;base64,{logo_b64}"
-    except FileNotFoundError:
-        return None
+def render_team_logo_img(logo_path, display_px=None):
+    return image_data_uri(logo_path, display_px)
 
 
-def convert_img_to_base64(path):
-    """
-    Converts an image file to a base64 string for HTML embedding.
-    
-    Parameters:
-        path (str): The full path to the image file.
-    
-    Returns:
-        str: Base64-encoded image string or None if file not found or error.
-    """
-    if not os.path.exists(path):
-        print(f"[⚠️ File not found]: {path}")
-        return None
-
-    try:
-        with open(path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode("utf-8")
-        return encoded
-    except Exception as e:
-        print(f"[❌ Error reading file]: {path} → {e}")
-        return None
-
 def render_team_logos(home, away, home_logo_src, away_logo_src, home_score, away_score,
                       status, home_color="#c8102e", away_color="#111", time_str="20:00", unique_id=None):
     if unique_id is None:
@@ -548,7 +499,9 @@ def render_countdown_block(local_dt):
         if seconds: time_parts.append(f"{seconds}s")
 
         countdown_text = "⏳ Kick-off in " + " ".join(time_parts)
-        return f"{base_style}<div class='countdown-wrapper'><div class='countdown'>{countdown_text}</div></div>", status
+        # The browser keeps this ticking (see live_updates.render_countdown_ticker)
+        live_attrs = countdown_attrs(local_dt, prefix="⏳ Kick-off in ", done="🟢 The match is Live!")
+        return f"{base_style}<div class='countdown-wrapper'><div class='countdown'><span {live_attrs}>{countdown_text}</span></div></div>", status
 
     elif status == "live":
         return f"""{base_style}<div class='countdown-wrapper'><div class='countdown'>🟢 The match is Live!</div></div>""", status
@@ -564,26 +517,10 @@ def get_user_local_time(match_utc_str: str, player_id: int):
     Converts a UTC datetime string (from DB) to user's local time using their saved timezone.
     Returns: (localized datetime object, formatted time string, formatted date string)
     """
-    import pytz
-    from datetime import datetime
-
-    # Parse UTC datetime from DB
-    utc_dt = datetime.fromisoformat(match_utc_str.replace("Z", "")).replace(tzinfo=pytz.UTC)
-
-    # Get user timezone
-    local_tz = ctrl.get_localzone_for_player(player_id)
-
-    # Convert to local time
-    local_dt = utc_dt.astimezone(local_tz)
-
-    # Format results
-    time_str = local_dt.strftime('%I:%M %p')
-    date_friendly = local_dt.strftime('%a %d %b %Y')
-
-    return local_dt, time_str, date_friendly
+    return local_time(match_utc_str, ctrl.get_localzone_for_player(player_id))
 
 
-def render_match_card(match: dict, player_id):
+def render_match_card(match: dict, player_id, match_time=None):
     # Extract info
     home = match['home_team']
     away = match['away_team']
@@ -591,14 +528,14 @@ def render_match_card(match: dict, player_id):
     away_score = match.get("away_score","-")
     home_color = match.get("home_color","-")
     away_color = match.get("away_color","-")
-    # Convert UTC to local
-    local_dt, time_str, date_friendly = get_user_local_time(match["match_datetime"], player_id)
+    # Convert UTC to local (pages pass `match_time` from one time_service.localize() call)
+    local_dt, time_str, date_friendly = match_time or get_user_local_time(match["match_datetime"], player_id)
     # Countdown block & status
     countdown_html, status = render_countdown_block(local_dt)
     status =match.get("status")
     # Logos
-    home_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['home_logo']))
-    away_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['away_logo']))
+    home_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['home_logo']), display_px=90)
+    away_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['away_logo']), display_px=90)
 
     # Result
     result = (
@@ -1,14 +1,13 @@
 import os
-import base64
 import streamlit as st
 from Controllers.teams_controller import get_team_full_info, get_league_info_for_team, get_team_squad, get_participated_league
-import pytz
 from datetime import datetime
 from tzlocal import get_localzone
-from datetime import datetime
+from Controllers.time_service import localize
 from Renders.render_helpers import render_league_banner
 from Controllers import fixtures_controller as ctrl
 from Renders.render_leagues_helper import render_table, render_rules
+from Renders.asset_cache import image_data_uri
 
 LEAGUE_COLORS = {
     "Premier League": "#1e1f57,#932790",        # Deep navy & royal purple (lion mane)
@@ -20,25 +19,12 @@ LEAGUE_COLORS = {
     "Europa League": "#ff7c00,#121212",         # Bright orange & dark gray/black
 }
 
-def convert_img_to_base64(path):
-    if not os.path.exists(path):
-        print(f"[⚠️ File not found]: {path}")
-        return None
-    try:
-        with open(path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode("utf-8")
-        return encoded
-    except Exception as e:
-        print(f"[❌ Error reading file]: {path} → {e}")
-        return None
-
-def render_team_logo_img(logo_path):
-    logo_b64 = convert_img_to_base64(logo_path)
-    return f"data:image/png;base64,{logo_b64}" if logo_b64 else None
+def render_team_logo_img(logo_path, display_px=None):
+    return image_data_uri(logo_path, display_px)
 
 # Phase 1: Top Club Header
 def render_team_header(team, coach):
-    logo_src = render_team_logo_img(os.path.join("Assets", "Teams", team['logo_path']))
+    logo_src = render_team_logo_img(os.path.join("Assets", "Teams", team['logo_path']), display_px=95)
 
     def safe(val, default="Unknown"):
         return val if val else default
@@ -73,6 +59,7 @@ def render_team_header(team, coach):
             pass
         return ""
 
+    coach = coach or {"name": None, "nationality": None}
     flag_emoji = country_flag(safe(coach['nationality']))
 
     st.markdown(f"""
@@ -181,8 +168,8 @@ def render_team_header(team, coach):
 
 
     
-def render_team_matches(team_id):
-    team_data = get_team_full_info(team_id)
+def render_team_matches(team_id, team_data=None):
+    team_data = team_data or get_team_full_info(team_id)
     team_info = team_data['team']
     matches = team_data['matches'] if team_data and 'matches' in team_data else []
 
@@ -252,19 +239,16 @@ def render_team_matches(team_id):
                 <h4 style="text-align:center; color:#f9fafb;">📅 Recent Matches</h4>
         """, unsafe_allow_html=True)
 
-        for match in matches[:22]:  # Limit to recent 5
+        recent = matches[:22]  # Limit to recent 5
+        match_times = localize((match['match_ts'] for match in recent), get_localzone())
+        for match, (local_dt, time_str, date_friendly) in zip(recent, match_times):
             home = match['home_team_name']
             away = match['away_team_name']
             
             home_logo_path = os.path.join("Assets", "Teams", match['home_team_logo'])
             away_logo_path = os.path.join("Assets", "Teams", match['away_team_logo'])
-            home_logo_src = render_team_logo_img(home_logo_path)
-            away_logo_src = render_team_logo_img(away_logo_path)
-            # Convert UTC to local
-            utc_dt = datetime.fromisoformat(match['match_datetime'].replace("Z", ""))
-            local_dt = pytz.utc.localize(utc_dt).astimezone(get_localzone())
-            time_str = local_dt.strftime('%I:%M %p')
-            date_friendly = local_dt.strftime('%a %d %b %Y')
+            home_logo_src = render_team_logo_img(home_logo_path, display_px=20)
+            away_logo_src = render_team_logo_img(away_logo_path, display_px=20)
             comp = match['league_name']
             score = f"{match['home_score']} - {match['away_score']}" if match['status'] == 'finished' else "vs"
 
@@ -297,8 +281,8 @@ def calculate_age(birthdate_str):
     except:
         return None
 
-def render_team_squad(team_id):
-    squad = get_team_squad(team_id)
+def render_team_squad(team_id, squad=None):
+    squad = squad if squad is not None else get_team_squad(team_id)
     if not squad:
         st.info("No squad data available.")
         return
@@ -406,8 +390,8 @@ def render_team_squad(team_id):
 
     st.markdown("</div>", unsafe_allow_html=True)
 
-def render_participated_leagues(team_id):
-    leagues = get_participated_league(team_id)
+def render_participated_leagues(team_id, leagues=None):
+    leagues = leagues if leagues is not None else get_participated_league(team_id)
 
     if not leagues:
         st.info("No league participation history found.")
@@ -461,7 +445,7 @@ def render_participated_leagues(team_id):
 
     for league in leagues:
         league_path = os.path.join("Assets", "Leagues", league['logo_path'])
-        league_path_src = render_team_logo_img(league_path)
+        league_path_src = render_team_logo_img(league_path, display_px=72)
 
         # Get league colors or fallback
         color_pair = LEAGUE_COLORS.get(league['league_name'], "#374151,#1f2937")
@@ -491,140 +475,129 @@ def render_participated_leagues(team_id):
 
 
 
-def render_team_gallery(teams):
-    query_params = st.query_params
+GALLERY_CSS = """
+    <style>
+        .team-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(170px, 1fr));
+            gap: 10px;
+        }
+        .team-card {
+            position: relative;
+            width: 140px;
+            height: 140px;
+            border-radius: 50%;
+            background-color: #1f2937;
+            margin: 30px auto;
+            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
+            overflow: hidden;
+            transition: transform 0.25s ease, box-shadow 0.25s ease;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            text-align: center;
+        }
+        .team-card:hover {
+            transform: scale(1.1);
+            box-shadow: 0 6px 20px rgba(255,255,255,0.2);
+        }
+        .team-card.selected {
+            box-shadow: 0 0 0 4px #10b981, 0 6px 20px rgba(16,185,129,0.4);
+        }
+        .team-card-content {
+            z-index: 1;
+            display: flex;
+            flex-direction: column;
+            align-items: center;
+            justify-content: center;
+        }
+        .team-logo {
+            width: 90px;
+            height: 90px;
+            object-fit: contain;
+            border-radius: 50%;
+            box-shadow: 0 0 6px rgba(255, 255, 255, 0.2);
+            margin-bottom: 6px;
+        }
+        .team-name {
+            font-size: 13px;
+            font-weight: 600;
+            color: #f9fafb;
+            margin-bottom: 2px;
+            text-shadow: 0 0 4px rgba(0, 0, 0, 0.5);
+        }
+        .team-nation {
+            font-size: 11px;
+            color: #d1d5db;
+        }
+        .fallback-icon {
+            font-size: 36px;
+            color: white;
+            margin-bottom: 6px;
+            text-shadow: 0 0 6px rgba(0, 0, 0, 0.6);
+        }
+    </style>
+"""
+
+
+def build_team_grid_html(teams, selected_id=None):
+    """The whole gallery page as one HTML grid (one Streamlit element, not one form per team)."""
+    cards = []
+    for team in teams:
+        logo_src = render_team_logo_img(os.path.join("Assets", "Teams", team['logo_path'] or ""), display_px=90)
+        selected = " selected" if team['id'] == selected_id else ""
+        cards.append(f"""
+            <div class="team-card{selected}" style="background: {team['color']};" title="{team['official_name'] or team['name']}">
+                <div class="team-card-content">
+                    {f'<img src="{logo_src}" class="team-logo" loading="lazy">' if logo_src else '<div class="fallback-icon">❓</div>'}
+                    <div class="team-name">{team['name']}</div>
+                    <div class="team-nation">{team['nationality'] or ''}</div>
+                </div>
+            </div>
+        """)
+    return f'{GALLERY_CSS}<div class="team-grid">{"".join(cards)}</div>'
 
-    if query_params.get("scroll_to") == "details":
-        st.markdown("""
-            <script>
-                setTimeout(function() {
-                    const el = document.getElementById("team-details");
-                    if (el) el.scrollIntoView({ behavior: "smooth", block: "start" });
-                }, 500);
-            </script>
-        """, unsafe_allow_html=True)
-        query_params.clear()  # Optional: reset after scroll
 
+def render_team_gallery(teams):
+    """
+    One page of clubs and a picker for opening one of them. The chosen row is
+    kept in session state, so render_team_details() doesn't read it again.
+
+    Returns:
+        The selected team row, or None.
+    """
     st.markdown("""
-        <style>
-            .team-card {
-                position: relative;
-                width: 140px;
-                height: 140px;
-                border-radius: 50%;
-                background-color: #1f2937;
-                margin: 30px auto;
-                box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
-                cursor: pointer;
-                overflow: hidden;
-                transition: transform 0.25s ease, box-shadow 0.25s ease;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                text-align: center;
-            }
-            .team-card:hover {
-                transform: scale(1.1);
-                box-shadow: 0 6px 20px rgba(255,255,255,0.2);
-            }
-            .team-card-content {
-                z-index: 1;
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                justify-content: center;
-            }
-            .team-logo {
-                width: 90px;
-                height: 90px;
-                object-fit: contain;
-                border-radius: 50%;
-                box-shadow: 0 0 6px rgba(255, 255, 255, 0.2);
-                margin-bottom: 6px;
-            }
-            .team-name {
-                font-size: 13px;
-                font-weight: 600;
-                color: #f9fafb;
-                margin-bottom: 2px;
-                text-shadow: 0 0 4px rgba(0, 0, 0, 0.5);
-            }
-            .team-nation {
-                font-size: 11px;
-                color: #d1d5db;
-            }
-            .fallback-icon {
-                font-size: 36px;
-                color: white;
-                margin-bottom: 6px;
-                text-shadow: 0 0 6px rgba(0, 0, 0, 0.6);
-            }
-            .click-form button {
-                all: unset;
-                width: 100%;
-                height: 100%;
-                position: absolute;
-                top: 0;
-                left: 0;
-                z-index: 2;
-                cursor: pointer;
-            }
-        </style>
         <h3 style='text-align:center; color:#10b981; font-size: 30px;'>🏟️ Club Gallery</h3>
-        <p style='text-align:center; color:#9ca3af; font-size: 16px;'>Click a team to view its details</p>
+        <p style='text-align:center; color:#9ca3af; font-size: 16px;'>Pick a team below the gallery to view its details</p>
         <br>
     """, unsafe_allow_html=True)
 
-    cols = st.columns(3)
-
-    for idx, team in enumerate(teams):
-        team_id = team["id"]
-        name = team["name"]
-        nationality = team["nationality"]
-        color = team["color"]
-        logo_src = render_team_logo_img(os.path.join("Assets", "Teams", team['logo_path']))
-
-        with cols[idx % 3]:
-            with st.form(f"form_{team_id}", clear_on_submit=True):
-                clicked = st.form_submit_button(label="", help=f"Click to select {name}")
-
-                card_content = f"""
-                    <div class="team-card" style="background: {color};">
-                        <div class="click-form"><button type="submit"></button></div>
-                        <div class="team-card-content">
-                            {f'<img src="{logo_src}" class="team-logo">' if logo_src else '<div class="fallback-icon">❓</div>'}
-                            <div class="team-name">{name}</div>
-                            <div class="team-nation">{nationality}</div>
-                        </div>
-                    </div>
-                """
-
-                st.markdown(card_content, unsafe_allow_html=True)
-
-                if clicked:
-                    st.session_state["selected_team_id"] = team_id
-                    st.session_state["selected_team_name"] = name
-                    st.toast(f"✅ You selected {name} (ID: {team_id})")
-                    st.markdown("""
-                        <script>
-                            window.location.search = '?scroll_to=details';
-                        </script>
-                    """, unsafe_allow_html=True)
-                    # 👇 Add query param and rerun to trigger scroll next time
-                    st.query_params["scroll_to"] = "details"
-                    #st.rerun()
-
-    if "selected_team_id" in st.session_state:
-        st.markdown('<div id="team-details"></div>', unsafe_allow_html=True)
-        st.markdown("---")
-        st.success(f"🎯 Selected Team: **{st.session_state['selected_team_name']}** (ID: `{st.session_state['selected_team_id']}`)")
-        team_data = get_team_full_info(st.session_state['selected_team_id'])
-        if team_data:
-            render_team_header(team_data["team"], team_data["coach"])
-            render_participated_leagues(st.session_state['selected_team_id'])
-            render_team_matches(st.session_state['selected_team_id'])
-            #render_team_squad(team_data["team"]['id'])
-            render_team_squad(st.session_state['selected_team_id'])  # 👥 Show squad
-
-
-
+    selected = st.session_state.get("selected_team")
+    st.markdown(build_team_grid_html(teams, selected['id'] if selected else None), unsafe_allow_html=True)
+
+    by_id = {team['id']: team for team in teams}
+    options = [None] + list(by_id)
+    current = selected['id'] if selected and selected['id'] in by_id else None
+    chosen = st.selectbox(
+        "🔎 Open team",
+        options,
+        index=options.index(current),
+        format_func=lambda team_id: "— Select a team —" if team_id is None else by_id[team_id]['name'],
+        key="team_gallery_choice",
+    )
+    if chosen is not None and (not selected or selected['id'] != chosen):
+        selected = by_id[chosen]
+        st.session_state["selected_team"] = selected
+        st.toast(f"✅ You selected {selected['name']} (ID: {selected['id']})")
+    return selected
+
+
+def render_team_details(team):
+    st.markdown('<div id="team-details"></div>', unsafe_allow_html=True)
+    st.markdown("---")
+    st.success(f"🎯 Selected Team: **{team['name']}** (ID: `{team['id']}`)")
+    team_data = get_team_full_info(team['id'], team=team)
+    render_team_header(team_data["team"], team_data["coach"])
+    render_participated_leagues(team['id'], team_data["competitions"])
+    render_team_matches(team['id'], team_data)
+    render_team_squad(team['id'], team_data["squad"])  # 👥 Show squad
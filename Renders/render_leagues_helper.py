@@ -1,35 +1,38 @@
 import streamlit as st
 import os
-import base64
-from collections import defaultdict
-from datetime import datetime
+import threading
+from collections import defaultdict, OrderedDict
+from datetime import timezone
 from Renders.render_helpers import render_league_banner, render_match_card
 from Controllers import fixtures_controller as ctrl
+from Controllers.predictions_controller import get_localzone_for_player
+from Controllers.time_service import localize
 import pandas as pd
+from Renders.asset_cache import image_data_uri
 
 from Controllers.leagues_controller import (
     get_active_leagues,
     get_league_by_id,
     get_fixtures_by_league,
-    get_league_table
+    get_league_table,
+    get_league_table_version
 )
 
 ASSET_LOGO_FOLDER = "Assets/Leagues"
 ASSET_TEAM_FOLDER = "Assets/Teams"
 
+# Rendered table HTML per (league, country, name, highlighted team) → (table version, html).
+# A new result bumps the league's version, so stale entries are simply re-rendered.
+TABLE_HTML_CACHE_SIZE = 64
+_table_html_cache = OrderedDict()
+_table_html_lock = threading.Lock()
 
 
 
 
 
-def convert_img_to_base64(path):
-    try:
-        with open(path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode("utf-8")
-    except FileNotFoundError:
-        return None
 
-def render():
+def render(player_id=None):
     st.header("🏆 Leagues")
 
     leagues = get_active_leagues()
@@ -49,7 +52,7 @@ def render():
         tab1, tab2 = st.tabs(["📅 Fixtures", "📊 Table"])
 
         with tab1:
-            render_fixtures(selected_league_id)
+            render_fixtures(selected_league_id, player_id)
         with tab2:
             render_league_banner(league['name'], ctrl.get_logo_path_from_league(league['name']))
             render_table(selected_league_id, league['country'], league['name'])
@@ -104,8 +107,7 @@ def render_leagues(leagues):
 
         for league in leagues:
             logo_path = os.path.join(ASSET_LOGO_FOLDER, league['logo_path'])
-            logo_b64 = convert_img_to_base64(logo_path)
-            logo_img = f"data:image/png;base64,{logo_b64}" if logo_b64 else "https://via.placeholder.com/80"
+            logo_img = image_data_uri(logo_path, display_px=80) or "https://via.placeholder.com/80"
 
             is_active = (selected_league_id == league['id'])
             active_class = "active" if is_active else ""
@@ -128,17 +130,17 @@ def render_leagues(leagues):
 
 
 
-def render_fixtures(league_id):
+def render_fixtures(league_id, player_id=None):
     fixtures = get_fixtures_by_league(league_id)
     if not fixtures:
         st.info("No fixtures found for this league.")
         return
 
-    # Group fixtures by date
+    # Whole season to the player's local time in one pass, grouped by local date (already in kick-off order)
+    local_tz = get_localzone_for_player(player_id) if player_id else timezone.utc
     grouped_fixtures = defaultdict(list)
-    for match in sorted(fixtures, key=lambda m: m['match_datetime']):
-        date_str = datetime.fromisoformat(match['match_datetime']).strftime("%A, %d %B %Y")
-        grouped_fixtures[date_str].append(match)
+    for match, match_time in zip(fixtures, localize((m.match_ts for m in fixtures), local_tz)):
+        grouped_fixtures[match_time.local_dt.date()].append((match, match_time))
 
     # CSS styling
     st.markdown("""
@@ -160,9 +162,9 @@ def render_fixtures(league_id):
 
     # Render fixtures grouped by date
     for day, matches in grouped_fixtures.items():
-        st.markdown(f"<div class='day-header'>📅 {day}</div>", unsafe_allow_html=True)
-        for match in matches:
-            render_match_card(match)
+        st.markdown(f"<div class='day-header'>📅 {day.strftime('%A, %d %B %Y')}</div>", unsafe_allow_html=True)
+        for match, match_time in matches:
+            render_match_card(match, player_id, match_time=match_time)
 
 
 # Table Part    
@@ -250,11 +252,39 @@ def highlight_row(x):
     return ['background-color: #d6e4ff' if x.name == 0 else '' for _ in x]
 
 def render_table(league_id, country, league_name, highlight_team: str = None):
-    table = get_league_table(league_id, country)
-    if not table:
+    html = get_table_html(league_id, country, league_name, highlight_team)
+    if html is None:
         st.info("No table data available.")
         return
 
+    st.markdown(f"<h3 style='text-align:center;'>🏆 {league_name} League Table</h3>", unsafe_allow_html=True)
+    st.write(html, unsafe_allow_html=True)
+
+
+def get_table_html(league_id, country, league_name, highlight_team=None):
+    """Cached league table HTML, re-rendered only after the league's next result (None if empty)."""
+    key = (league_id, country, league_name, (highlight_team or "").lower())
+    version = get_league_table_version(league_id)
+    with _table_html_lock:
+        entry = _table_html_cache.get(key)
+        if entry and entry[0] == version:
+            _table_html_cache.move_to_end(key)
+            return entry[1]
+
+    html = build_table_html(league_id, country, league_name, highlight_team)
+    with _table_html_lock:
+        _table_html_cache[key] = (version, html)
+        _table_html_cache.move_to_end(key)
+        while len(_table_html_cache) > TABLE_HTML_CACHE_SIZE:
+            _table_html_cache.popitem(last=False)
+    return html
+
+
+def build_table_html(league_id, country, league_name, highlight_team=None):
+    table = get_league_table(league_id, country)
+    if not table:
+        return None
+
     df = pd.DataFrame(table)
     df['GD'] = df['goals_for'] - df['goals_against']
 
@@ -324,8 +354,7 @@ def render_table(league_id, country, league_name, highlight_team: str = None):
         ], overwrite=False) \
         .apply(highlight_row, axis=1)
 
-    st.markdown(f"<h3 style='text-align:center;'>🏆 {league_name} League Table</h3>", unsafe_allow_html=True)
-    st.write(styled_df.to_html(escape=False, index=False), unsafe_allow_html=True)
+    return styled_df.to_html(escape=False, index=False)
 
 
 
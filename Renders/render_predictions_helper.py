@@ -1,5 +1,4 @@
 import streamlit as st
-import base64
 from pathlib import Path
 from datetime import datetime, timedelta
 from tzlocal import get_localzone
@@ -12,7 +11,10 @@ import uuid
 import tzlocal  # <--- get user's OS timezone (for local dev)
 from datetime import datetime, timedelta, timezone
 from Controllers import predictions_controller as ctrl
-from Controllers.teams_controller import get_team_id_by_name, get_team_name_by_id
+from Controllers.teams_controller import get_team_name_by_id
+from Renders.asset_cache import image_data_uri
+from Renders.live_updates import countdown_attrs
+from Controllers.time_service import local_time
 
 # 🎨 Optional: Unique colors per league
 LEAGUE_COLORS = {
@@ -38,9 +40,8 @@ def render_league_banner(league_name, logo_path=None):
     float_anim = f"float-logo-{class_id}"
 
     logo_html = ""
-    logo_b64 = convert_img_to_base64(logo_path) if logo_path else None
-    if logo_b64:
-        data_uri = f"data:image/png;base64,{logo_b64}"
+    data_uri = image_data_uri(logo_path, display_px=60) if logo_path else None
+    if data_uri:
         logo_html = f"""
         <div class="{logo_class}">
             <img src="{data_uri}" class="league-logo-img" alt="{league_name} logo" />
@@ -200,13 +201,6 @@ def render_league_banner(league_name, logo_path=None):
 
 
 
-def convert_img_to_base64(path):
-    try:
-        with open(path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode("utf-8")
-    except FileNotFoundError:
-        return None
-    
 def calculate_countdown(local_dt):
     now = datetime.now(get_localzone())
 
@@ -257,12 +251,8 @@ def render_deadline(days, hours, minutes, seconds):
 
 
 
-def render_team_logo_img(logo_path):
-    try:
-        logo_b64 = convert_img_to_base64(logo_path)
-        return f"data:image/png;base64,{logo_b64}"
-    except FileNotFoundError:
-        return None
+def render_team_logo_img(logo_path, display_px=None):
+    return image_data_uri(logo_path, display_px)
 
 
 
@@ -566,7 +556,9 @@ def render_countdown_block(local_dt):
         if seconds: time_parts.append(f"{seconds}s")
 
         countdown_text = "⏳ Kick-off in " + " ".join(time_parts)
-        return f"{base_style}<div class='countdown-wrapper'><div class='countdown'>{countdown_text}</div></div>", status
+        # The browser keeps this ticking (see live_updates.render_countdown_ticker)
+        live_attrs = countdown_attrs(local_dt, prefix="⏳ Kick-off in ", done="🟢 The match is Live!")
+        return f"{base_style}<div class='countdown-wrapper'><div class='countdown'><span {live_attrs}>{countdown_text}</span></div></div>", status
 
     elif status == "live":
         return f"""{base_style}<div class='countdown-wrapper'><div class='countdown'>🟢 The match is Live!</div></div>""", status
@@ -578,163 +570,135 @@ def render_countdown_block(local_dt):
         return "", status
 
 
-def render_prediction_form(match, player_id):
-    """
-    Render an interactive prediction form for a given match and player.
-    Automatically loads complete match info (round, stage, league, teams).
-    Keeps save_prediction() unchanged.
-    """
+def _penalty_label(match, team_id):
+    if team_id is None:
+        return "—"
+    return match["home_team"] if team_id == match["home_team_id"] else match["away_team"]
 
-    # ✅ Step 1: Fetch complete match info (ensures correct round/stage linkage)
-    from Controllers.teams_controller import get_match_full_info
 
-    try:
-        match = get_match_full_info(match["id"])  # enrich match dict
-    except Exception as e:
-        st.error(f"❌ Failed to load match info: {e}")
-        return
+def render_round_prediction_grid(matches, player_id):
+    """
+    One form for every open match of the round. All entries are checked against
+    their stage rules before anything is written, then saved together in one
+    upsert. Replaces a form (and a full page rerun) per match.
 
-    # ✅ Step 2: Fetch existing prediction (if any)
-    existing = get_existing_prediction(player_id, match["id"])
+    Args:
+        matches (list[dict]): load_round_view() matches; each "prediction" is
+            updated in place for the matches saved on this run.
+        player_id (int): The logged-in player.
 
-    # Pre-fill values if prediction exists
-    default_home_score = existing["predicted_home_score"] if existing else 0
-    default_away_score = existing["predicted_away_score"] if existing else 0
-    default_penalty_winner = existing["predicted_penalty_winner_id"] if existing else None
-
-    # ✅ Step 3: Extract rules safely
-    allows_draw = match.get("allows_draw", 1)
-    has_penalties = match.get("has_penalties", 0)
-    is_two_legged = match.get("is_two_legged", 0)
-    # print(f"The match allows_draw is {allows_draw}")
-    # print(f"The match has_penalties is {has_penalties}")
-    # print(f"The match is_two_legged is {is_two_legged}")
-    
-    # print(f"existing {existing}")
-    # Stage-level override example
-    if match.get('stage_name') == "Final - Single Leg":
-        has_penalties = 1
-        allows_draw = 1
-
-    # ✅ Step 4: Resolve team IDs safely
-    home_team_id = match.get('home_team_id')
-    away_team_id = match.get('away_team_id')
-
-    if not home_team_id:
-        home_team_id = get_team_id_by_name(match.get('home_team'))
-    if not away_team_id:
-        away_team_id = get_team_id_by_name(match.get('away_team'))
-
-    ids_missing = (home_team_id is None or away_team_id is None)
-
-    # ✅ Step 5: Header info
-    st.markdown(
-        f"""
-        ### ⚽ Prediction: **{match.get('home_team', 'TBD')}** vs **{match.get('away_team', 'TBD')}**
-        🏆 League: {match.get('league_name', 'Unknown League')}  
-        📅 Date: {match.get('match_datetime', 'TBD')}  
-        **Round:** {match.get('round_name', 'Unknown Round')}  
-        **Stage:** {match.get('stage_name', 'Unknown Stage')}  
-        """
-    )
+    Returns:
+        set: ids of the matches whose prediction was saved on this run.
+    """
+    if not matches:
+        return set()
+
+    with st.form(key=f"round_prediction_grid_{matches[0]['round_id']}", clear_on_submit=False):
+        st.markdown("#### 📝 Predict the Round")
+        st.caption("Leave both scores empty to skip a match. A drawn score in a knockout stage needs a penalty winner.")
+
+        entries = []
+        for match in matches:
+            existing = match.get("prediction")
+            allows_draw, has_penalties = ctrl.prediction_rules(match)
+            rules = "Penalties if draw" if has_penalties else ("Draw allowed" if allows_draw else "No draws")
+
+            col_match, col_home, col_away, col_penalty = st.columns([3, 1, 1, 2], vertical_alignment="center")
+            with col_match:
+                st.markdown(
+                    f"**{match['home_team']}** vs **{match['away_team']}**  \n"
+                    f"<small style='color:gray;'>{match['date_friendly']} • {match['time_str']} · {rules}</small>",
+                    unsafe_allow_html=True,
+                )
+            with col_home:
+                home_score = st.number_input(
+                    f"{match['home_team']} Goals",
+                    min_value=0, max_value=ctrl.MAX_PREDICTED_GOALS, step=1,
+                    value=existing["predicted_home_score"] if existing else None,
+                    placeholder="Home",
+                    label_visibility="collapsed",
+                    key=f"grid_home_{match['id']}"
+                )
+            with col_away:
+                away_score = st.number_input(
+                    f"{match['away_team']} Goals",
+                    min_value=0, max_value=ctrl.MAX_PREDICTED_GOALS, step=1,
+                    value=existing["predicted_away_score"] if existing else None,
+                    placeholder="Away",
+                    label_visibility="collapsed",
+                    key=f"grid_away_{match['id']}"
+                )
+            penalty_winner_id = None
+            with col_penalty:
+                if has_penalties:
+                    options = [None, match["home_team_id"], match["away_team_id"]]
+                    default = existing["predicted_penalty_winner_id"] if existing else None
+                    penalty_winner_id = st.selectbox(
+                        "⚔️ Penalty winner if drawn",
+                        options=options,
+                        index=options.index(default) if default in options else 0,
+                        format_func=lambda team_id, match=match: _penalty_label(match, team_id),
+                        label_visibility="collapsed",
+                        key=f"grid_penalty_{match['id']}"
+                    )
+            entries.append((match, home_score, away_score, penalty_winner_id))
+
+        submitted = st.form_submit_button("✅ Save Predictions")
+
+    if not submitted:
+        return set()
+
+    # ✅ Validate everything first: nothing is saved while any entry is invalid
+    errors, rows = [], []
+    for match, home_score, away_score, penalty_winner_id in entries:
+        label = f"{match['home_team']} vs {match['away_team']}"
+        if home_score is None and away_score is None:
+            continue
+        if home_score is None or away_score is None:
+            errors.append(f"{label}: enter both scores or leave both empty.")
+            continue
+        if home_score != away_score:
+            penalty_winner_id = None
+        error = ctrl.validate_prediction(match, home_score, away_score, penalty_winner_id)
+        if error:
+            errors.append(f"{label}: {error}")
+            continue
+        existing = match.get("prediction")
+        if existing and (existing["predicted_home_score"], existing["predicted_away_score"],
+                         existing["predicted_penalty_winner_id"]) == (home_score, away_score, penalty_winner_id):
+            continue
+        rows.append((match["id"], home_score, away_score, penalty_winner_id))
+
+    if errors:
+        st.error("⚠️ Nothing was saved. Please fix:\n\n" + "\n".join(f"- {e}" for e in errors))
+        return set()
+    if not rows:
+        st.info("No changes to save.")
+        return set()
+
+    # 💾 One transaction for the whole round
+    refused = ctrl.save_round_predictions(player_id, rows)
+    matches_by_id = {match["id"]: match for match in matches}
+    saved = set()
+    for match_id, home_score, away_score, penalty_winner_id in rows:
+        if match_id in refused:
+            continue
+        match = matches_by_id[match_id]
+        match["prediction"] = {
+            "predicted_home_score": home_score,
+            "predicted_away_score": away_score,
+            "predicted_penalty_winner_id": penalty_winner_id,
+            "score": (match.get("prediction") or {}).get("score"),
+        }
+        saved.add(match_id)
 
-    # ✅ Stage Rules summary
-    stage_desc = []
-    if is_two_legged:
-        stage_desc.append("Two-legged tie")
-    if has_penalties:
-        stage_desc.append("Penalties if draw")
-    elif allows_draw:
-        stage_desc.append("Draw allowed")
-
-    if stage_desc:
-        st.caption(f"**Stage Rules:** {', '.join(stage_desc)}")
-
-    if ids_missing:
-        st.warning("⚠️ Team IDs not found. Penalty winner will be resolved by name lookup at save time.")
-
-    # ✅ Step 6: Prediction form
-    with st.form(key=f"prediction_form_{match['id']}", clear_on_submit=False):
-        st.markdown("#### 📝 Enter Your Prediction")
-        col1, col2 = st.columns(2)
-        with col1:
-            predicted_home_score = st.number_input(
-                f"{match.get('home_team', 'Home')} Goals",
-                min_value=0, max_value=20,
-                value=default_home_score,
-                key=f"home_score_{match['id']}"
-            )
-        with col2:
-            predicted_away_score = st.number_input(
-                f"{match.get('away_team', 'Away')} Goals",
-                min_value=0, max_value=20,
-                value=default_away_score,
-                key=f"away_score_{match['id']}"
-            )
-
-        predicted_penalty_winner_name = None
-        penalty_winner_id_to_save = None
-
-        # ✅ Step 7: Penalty logic
-        if has_penalties and predicted_home_score == predicted_away_score:
-            st.markdown("### ⚔️ Penalty Shootout Prediction")
-
-            teams_map = {
-                match.get('home_team', 'Home'): home_team_id,
-                match.get('away_team', 'Away'): away_team_id
-            }
-
-            default_index = 0
-            if default_penalty_winner in teams_map.values():
-                try:
-                    default_index = list(teams_map.values()).index(default_penalty_winner)
-                except ValueError:
-                    default_index = 0
-
-            winner_name = st.radio(
-                "Select the penalty winner:",
-                options=list(teams_map.keys()),
-                index=default_index,
-                horizontal=True,
-                key=f"penalty_{match['id']}"
-            )
-
-            predicted_penalty_winner_name = winner_name
-
-        elif has_penalties and predicted_home_score != predicted_away_score:
-            st.info("✅ No penalties needed as you predicted a clear winner.")
-
-        # ✅ Step 8: Save logic (unchanged)
-        submitted = st.form_submit_button("✅ Save Prediction")
-        if submitted:
-            if has_penalties and predicted_home_score == predicted_away_score and predicted_penalty_winner_name:
-                chosen_name = predicted_penalty_winner_name
-                chosen_id = teams_map.get(chosen_name)
-                if chosen_id is None:
-                    chosen_id = get_team_id_by_name(chosen_name)
-
-                if chosen_id is None:
-                    st.error("⚠️ Could not resolve the selected team's ID. Prediction not saved.")
-                    return
-
-                if home_team_id and away_team_id and chosen_id not in (home_team_id, away_team_id):
-                    st.error("⚠️ Penalty winner ID doesn't belong to this match's teams. Aborting save.")
-                    return
-
-                penalty_winner_id_to_save = chosen_id
-
-            # ✅ Save the prediction using your existing controller
-            from Controllers.predictions_controller import save_prediction
-            save_prediction(
-                player_id=player_id,
-                match_id=match['id'],
-                home_score=predicted_home_score,
-                away_score=predicted_away_score,
-                penalty_winner_id=penalty_winner_id_to_save
-            )
-
-            st.success("🎉 Prediction saved successfully!")
-            st.rerun()
+    if saved:
+        st.success(f"🎉 {len(saved)} prediction{'s' if len(saved) != 1 else ''} saved!")
+    for match_id, error in refused.items():
+        match = matches_by_id[match_id]
+        reason = "the prediction deadline has passed" if isinstance(error, ctrl.PredictionClosed) else error
+        st.error(f"⏰ {match['home_team']} vs {match['away_team']} not saved: {reason}.")
+    return saved
 
 
 
@@ -748,7 +712,7 @@ def render_prediction_result(match, player_id, can_predict=True):
     if not player_id:
         return ""  # No player logged in
 
-    existing = get_existing_prediction(player_id, match["id"])
+    existing = _get_prediction(match, player_id)
     if not existing:
         # Handle no prediction made yet
         if can_predict:
@@ -890,49 +854,48 @@ def render_prediction_result(match, player_id, can_predict=True):
     return html
 
 
-def get_user_local_time(match_utc_str: str, player_id: int):
+def _get_prediction(match, player_id):
     """
-    Converts a UTC datetime string (from DB) to user's local time using their saved timezone.
-    Returns: (localized datetime object, formatted time string, formatted date string)
+    Return the player's prediction for this match, using the one preloaded by
+    load_round_view() when present instead of querying again.
     """
-    import pytz
-    from datetime import datetime
-
-    # Parse UTC datetime from DB
-    utc_dt = datetime.fromisoformat(match_utc_str.replace("Z", "")).replace(tzinfo=pytz.UTC)
-
-    # Get user timezone
-    local_tz = ctrl.get_localzone_for_player(player_id)
+    if "prediction" in match:
+        return match["prediction"]
+    return get_existing_prediction(player_id, match["id"])
 
-    # Convert to local time
-    local_dt = utc_dt.astimezone(local_tz)
 
-    # Format results
-    time_str = local_dt.strftime('%I:%M %p')
-    date_friendly = local_dt.strftime('%a %d %b %Y')
-
-    return local_dt, time_str, date_friendly
+def get_user_local_time(match_utc_str: str, player_id: int, local_tz=None):
+    """
+    Converts a UTC datetime string (from DB) to user's local time using their saved timezone.
+    Pass `local_tz` when it is already known to skip the timezone lookup.
+    Returns: (localized datetime object, formatted time string, formatted date string)
+    """
+    if local_tz is None:
+        local_tz = ctrl.get_localzone_for_player(player_id)
+    return local_time(match_utc_str, local_tz)
 
 
-def render_match_card(match: dict, player_id=None, can_predict=True):
-    local_tz = ctrl.get_localzone_for_player(player_id)
+def render_match_card(match: dict, player_id=None, can_predict=True, local_tz=None):
     home = match['home_team']
     away = match['away_team']
     home_score = match.get("home_score","-")
     away_score = match.get("away_score","-")
     home_color = match.get("home_color","-")
     away_color = match.get("away_color","-")
-    # Convert UTC to local
-    local_dt, time_str, date_friendly = get_user_local_time(match["match_datetime"], player_id)
+    # Convert UTC to local (already done by load_round_view for round cards)
+    if "local_dt" in match:
+        local_dt, time_str, date_friendly = match["local_dt"], match["time_str"], match["date_friendly"]
+    else:
+        local_dt, time_str, date_friendly = get_user_local_time(match["match_datetime"], player_id, local_tz)
 
     # Countdown block & status
     countdown_html, status = render_countdown_block(local_dt)
     status =match.get("status")
     # Logos
-    home_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['home_logo']))
-    away_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['away_logo']))
+    home_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['home_logo']), display_px=90)
+    away_logo_src = render_team_logo_img(os.path.join("Assets", "Teams", match['away_logo']), display_px=90)
 
-    existing = get_existing_prediction(player_id, match["id"])
+    existing = _get_prediction(match, player_id)
      # Pre-fill values if prediction exists
     default_home_score = existing["predicted_home_score"] if existing else 0
     default_away_score = existing["predicted_away_score"] if existing else 0
@@ -1115,8 +1078,5 @@ def render_match_card(match: dict, player_id=None, can_predict=True):
         st.markdown(status_html, unsafe_allow_html=True)
         st.markdown(countdown_html, unsafe_allow_html=True)
 
-        if player_id and can_predict:
-            with st.expander(f"🎯 Predict {match['home_team']} VS {match['away_team']}", expanded=False):
-                render_prediction_form(match, player_id)
-        elif not can_predict:
+        if not can_predict:
             st.markdown("<i>Prediction deadline passed. You cannot predict anymore.</i>", unsafe_allow_html=True)
@@ -3,7 +3,9 @@ from streamlit_option_menu import option_menu
 from Authentications import auth
 from Modules import profile, predictions, leaderboard, achievement, manage, cup, fixtures, teams, leagues
 from Controllers.players_controller import get_player_id_by_username
-from streamlit_autorefresh import st_autorefresh
+from Controllers.utils_search import search_database
+from Renders.asset_cache import prewarm_in_background
+from Controllers import status_ticker, reminder_scheduler
 from datetime import datetime, timedelta
 # Page Configuration
 st.set_page_config(
@@ -49,6 +51,15 @@ def show_animation():
         unsafe_allow_html=True,
     )
 
+# 🖼️ Encode team/league/avatar images once per process, off the script thread
+prewarm_in_background()
+
+# ⏱️ Keep match statuses (upcoming → live → finished) moving between API syncs
+status_ticker.start_in_background()
+
+# ⏰ Send the 2days / 1day / 2hours reminder e-mails as deadlines approach
+reminder_scheduler.start_in_background()
+
 # 🔐 Session State
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -117,14 +128,14 @@ def main_page():
 
     if search_query.strip():
         st.markdown("### 🔎 Search Results")
-        # # You can call a search function here based on your DB
-        # results = search_database(search_query.strip())  # <-- You write this function
+        results = search_database(search_query.strip())
 
-        # if results:
-        #     for res in results:
-        #         st.markdown(f"- **{res['type']}**: {res['name']} ({res.get('extra', '')})")
-        # else:
-        #     st.warning("No matching results found.")
+        if results:
+            for res in results:
+                extra = f" ({res['extra']})" if res.get('extra') else ""
+                st.markdown(f"- **{res['type']}**: {res['name']}{extra}")
+        else:
+            st.warning("No matching results found.")
 
     # 🔖 Define visible tabs and icons
     show_tabs = ["Profile", "Predictions", "Fixtures", "Leaderboard", "Achievement", "Cup", "Teams", "Leagues"]
@@ -181,7 +192,6 @@ def main_page():
     if selected_tab == "Profile":
         profile.render(player_id)
     elif selected_tab == "Predictions":
-        st_autorefresh(interval=1000, limit=None, key="refresh")
         predictions.render(player_id)
     elif selected_tab == "Fixtures":
         st.markdown("""
@@ -190,7 +200,6 @@ def main_page():
                 <p style='margin:0; font-size:15px; color:#444;'>Review and control upcoming matches grouped by league and round.</p>
             </div>
         """, unsafe_allow_html=True)
-        st_autorefresh(interval=1000, limit=None, key="refresh")
         fixtures.render_fixtures(player_id)
     elif selected_tab == "Leaderboard":
         leaderboard.render(player_id)
@@ -202,7 +211,7 @@ def main_page():
         teams.render()
     elif selected_tab == "Leagues":
         #st_autorefresh(interval=5000, limit=None, key="refresh")
-        leagues.render()
+        leagues.render(player_id)
     elif selected_tab == "Manage":
         manage.render(player_id)
 
@@ -1,9 +1,11 @@
 # auto_push_db.py
 import os
+import sqlite3
 import subprocess
 from datetime import datetime
 from zoneinfo import ZoneInfo
 import streamlit as st
+from Controllers.db_controller import pool
 
 def auto_push_db():
     try:
@@ -19,6 +21,16 @@ def auto_push_db():
             st.error("❌ Database file not found.")
             return
 
+        # WAL mode keeps recent writes in a side file; fold them into the DB before pushing
+        if os.path.abspath(DB_FILE) != os.path.abspath(pool.db_file):
+            st.error(f"❌ The app uses {pool.db_file}, not {DB_FILE}; refusing to push a stale copy.")
+            return
+        try:
+            pool.checkpoint()
+        except sqlite3.OperationalError as e:
+            st.error(f"❌ Not pushing: {e}. Try again in a moment.")
+            return
+
         # Git config
         subprocess.run(["git", "config", "--global", "user.email", "auto@streamlit.io"])
         subprocess.run(["git", "config", "--global", "user.name", "Streamlit Auto Bot"])
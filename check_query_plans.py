@@ -0,0 +1,185 @@
+# check_query_plans.py
+# Query-plan regression check: runs EXPLAIN QUERY PLAN on every SQL string the
+# controllers pass to fetch_one / fetch_all / fetch_models / execute_query /
+# cursor.execute (plus every statement in a module-level *_QUERIES registry) and fails when a query on a large table falls back to a full scan.
+#
+#   python check_query_plans.py            # exit code 1 on regressions
+#   python check_query_plans.py --verbose  # print every plan
+import os
+import re
+import ast
+import sys
+
+from Controllers.db_controller import pool
+
+SCAN_DIRS = ("Controllers", "Manage_Controllers")
+SQL_CALLS = {"fetch_one", "fetch_all", "execute_query", "execute", "executemany"}
+MODEL_SQL_CALLS = {"fetch_model", "fetch_models"}  # fetch_models(Model, sql, params)
+SQL_START = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE|INSERT|REPLACE)\b", re.IGNORECASE)
+NAMED_PARAM = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+SQL_KEYWORDS = {"where", "on", "join", "left", "inner", "cross", "set", "group", "order", "limit", "using", "as", "union", "natural"}
+
+# Tables that grow with the season; a full scan on them is a regression.
+HOT_TABLES = ("matches", "predictions", "football_player", "team_competitions", "coaches", "standings", "league_table")
+
+# Queries that read (or rewrite) the whole table on purpose: "file:function" → reason.
+ALLOWED_SCANS = {
+    "Controllers/api_controller.py:update_all_players": "refreshes every player from the API",
+    "Controllers/api_controller.py:update_all_match_statuses": "full repair pass (the ticker uses refresh_match_statuses)",
+    "Controllers/job_runner.py:_job_update_players": "refreshes every player from the API",
+    "Controllers/leagues_controller.py:rebuild_league_tables": "recomputes every league table from matches",
+    "Controllers/leaderboard_controller.py:get_leaderboard": "full leaderboard, read in idx_standings_rank order",
+    "Controllers/utils_prediction.py:score_predictions": "season-wide rescoring reads every prediction",
+    "Controllers/utils_prediction.py:recalculate_all_points": "hashes every finished match result",
+    "Manage_Controllers/manage_matches_controller.py:delete_all_matches": "admin wipe",
+    "Manage_Controllers/manage_tournment_controller.py:send_tournament_end_emails": "mails every player in leaderboard order",
+    "Manage_Controllers/manage_tournment_controller.py:end_season": "clears the season",
+}
+
+
+def _module_constants(tree):
+    """Module-level string constants (SQL fragments such as SCORE_SQL)."""
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    return constants
+
+
+def _module_registries(tree):
+    """Statements in module-level registries: TEAM_QUERIES = {"team": "SELECT ...", ...}."""
+    statements = []
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)):
+            continue
+        for target in node.targets:
+            if not (isinstance(target, ast.Name) and target.id.endswith("_QUERIES")):
+                continue
+            for key, value in zip(node.value.keys, node.value.values):
+                if isinstance(key, ast.Constant) and isinstance(value, ast.Constant) and isinstance(value.value, str):
+                    statements.append((target.id, key.value, value.lineno, value.value))
+    return statements
+
+
+def _render_sql(node, constants):
+    """
+    SQL text for a string or f-string argument. f-string holes that name a
+    module constant are inlined; any other hole becomes a '?' placeholder.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value, False
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            elif isinstance(value.value, ast.Name) and value.value.id in constants:
+                parts.append(constants[value.value.id])
+            else:
+                parts.append("?")
+        return "".join(parts), True
+    return None, False
+
+
+def collect_queries(dirs=SCAN_DIRS):
+    """
+    Returns:
+        list: (location, function, sql, is_fstring) for every literal SQL call.
+    """
+    queries = []
+    for directory in dirs:
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".py"):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+            constants = _module_constants(tree)
+            for registry, key, lineno, sql in _module_registries(tree):
+                if SQL_START.match(sql):
+                    queries.append((f"{path}:{lineno}", f"{path}:{registry}[{key}]", sql, False))
+            for func in ast.walk(tree):
+                if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                # query = """...""" ; fetch_all(query, ...)
+                local_sql = {}
+                for node in ast.walk(func):
+                    if isinstance(node, ast.Assign) and isinstance(node.value, (ast.Constant, ast.JoinedStr)):
+                        for target in node.targets:
+                            if isinstance(target, ast.Name):
+                                local_sql.setdefault(target.id, []).append((node.lineno, node.value))
+                for call in ast.walk(func):
+                    if not isinstance(call, ast.Call) or not call.args:
+                        continue
+                    callee = call.func.attr if isinstance(call.func, ast.Attribute) else getattr(call.func, "id", None)
+                    if callee in SQL_CALLS:
+                        arg = call.args[0]
+                    elif callee in MODEL_SQL_CALLS and len(call.args) > 1:
+                        arg = call.args[1]
+                    else:
+                        continue
+                    if isinstance(arg, ast.Name) and arg.id in local_sql:
+                        earlier = [value for lineno, value in local_sql[arg.id] if lineno <= call.lineno]
+                        arg = earlier[-1] if earlier else arg
+                    sql, is_fstring = _render_sql(arg, constants)
+                    if sql and SQL_START.match(sql):
+                        queries.append((f"{path}:{call.lineno}", f"{path}:{func.name}", sql, is_fstring))
+    return queries
+
+
+def explain(conn, sql):
+    names = NAMED_PARAM.findall(sql)
+    params = {name: None for name in names} if names else [None] * sql.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def table_aliases(sql):
+    """Map every alias (and bare table name) in the statement to its table."""
+    aliases = {}
+    for table, alias in TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias and alias.lower() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(plan, sql):
+    aliases = table_aliases(sql)
+    scans = []
+    for detail in plan:
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and aliases.get(match.group(1), match.group(1)) in HOT_TABLES:
+            scans.append(detail)
+    return scans
+
+
+def main(verbose=False):
+    conn = pool.connection()
+    regressions, skipped, checked = [], [], 0
+    for location, function, sql, is_fstring in collect_queries():
+        try:
+            plan = explain(conn, sql)
+        except Exception as e:
+            # Dynamic SQL (f-string fragments, IN-lists) can't always be explained statically
+            skipped.append((location, str(e)))
+            continue
+        checked += 1
+        scans = full_scans(plan, sql)
+        if verbose:
+            print(f"\n{location}\n  " + "\n  ".join(plan))
+        if scans and function not in ALLOWED_SCANS:
+            regressions.append((location, scans))
+
+    print(f"🔎 {checked} queries checked, {len(skipped)} skipped (dynamic SQL), {len(regressions)} full scans")
+    for location, reason in skipped:
+        print(f"  ⏭️ {location}: {reason}")
+    for location, scans in regressions:
+        print(f"  ❌ {location}: {'; '.join(scans)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(verbose="--verbose" in sys.argv))
@@ -7,17 +7,66 @@ load_dotenv()  # Load variables from .env
 DB_FILE = os.getenv("DB_FILE")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 16))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", 16 * 1024))
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_HEALTH_CHECK_INTERVAL", 30))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 256))
 
 # API
 API_TOKEN = os.getenv("API_TOKEN")
 LOGO_DOWNLOAD_PATH = os.getenv("LOGO_DOWNLOAD_PATH")
 BASE_URL = os.getenv("BASE_URL")
+API_RATE_LIMIT_PER_MINUTE = int(os.getenv("API_RATE_LIMIT_PER_MINUTE", 10))
+API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", 4))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 5))
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", 20))
+SYNC_LOOKBACK_DAYS = int(os.getenv("SYNC_LOOKBACK_DAYS", 2))
+SYNC_LOOKAHEAD_DAYS = int(os.getenv("SYNC_LOOKAHEAD_DAYS", 7))
+
+# Live updates
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", 5))
+STATUS_TICK_SECONDS = float(os.getenv("STATUS_TICK_SECONDS", 60))
+FIXTURES_PAGE_SIZE = int(os.getenv("FIXTURES_PAGE_SIZE", 30))
+TEAMS_PAGE_SIZE = int(os.getenv("TEAMS_PAGE_SIZE", 24))
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", 20))
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "true").lower() in ("1", "true", "yes")
+REMINDER_REFRESH_SECONDS = float(os.getenv("REMINDER_REFRESH_SECONDS", 300))
+
+# Background jobs
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 2))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", 120))
+
+# Scoring
+SCORING_CHUNK_SIZE = int(os.getenv("SCORING_CHUNK_SIZE", 5000))
+
+# Prediction saves (Controllers/prediction_writer.py)
+PREDICTION_BATCH_MAX = int(os.getenv("PREDICTION_BATCH_MAX", 500))
+PREDICTION_WRITE_RETRY_SECONDS = float(os.getenv("PREDICTION_WRITE_RETRY_SECONDS", 30))
+PREDICTION_SAVE_TIMEOUT = float(os.getenv("PREDICTION_SAVE_TIMEOUT", 60))
+
+# Reference data (leagues, teams, stages, player timezones)
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", 3600))
+REFERENCE_CACHE_CHECK_SECONDS = float(os.getenv("REFERENCE_CACHE_CHECK_SECONDS", 5))
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", 4096))
+
+# Assets
+ASSET_CACHE_MAX_BYTES = int(os.getenv("ASSET_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", os.path.join("Assets", "Thumbs"))
+THUMBNAIL_SIZES = tuple(sorted(int(s) for s in os.getenv("THUMBNAIL_SIZES", "48,128,192,320").split(",")))
 
 # Email
 SMTP_SERVER = os.getenv("SMTP_SERVER")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SENDER_EMAIL = os.getenv("SENDER_EMAIL")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", 3))
+EMAIL_RATE_PER_MINUTE = int(os.getenv("EMAIL_RATE_PER_MINUTE", 60))
+EMAIL_MAX_PER_CONNECTION = int(os.getenv("EMAIL_MAX_PER_CONNECTION", 100))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
 
 
 # Admin